@@ -3,6 +3,7 @@ import requests
 import time
 import threading
 from dataclasses import asdict
+from app import instrumentation
 from entities.user import User
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, http
@@ -21,7 +22,9 @@ async def authenticate_auth0_token(
 ):
     error = None
     token_cred = token.credentials
-    if token := LocalTokenStore.get(token_cred):
+    token = LocalTokenStore.get(token_cred)
+    instrumentation.count_auth_cache(hit=token is not None)
+    if token:
         return token
 
     jwks = requests.get(AUTH0_DOMAIN + "/.well-known/jwks.json").json()
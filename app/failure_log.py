@@ -0,0 +1,123 @@
+"""
+Buffered writes to the failures table.
+
+Error responses add their rows to an in-memory buffer instead of opening a
+session and committing on the event loop. A background task writes the buffer
+in multi-row inserts every FAILURE_LOG_FLUSH_INTERVAL seconds, or as soon as
+FAILURE_LOG_BATCH_SIZE rows are waiting. Once FAILURE_LOG_MAX_PENDING rows are
+waiting, new rows are dropped and counted rather than held.
+"""
+
+import asyncio
+import os
+import threading
+from collections import deque
+from logging import getLogger
+import sqlalchemy
+from services.utils import SESSIONLOCAL
+
+logger = getLogger("uvicorn.info")
+
+# the column types are left to the database, as the raw inserts did
+FAILURES = sqlalchemy.table(
+    "failures",
+    sqlalchemy.column("id"),
+    sqlalchemy.column("occurred_at"),
+    sqlalchemy.column("request"),
+    sqlalchemy.column("response"),
+    sqlalchemy.column("traceback"),
+)
+
+
+class FailureLog:
+    """
+    Thread-safe buffer of failures rows, written in batches.
+
+    `counts` keeps how many rows were recorded, written, dropped because the
+    buffer was full, and lost because the insert they were in failed.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 100,
+        flush_interval: float = 2.0,
+        max_pending: int = 10000,
+    ) -> None:
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.pending: deque[dict] = deque()
+        self.counts = dict(recorded=0, written=0, dropped=0, failed=0)
+        self.lock = threading.Lock()
+        self._wake: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+
+    def record(self, rows: list[dict]) -> None:
+        with self.lock:
+            room = max(self.max_pending - len(self.pending), 0)
+            self.pending.extend(rows[:room])
+            self.counts["recorded"] += len(rows)
+            self.counts["dropped"] += len(rows[room:])
+            batch_ready = len(self.pending) >= self.batch_size
+        if rows[room:]:
+            logger.warning(f"failure log is full, dropped {len(rows[room:])} row(s)")
+        if batch_ready and self._wake:
+            self._wake.set()
+
+    def _take(self) -> list[dict]:
+        with self.lock:
+            return [
+                self.pending.popleft()
+                for _ in range(min(self.batch_size, len(self.pending)))
+            ]
+
+    def flush(self) -> None:
+        """write everything waiting, a batch per insert. blocks, so
+        the background task runs it in a worker thread"""
+        while batch := self._take():
+            try:
+                with SESSIONLOCAL() as session:
+                    session.execute(sqlalchemy.insert(FAILURES).values(batch))
+                    session.commit()
+            except Exception as e:
+                logger.warning(f"could not write {len(batch)} failure(s): {e}")
+                outcome = "failed"
+            else:
+                outcome = "written"
+            with self.lock:
+                self.counts[outcome] += len(batch)
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await asyncio.to_thread(self.flush)
+
+    async def start(self) -> None:
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """stop the background task and write what's left"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task, self._wake = None, None
+        await asyncio.to_thread(self.flush)
+
+    def stats(self) -> dict[str, int]:
+        with self.lock:
+            return dict(self.counts, pending=len(self.pending))
+
+
+FAILURE_LOG = FailureLog(
+    batch_size=int(os.getenv("FAILURE_LOG_BATCH_SIZE", 100)),
+    flush_interval=float(os.getenv("FAILURE_LOG_FLUSH_INTERVAL", 2.0)),
+    max_pending=int(os.getenv("FAILURE_LOG_MAX_PENDING", 10000)),
+)
@@ -0,0 +1,177 @@
+"""
+Request-level performance metrics.
+
+InstrumentationMiddleware times every request and, through SQLAlchemy's cursor
+events on the engines passed to instrument_engine, counts the SQL statements it
+runs, their total time and the rows they return. Response bytes and whether
+the request's token was found in the auth cache are recorded too.
+
+Each response gets a Server-Timing header with its own numbers, and totals by
+route are served at /metrics in the Prometheus text format.
+"""
+
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+import sqlalchemy
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# set for the life of each request. context is copied into the threadpool
+# that sync dependencies and queries run in, so it's the same object there.
+# background tasks inherit it too, so it stops counting once the response is sent
+_current: ContextVar["RequestMetrics | None"] = ContextVar("metrics", default=None)
+
+
+@dataclass
+class RequestMetrics:
+    seconds: float = 0.0
+    sql_statements: int = 0
+    sql_seconds: float = 0.0
+    sql_rows: int = 0
+    response_bytes: int = 0
+    auth_cache_hits: int = 0
+    auth_cache_misses: int = 0
+    finished: bool = False
+    _started: float = field(default_factory=time.perf_counter, repr=False)
+
+    def finish(self) -> None:
+        """freeze the numbers, once the response has been sent"""
+        if not self.finished:
+            self.seconds = time.perf_counter() - self._started
+            self.finished = True
+
+    def server_timing(self) -> str:
+        app_ms = (time.perf_counter() - self._started) * 1000
+        db_ms = self.sql_seconds * 1000
+        return (
+            f"app;dur={app_ms:.1f}, "
+            f'db;dur={db_ms:.1f};desc="{self.sql_statements} queries"'
+        )
+
+
+TOTALS = [
+    "seconds",
+    "sql_statements",
+    "sql_seconds",
+    "sql_rows",
+    "response_bytes",
+    "auth_cache_hits",
+    "auth_cache_misses",
+]
+
+
+class MetricsStore:
+    """Thread-safe running totals of RequestMetrics by (method, route, status)"""
+
+    def __init__(self) -> None:
+        self.requests: dict[tuple[str, str, int], int] = dict()
+        self.totals: dict[tuple[str, str, int], dict[str, float]] = dict()
+        self.lock = threading.Lock()
+
+    def add(self, labels: tuple[str, str, int], metrics: RequestMetrics) -> None:
+        with self.lock:
+            self.requests[labels] = self.requests.get(labels, 0) + 1
+            totals = self.totals.setdefault(labels, dict.fromkeys(TOTALS, 0))
+            for name in TOTALS:
+                totals[name] += getattr(metrics, name)
+
+    def prometheus(self) -> str:
+        """the totals in the Prometheus text exposition format"""
+        with self.lock:
+            requests = dict(self.requests)
+            totals = {labels: dict(values) for labels, values in self.totals.items()}
+        lines = ["# TYPE http_requests_total counter"]
+        for (method, route, status), count in requests.items():
+            lines.append(
+                f'http_requests_total{{method="{method}",route="{route}",'
+                f'status="{status}"}} {count}'
+            )
+        for name in TOTALS:
+            lines.append(f"# TYPE http_request_{name}_total counter")
+            for (method, route, status), values in totals.items():
+                lines.append(
+                    f'http_request_{name}_total{{method="{method}",route="{route}",'
+                    f'status="{status}"}} {values[name]:g}'
+                )
+        return "\n".join(lines) + "\n"
+
+
+METRICS = MetricsStore()
+
+
+def current() -> RequestMetrics | None:
+    """the metrics of the request being served, if its response isn't sent yet"""
+    if (metrics := _current.get()) and not metrics.finished:
+        return metrics
+    return None
+
+
+def count_auth_cache(hit: bool) -> None:
+    if metrics := current():
+        if hit:
+            metrics.auth_cache_hits += 1
+        else:
+            metrics.auth_cache_misses += 1
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info["query_started"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if metrics := current():
+        metrics.sql_statements += 1
+        metrics.sql_seconds += time.perf_counter() - conn.info["query_started"]
+        # -1 when the driver can't tell, i.e. before a SELECT is fetched on sqlite
+        metrics.sql_rows += max(cursor.rowcount, 0)
+
+
+def instrument_engine(engine: sqlalchemy.Engine) -> None:
+    sqlalchemy.event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    sqlalchemy.event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class InstrumentationMiddleware:
+    """
+    Collects RequestMetrics for each HTTP request, adds its Server-Timing
+    header and adds it to METRICS under the route it matched. Outermost, so
+    the bytes counted are the ones sent.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        status = 500
+
+        async def send_with_metrics(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                MutableHeaders(scope=message).append(
+                    "Server-Timing", metrics.server_timing()
+                )
+            elif message["type"] == "http.response.body":
+                metrics.response_bytes += len(message.get("body", b""))
+            await send(message)
+            # Starlette only returns once background tasks are done,
+            # which shouldn't count towards the request
+            if message["type"] == "http.response.body" and not message.get(
+                "more_body", False
+            ):
+                metrics.finish()
+
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            _current.reset(token)
+            metrics.finish()
+            # the route's path template, so ids don't make a series each
+            route = getattr(scope.get("route"), "path", "unmatched")
+            METRICS.add((scope["method"], route, status), metrics)
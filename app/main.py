@@ -1,16 +1,30 @@
 __version__ = "1.0.1"
 import os
-from fastapi import FastAPI, Depends, Request, status
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Depends, HTTPException, Request, status
 from fastapi.responses import JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
-from starlette.responses import StreamingResponse, RedirectResponse
+from starlette.responses import RedirectResponse
 
-from app import resources, middleware_handlers, auth
-from services.utils import get_db
+from app import resources, middleware_handlers, auth, warmup, instrumentation
+from app.failure_log import FAILURE_LOG
+from entities import pdf
+from services.utils import get_db, ENGINE, POOL_STATS
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
-app = FastAPI(title="SCA Commissions API", version=__version__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await warmup.start()
+    await FAILURE_LOG.start()
+    yield
+    warmup.stop()
+    await FAILURE_LOG.stop()
+    pdf.shutdown_pool()
+
+
+app = FastAPI(title="SCA Commissions API", version=__version__, lifespan=lifespan)
 ORIGINS = os.getenv("ORIGINS")
 ORIGINS_REGEX = os.getenv("ORIGINS_REGEX")
 TRIGRAM_SIMILARITY_THRESHOLD = os.getenv("TRIGRAM_THRESHOLD", default=0.7)
@@ -23,29 +37,10 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
-
-
-@app.middleware("http")
-async def format_responses_to_jsonapi_spec(request: Request, call_next):
-    """
-    Many default responses from routes are not to JSON:API specifications for
-    one reason or another.
-    This middleware acts as a router based on response code so that
-    the response body can be prepared to JSON:API spec (if needed) and returned
-    """
-
-    response: StreamingResponse = await call_next(request)
-
-    if response.status_code >= 500:
-        return await middleware_handlers.handle_500_range(response)
-    elif response.status_code >= 400:
-        return await middleware_handlers.handle_400_range(request, response)
-    elif response.status_code >= 300:
-        return await middleware_handlers.handle_300_range(response)
-    elif response.status_code >= 200:
-        return await middleware_handlers.handle_200_range(response)
-    else:
-        return response
+app.add_middleware(middleware_handlers.JSONAPIErrorMiddleware)
+app.add_middleware(instrumentation.InstrumentationMiddleware)
+instrumentation.instrument_engine(ENGINE)
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
 
 
 @app.get("/representatives/lookup-by-location")
@@ -101,3 +96,30 @@ app.include_router(resources.manufacturers, dependencies=PROTECTED)
 @app.get("/")
 async def home():
     return RedirectResponse("/redoc")
+
+
+@app.get("/ready")
+async def ready() -> JSONResponse:
+    """for readiness checks, 503 until the startup warm-up has succeeded"""
+    if warmup.READY.is_set():
+        return JSONResponse(content={"ready": True})
+    return JSONResponse(content={"ready": False}, status_code=503)
+
+
+@app.get("/metrics")
+async def metrics(request: Request) -> Response:
+    """request totals by route, and the state of the connection pool and
+    failures log, for Prometheus. METRICS_TOKEN is required as the bearer
+    token, and without one set, there are no metrics to get"""
+    if not METRICS_TOKEN:
+        raise HTTPException(404, detail="Not Found")
+    if request.headers.get("Authorization") != f"Bearer {METRICS_TOKEN}":
+        raise HTTPException(401, detail="metrics token required")
+    gauges = [
+        "# TYPE db_pool gauge",
+        *(f'db_pool{{stat="{k}"}} {v}' for k, v in POOL_STATS.status().items()),
+        "# TYPE failure_log gauge",
+        *(f'failure_log{{stat="{k}"}} {v}' for k, v in FAILURE_LOG.stats().items()),
+    ]
+    body = instrumentation.METRICS.prometheus() + "\n".join(gauges) + "\n"
+    return Response(body, media_type="text/plain; version=0.0.4")
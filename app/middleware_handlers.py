@@ -3,41 +3,63 @@ from uuid import uuid4
 from datetime import datetime
 from fastapi import Response, Request
 from starlette.responses import JSONResponse
-from services.utils import SESSIONLOCAL
-from sqlalchemy import text
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.failure_log import FAILURE_LOG
 
 
-async def read_response_body(iterator) -> dict:
+class JSONAPIErrorMiddleware:
     """
-    builds the full content body of the response from the StreamingResponse
-    bytes -> dict
-    Returns: dict
+    Many default responses from routes are not to JSON:API specifications for
+    one reason or another. This rewrites the 4xx responses, which are, to
+    JSON:API error objects with handle_400_range.
+
+    Every other response, streaming or not, is passed through message by
+    message, so it's never buffered, parsed or re-encoded.
     """
-    return json.loads("".join([data.decode() async for data in iterator]))
 
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
 
-async def handle_200_range(response: Response) -> Response:
-    return response
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        error_start: Message | None = None
+        error_body: list[bytes] = []
 
+        async def send_or_collect_error(message: Message) -> None:
+            nonlocal error_start
+            if message["type"] == "http.response.start":
+                if 400 <= message["status"] < 500:
+                    error_start = message
+                    return
+            if error_start is None:
+                return await send(message)
+            error_body.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                response = await handle_400_range(
+                    Request(scope),
+                    error_start["status"],
+                    error_start["headers"],
+                    b"".join(error_body),
+                )
+                await response(scope, receive, send)
 
-async def handle_300_range(response: Response) -> Response:
-    return response
+        await self.app(scope, receive, send_or_collect_error)
 
 
-async def handle_400_range(request: Request, response: Response) -> Response:
+async def handle_400_range(
+    request: Request,
+    status_code: int,
+    raw_headers: list[tuple[bytes, bytes]],
+    body: bytes,
+) -> Response:
 
-    response_headers = {
-        key.decode(): value.decode() for key, value in response.headers.raw
-    }
-    del response_headers["content-length"]
+    response_headers = {key.decode(): value.decode() for key, value in raw_headers}
+    response_headers.pop("content-length", None)
 
-    resp_body = await read_response_body(response.body_iterator)
-    resp_body.update({"status": response.status_code})
+    resp_body = json.loads(body)
+    resp_body.update({"status": status_code})
     jsonapi_err_response_content = {"errors": []}
-    failures_table_insert_sql = (
-        "INSERT INTO failures VALUES(:uuid,:now,:request,:response,:traceback);"
-    )
-    session = SESSIONLOCAL()
     request_headers = [
         (key.decode(), value.decode()) for key, value in request.headers.raw
     ]
@@ -46,12 +68,13 @@ async def handle_400_range(request: Request, response: Response) -> Response:
     match resp_body:
         case {"detail": {"errors": [*error_objs]}}:
             result = []
+            failures = []
             for error in error_objs:
                 error: dict
                 id_alt = uuid4()
                 params = {
-                    "uuid": error.get("id", str(id_alt)),
-                    "now": datetime.utcnow(),
+                    "id": error.get("id", str(id_alt)),
+                    "occurred_at": datetime.utcnow(),
                     "request": json.dumps(
                         {"headers": request_headers, "query": request_query}
                     ),
@@ -62,23 +85,22 @@ async def handle_400_range(request: Request, response: Response) -> Response:
                     error.pop("traceback")
                 if not error.get("id", None):
                     error.update({"id": str(id_alt)})
-                error["detail"] = error["detail"].format(id_=str(params["uuid"]))
+                error["detail"] = error["detail"].format(id_=str(params["id"]))
                 result.append(error)
-                session.execute(text(failures_table_insert_sql), params)
-            session.commit()
-            session.close()
+                failures.append(params)
+            FAILURE_LOG.record(failures)
             # error object response
             jsonapi_err_response_content = resp_body["detail"]
             jsonapi_err_response_content["errors"] = result
 
             return JSONResponse(
                 content=jsonapi_err_response_content,
-                status_code=response.status_code,
+                status_code=status_code,
                 headers=response_headers,
                 media_type="application/json",
             )
 
-    if response.status_code == 422:
+    if status_code == 422:
         for err in resp_body["detail"]:
             err_detail: str = str(err["msg"])
             if len(err["loc"]) > 1:
@@ -89,7 +111,7 @@ async def handle_400_range(request: Request, response: Response) -> Response:
             err_title = err["type"]
             jsonapi_err_response_content["errors"].append(
                 {
-                    "status": response.status_code,
+                    "status": status_code,
                     "detail": err_detail,
                     "title": err_title,
                     "field": err_field,
@@ -97,14 +119,9 @@ async def handle_400_range(request: Request, response: Response) -> Response:
             )
     else:
         jsonapi_err_response_content["errors"].append(resp_body)
-    session.close()
     return JSONResponse(
         content=jsonapi_err_response_content,
-        status_code=response.status_code,
+        status_code=status_code,
         headers=response_headers,
         media_type="application/json",
     )
-
-
-async def handle_500_range(response: Response) -> Response:
-    return response
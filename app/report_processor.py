@@ -1,10 +1,14 @@
 import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Type
+from typing import Iterator, Type
 import pandas as pd
 import requests as r
 from sqlalchemy.orm import Session
-from Levenshtein import ratio, jaro_winkler
 from logging import getLogger
 from pprint import pprint
 
@@ -12,10 +16,57 @@ from entities.preprocessor import AbstractPreProcessor
 from entities.commission_data import PreProcessedData
 from entities.submission import NewSubmission
 from entities.user import User
-from services import get, post, patch, s3
+from services import get, post, patch, s3, preprocessed_cache
 
 PREFIX_WEIGHT = 0.3
 logger = getLogger("uvicorn.info")
+# the steps of process_and_commit, each a Processor method, timed separately
+STAGES = (
+    "preprocess",
+    "insert_submission_id",
+    "insert_user_id",
+    "insert_report_id",
+    "add_branch_id",
+    "drop_extra_columns",
+    "insert_recorded_at_column",
+    "register_commission_data",
+)
+# tracemalloc slows down every allocation in the process while it's on,
+# requests served alongside an upload included, so peak memory is opt-in.
+# wall time, CPU time and rows are always recorded
+STAGE_MEMORY_PROFILING = os.getenv("STAGE_MEMORY_PROFILING", "false").lower() == "true"
+# the entity matching model, served on its own
+MODEL_SERVICE_URL = os.getenv(
+    "MODEL_SERVICE_URL",
+    "http://predictionservice.us-east-1.elasticbeanstalk.com/cmmssns/entity-matching",
+)
+_tracing_lock = threading.Lock()
+_tracing_submissions = 0
+
+
+@contextmanager
+def memory_tracing() -> Iterator[None]:
+    """
+    tracemalloc on for as long as any submission is being processed.
+
+    Tracing is process-wide, so while submissions overlap, the peak
+    memory of a stage includes what the others allocated at the same time.
+    """
+    global _tracing_submissions
+    if not STAGE_MEMORY_PROFILING:
+        yield
+        return
+    with _tracing_lock:
+        if _tracing_submissions == 0:
+            tracemalloc.start()
+        _tracing_submissions += 1
+    try:
+        yield
+    finally:
+        with _tracing_lock:
+            _tracing_submissions -= 1
+            if _tracing_submissions == 0:
+                tracemalloc.stop()
 
 
 class EmptyTableException(Exception):
@@ -53,6 +104,7 @@ class Processor:
     territory: list[str]
     customer_branch_proportions: pd.DataFrame
     specified_customer: tuple[int, str]
+    stage_metrics: list[dict]
 
     def __init__(
         self,
@@ -64,6 +116,7 @@ class Processor:
     ):
 
         self.skip = False
+        self.stage_metrics = []
         self.session = session
         self.user_id = user.id(self.session) if user.verified else None
         self.user_name = user.domain(name_only=True)
@@ -222,6 +275,14 @@ class Processor:
             "customer_proportions_by_state": self.customer_branch_proportions,
             "column_names": self.column_names,
         }
+        cache_key = preprocessed_cache.cache_key(
+            file, self.user_id, self.report_id, self.preprocessor, optional_params
+        )
+        if (cached := preprocessed_cache.load(cache_key)) is not None:
+            logger.info("preprocessed data loaded from the cache")
+            self.ppdata = PreProcessedData(cached)
+            self.staged_data = cached.copy()
+            return self
         try:
             ppdata: PreProcessedData = preprocessor.preprocess(**optional_params)
         except Exception:
@@ -229,6 +290,9 @@ class Processor:
                 "There was an error attempting to process the file",
                 submission_id=sub_id,
             )
+        finally:
+            file.clear_cache()
+        preprocessed_cache.store(cache_key, ppdata.data)
 
         self.ppdata = ppdata
         self.staged_data = ppdata.data.copy()
@@ -255,6 +319,8 @@ class Processor:
     def model_match(self, unmatched_rows: pd.DataFrame) -> pd.DataFrame:
         """Using a Random Forest Classifier, attempt to match entities.
         If no match is predicted, assign a special default UNKNOWN customer."""
+        # imported on first use, to keep it out of app startup
+        from Levenshtein import ratio, jaro_winkler
 
         def indel_score(row: pd.Series) -> float:
             novel_value = row["match_string"]
@@ -295,10 +361,6 @@ class Processor:
         DEFAULT_UNMATCHED_ENTITY = get.default_unknown_customer(
             db=self.session, user_id=self.user_id
         )
-        MODEL_SERVICE_URL = (
-            "http://predictionservice.us-east-1.elasticbeanstalk.com"
-            "/cmmssns/entity-matching"
-        )
         try:
             resp = r.get(MODEL_SERVICE_URL + "/model-features")
             model_features = resp.json().get("data")
@@ -373,20 +435,66 @@ class Processor:
         logger.info("finished matches")
         return rows
 
-    def process_and_commit(self) -> int:
+    def rows_staged(self) -> int | None:
+        staged_data = getattr(self, "staged_data", None)
+        return None if staged_data is None else len(staged_data)
+
+    def run_stage(self, stage: str) -> "Processor":
+        """
+        Run the Processor method named stage, recording its wall time,
+        CPU time (of this thread), rows of staged data before and after,
+        and peak traced memory in stage_metrics, even if the stage fails.
+        """
+        rows_in = self.rows_staged()
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        wall_start, cpu_start = time.perf_counter(), time.thread_time()
         try:
-            (
-                self.set_submission_status("PROCESSING")
-                .preprocess()
-                .insert_submission_id()
-                .insert_user_id()
-                .insert_report_id()
-                .add_branch_id()
-                .drop_extra_columns()
-                .insert_recorded_at_column()
-                .register_commission_data()
-                .set_submission_status("COMPLETE")
+            return getattr(self, stage)()
+        finally:
+            self.stage_metrics.append(
+                {
+                    "stage": stage,
+                    "position": len(self.stage_metrics),
+                    "wall_seconds": time.perf_counter() - wall_start,
+                    "cpu_seconds": time.thread_time() - cpu_start,
+                    "rows_in": rows_in,
+                    "rows_out": self.rows_staged(),
+                    "peak_memory_bytes": (
+                        tracemalloc.get_traced_memory()[1]
+                        if tracemalloc.is_tracing()
+                        else None
+                    ),
+                }
             )
+
+    def save_stage_metrics(self) -> None:
+        """metrics are only diagnostic, so failing to save them is only logged"""
+        if not self.stage_metrics or not self.submission_id:
+            return
+        recorded_at = datetime.now()
+        records = [
+            dict(
+                metrics,
+                submission_id=self.submission_id,
+                user_id=self.user_id,
+                recorded_at=recorded_at,
+            )
+            for metrics in self.stage_metrics
+        ]
+        try:
+            post.stage_metrics(db=self.session, records=records)
+        except Exception as e:
+            self.session.rollback()
+            logger.warning(f"could not save stage metrics: {e}")
+
+    def process_and_commit(self) -> int:
+        try:
+            self.set_submission_status("PROCESSING")
+            with memory_tracing():
+                for stage in STAGES:
+                    self.run_stage(stage)
+            self.set_submission_status("COMPLETE")
         except EmptyTableException as empty_table:
             if empty_table.set_complete:
                 self.set_submission_status("COMPLETE")
@@ -403,4 +511,7 @@ class Processor:
             raise FileProcessingError(
                 err, submission_id=self.submission_id if self.submission_id else None
             )
+        finally:
+            self.save_stage_metrics()
+            self.submission.file.close()
         return self.submission_id
@@ -2,8 +2,9 @@ import calendar
 import secrets
 import json
 from os import getenv
-from typing import Optional
+from typing import Optional, Literal
 from datetime import datetime, timedelta
+from tempfile import SpooledTemporaryFile
 
 from dotenv import load_dotenv
 
@@ -15,17 +16,17 @@ from fastapi import APIRouter, HTTPException, UploadFile, Depends, Form, Backgro
 from app import report_processor
 from entities import submission
 from entities.manufacturers import MFG_PREPROCESSORS
-from entities.commission_file import CommissionFile
+from entities.commission_file import CommissionFile, SPOOL_MAX_SIZE
 from services import get, post, patch, delete, s3
 from jsonapi.jsonapi import Query, convert_to_jsonapi, JSONAPIRoute
-from services.utils import User, get_db, get_user
+from services.utils import User, DuplicateSubmission, get_db, get_user
 
 
 router = APIRouter(prefix="/commission-data", route_class=JSONAPIRoute)
+UPLOAD_CHUNK_SIZE = 1024 * 1024
 
 
-class CommissionDataDownloadParameters(BaseModel):
-    filename: str | None = "commissions"
+class CommissionDataFilters(BaseModel):
     startDate: str | None = None
     endDate: str | None = None
     manufacturer_id: int | None = None
@@ -35,6 +36,19 @@ class CommissionDataDownloadParameters(BaseModel):
     representative_id: int | None = None
 
 
+class CommissionDataDownloadParameters(CommissionDataFilters):
+    filename: str | None = "commissions"
+
+
+class CommissionDataAggregateParameters(CommissionDataFilters):
+    group_by: list[Literal["manufacturer", "customer", "rep", "state", "year", "month"]]
+    measures: list[Literal["inv_amt", "comm_amt", "row_count"]] = [
+        "inv_amt",
+        "comm_amt",
+        "row_count",
+    ]
+
+
 @router.get("", tags=["commissions"])
 async def commission_data(
     query: Query = Depends(),
@@ -45,6 +59,29 @@ async def commission_data(
     return get.commission_data(db, jsonapi_query, user)
 
 
+@router.post("/aggregate", tags=["commissions"])
+async def commission_data_aggregate(
+    query_params: CommissionDataAggregateParameters,
+    db: Session = Depends(get_db),
+    user: User = Depends(get_user),
+):
+    """
+    Sums commission data by the requested dimensions (group_by) in the database.
+    Accepts the same filters as the download.
+    """
+    filters = query_params.model_dump(
+        exclude_none=True, exclude={"group_by", "measures"}
+    )
+    data = get.commission_data_aggregate(
+        db,
+        group_by=list(dict.fromkeys(query_params.group_by)),
+        measures=list(dict.fromkeys(query_params.measures)),
+        user_id=user.id(db=db),
+        **filters,
+    )
+    return {"data": data}
+
+
 @router.get("/{row_id}", tags=["commissions"])
 async def get_commission_data_row(
     row_id: int,
@@ -107,49 +144,55 @@ async def process_data_from_a_file(
     user: User = Depends(get_user),
 ):
 
-    existing_submissions = get.all_submissions(db=db, user=user)
-    existing_submission = existing_submissions.loc[
-        (existing_submissions["reporting_month"] == reporting_month)
-        & (existing_submissions["reporting_year"] == reporting_year)
-        & (existing_submissions["report_id"] == report_id)
-    ]
+    existing_submission = get.existing_submission(
+        db, user.id(db=db), report_id, reporting_year, reporting_month
+    )
+    if existing_submission:
+        raise already_submitted(existing_submission)
 
-    if not existing_submission.empty:
-        report_name = existing_submission["report_name"].squeeze()
-        manuf = existing_submission["name"].squeeze()
-        date_ = datetime.strftime(
-            existing_submission["submission_date"].squeeze(), "%m/%d/%Y %I:%M %p"
+    try:
+        new_submission_id = await process_commissions_file(
+            file,
+            report_id,
+            reporting_month,
+            reporting_year,
+            manufacturer_id,
+            total_commission_amount,
+            file_password,
+            total_freight_amount,
+            total_rebate_credits,
+            additional_file_1,
+            db,
+            user,
+            bg_tasks,
         )
-        report_month = calendar.month_name[
-            existing_submission["reporting_month"].squeeze()
-        ]
-        report_year = str(existing_submission["reporting_year"].squeeze())
-        id_ = str(existing_submission["id"].squeeze())
-        msg = (
-            f"The {report_name} report for {manuf} for reporting period "
-            f"{report_month} {report_year} was already submitted at "
-            f"{date_} with id {id_}"
+    except DuplicateSubmission:
+        existing_submission = get.existing_submission(
+            db, user.id(db=db), report_id, reporting_year, reporting_month
         )
-        raise HTTPException(400, detail=msg)
-
-    new_submission_id = await process_commissions_file(
-        file,
-        report_id,
-        reporting_month,
-        reporting_year,
-        manufacturer_id,
-        total_commission_amount,
-        file_password,
-        total_freight_amount,
-        total_rebate_credits,
-        additional_file_1,
-        db,
-        user,
-        bg_tasks,
-    )
+        raise already_submitted(existing_submission)
     return get.submissions(db=db, submission_id=new_submission_id, query={}, user=user)
 
 
+def already_submitted(existing_submission: dict | None) -> HTTPException:
+    # the submission that won a race for the reporting period may be gone by now
+    if not existing_submission:
+        return HTTPException(
+            400, detail="This report was already submitted for this reporting period"
+        )
+    date_ = datetime.strftime(
+        existing_submission["submission_date"], "%m/%d/%Y %I:%M %p"
+    )
+    report_month = calendar.month_name[existing_submission["reporting_month"]]
+    msg = (
+        f"The {existing_submission['report_name']} report for "
+        f"{existing_submission['name']} for reporting period "
+        f"{report_month} {existing_submission['reporting_year']} was already "
+        f"submitted at {date_} with id {existing_submission['id']}"
+    )
+    return HTTPException(400, detail=msg)
+
+
 async def process_commissions_file(
     file: UploadFile,
     report_id: int,
@@ -166,44 +209,59 @@ async def process_commissions_file(
     bg_tasks: BackgroundTasks,  # passed directly from the calling route
 ) -> int:
 
-    file_contents = await file.read()
+    # copy the upload into a buffer owned by the submission in chunks,
+    # since the request's file is closed before the background task runs
+    file_contents = SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        file_contents.write(chunk)
     file_obj = CommissionFile(
         file_data=file_contents,
         file_password=file_password,
         file_mime=file.content_type,
         file_name=file.filename,
     )
-    manf_name = get.manufacturers(
-        db=session, query={}, user=user, manuf_id=manufacturer_id
-    )["data"]["attributes"]["name"]
-
-    new_sub = submission.NewSubmission(
-        file_obj,
-        reporting_month,
-        reporting_year,
-        report_id,
-        manufacturer_id,
-        manf_name,
-        user.id(session),
-        user.domain(name_only=True),
-        total_commission_amount,
-        total_freight_amount,
-        additional_file_1,
-        total_rebate_credits,
-    )
+    # closed by process_and_commit, or here if it never gets that far
+    try:
+        manf_name = get.manufacturers(
+            db=session, query={}, user=user, manuf_id=manufacturer_id
+        )["data"]["attributes"]["name"]
 
-    mfg_preprocessor = MFG_PREPROCESSORS.get(manufacturer_id)
-    submission_id = post.submission(db=session, submission=new_sub)
-    mfg_report_processor = report_processor.Processor(
-        session=session,
-        user=user,
-        preprocessor=mfg_preprocessor,
-        submission=new_sub,
-        submission_id=submission_id,
-    )
+        new_sub = submission.NewSubmission(
+            file_obj,
+            reporting_month,
+            reporting_year,
+            report_id,
+            manufacturer_id,
+            manf_name,
+            user.id(session),
+            user.domain(name_only=True),
+            total_commission_amount,
+            total_freight_amount,
+            additional_file_1,
+            total_rebate_credits,
+        )
+
+        mfg_preprocessor = MFG_PREPROCESSORS.get(manufacturer_id)
+        submission_id = post.submission(db=session, submission=new_sub)
+        # the upload runs in a worker thread while the processor loads its reference
+        # data. it has to finish before preprocessing starts, since both read the
+        # same buffer
+        upload = s3.start_upload(file_obj, new_sub.s3_key)
+        try:
+            mfg_report_processor = report_processor.Processor(
+                session=session,
+                user=user,
+                preprocessor=mfg_preprocessor,
+                submission=new_sub,
+                submission_id=submission_id,
+            )
+        finally:
+            await upload
+    except BaseException:
+        file_obj.close()
+        raise
     # BUG only the first bg_task will run if more are added, otherwise this would be added.
     # CONSIDER CELERY
-    s3.upload_file(file_obj, new_sub.s3_key)
     bg_tasks.add_task(mfg_report_processor.process_and_commit)
     return submission_id
 
@@ -26,6 +26,8 @@ async def get_submission_by_id(
         db: Session=Depends(get_db),
         user: User=Depends(get_user)
     ):
+    """`include=stage-metrics` adds the time, rows and memory
+    of each stage of processing the submission's file"""
     jsonapi_query = convert_to_jsonapi(query)
     raw_result = get.submissions(db,jsonapi_query,user,submission_id)
     
@@ -0,0 +1,77 @@
+"""
+Loading of the reference data read on every request or upload (user ids by
+domain, manufacturer preprocessors, commission rates, territories and report
+column names) into the in-process caches before the app takes traffic, so the
+first requests after a deploy or restart are as fast as the ones after them.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from logging import getLogger
+from entities.manufacturers import MFG_PREPROCESSORS
+from entities.user import load_user_ids
+from services import get
+from services.utils import REFERENCE_CACHE, SESSIONLOCAL
+
+logger = getLogger("uvicorn.info")
+
+# seconds startup waits for the first warm-up attempt before serving without it
+WARMUP_TIMEOUT = float(os.getenv("WARMUP_TIMEOUT", 30))
+# longest wait between attempts, which start at 1 s and double after each failure
+WARMUP_RETRY_MAX = float(os.getenv("WARMUP_RETRY_MAX", 60))
+READY = threading.Event()
+_attempted = threading.Event()
+_stopping = threading.Event()
+
+
+def warm_up_once() -> None:
+    start = time.perf_counter()
+    with SESSIONLOCAL() as db:
+        load_user_ids(db)
+        REFERENCE_CACHE.set_many(get.reference_data(db))
+    MFG_PREPROCESSORS.preload()
+    logger.info(f"warm-up finished in {time.perf_counter() - start:.2f} s")
+
+
+def warm_up() -> None:
+    """
+    Fill the caches, retrying with backoff until it works or the app stops.
+    READY is only set once it has worked. Until then, the caches fill on
+    first use and /ready answers 503.
+    """
+    delay = 1.0
+    while not _stopping.is_set():
+        try:
+            warm_up_once()
+        except Exception as e:
+            logger.warning(f"warm-up failed, retrying in {delay:.0f} s: {e}")
+        else:
+            READY.set()
+            return
+        finally:
+            _attempted.set()
+        _stopping.wait(delay)
+        delay = min(delay * 2, WARMUP_RETRY_MAX)
+
+
+async def start() -> None:
+    """
+    Run warm_up in its own thread and wait for its first attempt, for up to
+    WARMUP_TIMEOUT seconds. Called from the app's lifespan, so the server
+    doesn't accept connections until it returns. If the first attempt fails
+    or is still running, warm_up carries on in the background.
+    """
+    _attempted.clear()
+    _stopping.clear()
+    threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+    if not await asyncio.to_thread(_attempted.wait, WARMUP_TIMEOUT):
+        logger.warning(
+            f"warm-up still running after {WARMUP_TIMEOUT} s, serving without it"
+        )
+
+
+def stop() -> None:
+    """end any retries. called from the app's lifespan at shutdown"""
+    _stopping.set()
@@ -0,0 +1,105 @@
+"""
+Wall-clock time of a cold start (importing app.main in a fresh interpreter),
+and of the first lookup of a manufacturer's preprocessor after it.
+
+The app is pointed at a throwaway SQLite database with a manufacturers table
+naming every module in entities/manufacturers, so no real database is needed.
+
+With --profile, also reports the modules that took the longest to import,
+from python's -X importtime, by their own time and including their imports.
+
+Usage: python -m benchmarks.cold_start [--runs 5] [--profile 20]
+"""
+
+import argparse
+import os
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+
+MANUFACTURERS_DIR = os.path.join("entities", "manufacturers")
+COLD_START = """
+import time
+start = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+from entities.manufacturers import MFG_PREPROCESSORS
+MFG_PREPROCESSORS.get(1)
+print(imported - start, time.perf_counter() - imported)
+"""
+
+
+def make_database(path: str) -> None:
+    names = sorted(
+        module.removesuffix(".py")
+        for module in os.listdir(MANUFACTURERS_DIR)
+        if module.endswith(".py") and not module.startswith("__")
+    )
+    with sqlite3.connect(path) as db:
+        db.execute(
+            "CREATE TABLE manufacturers "
+            "(id INTEGER PRIMARY KEY, name TEXT, deleted TIMESTAMP, user_id INTEGER)"
+        )
+        db.executemany(
+            "INSERT INTO manufacturers (id, name) VALUES (?, ?)",
+            enumerate(names, start=1),
+        )
+
+
+def import_times(env: dict[str, str]) -> list[tuple[str, int, int]]:
+    """(module, self, cumulative) import times in microseconds, for app.main"""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    times = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line.removeprefix("import time:").split("|")
+        times.append((module.strip(), int(self_us), int(cumulative_us)))
+    return times
+
+
+def print_profile(times: list[tuple[str, int, int]], top: int) -> None:
+    for label, column in (("self", 1), ("cumulative", 2)):
+        print(f"\nslowest imports by {label} time:")
+        for entry in sorted(times, key=lambda t: t[column], reverse=True)[:top]:
+            print(f"  {entry[column] / 1000:8.1f} ms  {entry[0]}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--profile", type=int, default=0, metavar="TOP")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cold_start.db")
+        make_database(path)
+        env = {**os.environ, "DATABASE_URL": f"sqlite:///{path}"}
+        env.pop("TESTING_DATABASE_URL", None)
+        if args.profile:
+            print_profile(import_times(env), args.profile)
+        imports, lookups = [], []
+        for _ in range(args.runs):
+            output = subprocess.run(
+                [sys.executable, "-c", COLD_START],
+                env=env,
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.split()
+            imports.append(float(output[0]))
+            lookups.append(float(output[1]))
+    print(f"import app.main: {statistics.median(imports):6.2f} s (median)")
+    print(f"   first lookup: {statistics.median(lookups):6.2f} s (median)")
+
+
+if __name__ == "__main__":
+    main()
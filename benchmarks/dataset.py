@@ -0,0 +1,293 @@
+"""
+A generated dataset in a throwaway Postgres schema, for the benchmarks that run
+the app against a real database.
+
+The tables are created from db.models. The views the app reads that aren't
+models are created too, with stand-in definitions giving the columns it uses.
+Each user gets customers with branches in generated locations, the UNMAPPED
+customer unmatched rows default to, an Atco manufacturer with its standard
+report and column names, and aliases (id string matches) for some of their
+branches. seed_commission_data adds submissions with commission data.
+
+Point the app at the schema by setting DATABASE_URL to schema_url(...) before
+anything imports services.utils.
+"""
+
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+
+import sqlalchemy
+from sqlalchemy.engine import make_url
+
+from db import models
+
+MANUFACTURER = "atco"
+REPORT = "standard"
+COLUMN_NAMES = {
+    "customer": "sortname",
+    "city": "shiptocity",
+    "state": "shiptostate",
+    "sales": "ttlsaleslessfrtandepd",
+    "commissions": "commissionearned",
+}
+STATES = ("AL", "FL", "GA", "MS", "NC", "SC", "TN")
+VIEWS = (
+    """
+    CREATE VIEW branches_w_std_aliases AS
+    SELECT cb.id AS branch_id,
+        c.name || '_' || l.city || '_' || l.state AS entity_alias,
+        cb.user_id
+    FROM customer_branches AS cb
+    JOIN customers AS c ON c.id = cb.customer_id
+    JOIN locations AS l ON l.id = cb.location_id
+    WHERE cb.deleted IS NULL
+    """,
+    """
+    CREATE VIEW branch_lookup AS
+    SELECT cb.id, c.name AS customer, l.city, l.state, cb.customer_id, cb.user_id
+    FROM customer_branches AS cb
+    JOIN customers AS c ON c.id = cb.customer_id
+    JOIN locations AS l ON l.id = cb.location_id
+    WHERE cb.deleted IS NULL
+    """,
+)
+
+
+@dataclass
+class Branch:
+    id: int
+    customer: str
+    city: str
+    state: str
+
+    @property
+    def id_string(self) -> str:
+        """as the atco standard report's preprocessing builds it"""
+        return f"{self.customer}_{self.city}_{self.state}"
+
+
+@dataclass
+class SeededUser:
+    id: int
+    domain: str
+    manufacturer_id: int
+    report_id: int
+    branches: list[Branch] = field(default_factory=list)
+
+
+def schema_url(url: str, schema: str) -> str:
+    """url with the schema first on the search path of every connection"""
+    url = make_url(url.replace("postgres://", "postgresql://"))
+    url = url.update_query_dict({"options": f"-csearch_path={schema}"})
+    return url.render_as_string(hide_password=False)
+
+
+def create_schema(url: str, schema: str) -> sqlalchemy.Engine:
+    """a new, empty schema with the app's tables and views,
+    and an engine whose connections use it"""
+    with sqlalchemy.create_engine(url).begin() as conn:
+        conn.execute(sqlalchemy.text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+        conn.execute(sqlalchemy.text(f"CREATE SCHEMA {schema}"))
+    engine = sqlalchemy.create_engine(schema_url(url, schema))
+    models.Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        for view in VIEWS:
+            conn.execute(sqlalchemy.text(view))
+    return engine
+
+
+def drop_schema(url: str, schema: str) -> None:
+    with sqlalchemy.create_engine(url).begin() as conn:
+        conn.execute(sqlalchemy.text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+
+
+def _insert(conn: sqlalchemy.Connection, model, rows: list[dict]) -> list[int]:
+    """insert rows, returning their ids in the same order"""
+    if not rows:
+        return []
+    sql = sqlalchemy.insert(model).returning(model.id, sort_by_parameter_order=True)
+    return conn.execute(sql, rows).scalars().all()
+
+
+def seed(
+    engine: sqlalchemy.Engine,
+    users: int = 5,
+    customers: int = 200,
+    branches: int = 3,
+    aliased: float = 0.8,
+    random_seed: int = 0,
+) -> list[SeededUser]:
+    """
+    `customers` per user, each with up to `branches` branches, and aliases for
+    the `aliased` fraction of each user's branches. Returns what was seeded.
+    """
+    rng = random.Random(random_seed)
+    seeded = []
+    with engine.begin() as conn:
+        cities = [(f"CITY {n}", rng.choice(STATES)) for n in range(customers * 2)]
+        location_ids = _insert(
+            conn,
+            models.Location,
+            [dict(city=city, state=state) for city, state in cities],
+        )
+        locations = list(zip(location_ids, cities))
+        for n in range(users):
+            domain = f"user{n}.com"
+            (user_id,) = _insert(conn, models.User, [dict(company_domain=domain)])
+            (manufacturer_id,) = _insert(
+                conn, models.Manufacturer, [dict(name=MANUFACTURER, user_id=user_id)]
+            )
+            (report_id,) = _insert(
+                conn,
+                models.ManufacturersReport,
+                [
+                    dict(
+                        manufacturer_id=manufacturer_id,
+                        report_name=REPORT,
+                        report_label="Standard",
+                        yearly_frequency=12,
+                        pos_report=False,
+                        user_id=user_id,
+                    )
+                ],
+            )
+            _insert(
+                conn,
+                models.ReportColumnName,
+                [dict(report_id=report_id, **COLUMN_NAMES)],
+            )
+            _insert(
+                conn,
+                models.UserCommissionRate,
+                [
+                    dict(
+                        user_id=user_id,
+                        manufacturer_id=manufacturer_id,
+                        commission_rate=0.03,
+                    )
+                ],
+            )
+            _insert(
+                conn,
+                models.Territory,
+                [
+                    dict(
+                        user_id=user_id,
+                        manufacturer_id=manufacturer_id,
+                        territory=list(STATES),
+                    )
+                ],
+            )
+            names = [f"CUSTOMER {c}" for c in range(customers)] + ["UNMAPPED"]
+            customer_ids = _insert(
+                conn,
+                models.Customer,
+                [dict(name=name, user_id=user_id) for name in names],
+            )
+            branch_rows, branch_info = [], []
+            for customer_id, name in zip(customer_ids, names):
+                count = 1 if name == "UNMAPPED" else rng.randint(1, branches)
+                for location_id, (city, state) in rng.sample(locations, count):
+                    branch_rows.append(
+                        dict(
+                            customer_id=customer_id,
+                            location_id=location_id,
+                            user_id=user_id,
+                        )
+                    )
+                    branch_info.append((name, city, state))
+            branch_ids = _insert(conn, models.CustomerBranch, branch_rows)
+            user = SeededUser(user_id, domain, manufacturer_id, report_id)
+            user.branches = [
+                Branch(id_, *info)
+                for id_, info in zip(branch_ids, branch_info)
+                if info[0] != "UNMAPPED"
+            ]
+            aliases = rng.sample(user.branches, int(len(user.branches) * aliased))
+            _insert(
+                conn,
+                models.IDStringMatch,
+                [
+                    dict(
+                        match_string=branch.id_string,
+                        report_id=report_id,
+                        customer_branch_id=branch.id,
+                        created_at=datetime.now(),
+                        auto_matched=False,
+                        verified=True,
+                        user_id=user_id,
+                    )
+                    for branch in aliases
+                ],
+            )
+            seeded.append(user)
+    return seeded
+
+
+def seed_commission_data(
+    engine: sqlalchemy.Engine,
+    users: list[SeededUser],
+    submissions: int = 12,
+    rows: int = 1000,
+    random_seed: int = 0,
+) -> None:
+    """`submissions` complete monthly submissions of each user's report, each with
+    `rows` rows of commission data for their aliased branches"""
+    rng = random.Random(random_seed)
+    aliases = sqlalchemy.select(
+        models.IDStringMatch.id, models.IDStringMatch.customer_branch_id
+    )
+    with engine.begin() as conn:
+        for user in users:
+            refs = conn.execute(
+                aliases.where(models.IDStringMatch.user_id == user.id)
+            ).all()
+            submission_ids = _insert(
+                conn,
+                models.Submission,
+                [
+                    dict(
+                        submission_date=datetime.now(),
+                        reporting_month=month % 12 + 1,
+                        reporting_year=1990 + month // 12,
+                        report_id=user.report_id,
+                        user_id=user.id,
+                        status="COMPLETE",
+                    )
+                    for month in range(submissions)
+                ],
+            )
+            for submission_id in submission_ids:
+                data = []
+                for ref_id, branch_id in rng.choices(refs, k=rows):
+                    sales = round(rng.uniform(0, 20_000), 2)
+                    data.append(
+                        dict(
+                            submission_id=submission_id,
+                            customer_branch_id=branch_id,
+                            inv_amt=sales,
+                            comm_amt=round(sales * 0.03, 2),
+                            user_id=user.id,
+                            report_branch_ref=ref_id,
+                        )
+                    )
+                _insert(conn, models.CommissionData, data)
+
+
+def sign_in(user: SeededUser) -> str:
+    """a bearer token for the user, already verified, so requests
+    made with it never go out to Auth0"""
+    from app.auth import LocalTokenStore, VerifiedToken
+    from entities.user import User
+
+    token = f"benchmark-{user.domain}"
+    LocalTokenStore.add_token(
+        VerifiedToken(
+            token=token,
+            exp=int(time.time()) + 86400,
+            user=User(user.domain, user.domain, f"user@{user.domain}", verified=True),
+        )
+    )
+    return token
@@ -0,0 +1,76 @@
+"""
+Throughput of concurrent requests to a route querying through the sync Session
+from get_db (as every route does now) vs the AsyncSession from get_async_db.
+
+Needs a database at DATABASE_URL and DB_ASYNC_ENGINE=true. The default query
+holds its connection for a while, as a slow report query would, so that
+blocking the event loop shows.
+
+Usage: python -m benchmarks.db_concurrency [--requests 200] [--concurrency 20]
+    [--query "SELECT pg_sleep(0.05)"]
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+import sqlalchemy
+from fastapi import Depends, FastAPI
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from services import utils
+
+
+def make_app(query: str) -> FastAPI:
+    app = FastAPI()
+    statement = sqlalchemy.text(query)
+
+    @app.get("/sync")
+    async def sync_route(db: Session = Depends(utils.get_db)):
+        db.execute(statement)
+        return {}
+
+    @app.get("/async")
+    async def async_route(db: AsyncSession = Depends(utils.get_async_db)):
+        await db.execute(statement)
+        return {}
+
+    return app
+
+
+async def run(app: FastAPI, path: str, requests: int, concurrency: int) -> float:
+    """requests per second"""
+    limit = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+
+        async def request() -> None:
+            async with limit:
+                response = await client.get(path)
+                response.raise_for_status()
+
+        await request()  # connect outside of the timing
+        start = time.perf_counter()
+        await asyncio.gather(*(request() for _ in range(requests)))
+        return requests / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--query", default="SELECT pg_sleep(0.05)")
+    args = parser.parse_args()
+
+    app = make_app(args.query)
+    for path in ("/sync", "/async"):
+        rate = asyncio.run(run(app, path, args.requests, args.concurrency))
+        print(f"{path:>6}: {rate:8.1f} requests/s")
+    print(f"  sync pool: {utils.POOL_STATS.status()}")
+    print(f" async pool: {utils.ASYNC_POOL_STATS.status()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Wall-clock time and peak RSS of CommissionFile.to_df on a large generated workbook,
+reading with openpyxl vs calamine.
+
+Each step runs in a fresh interpreter, since peak RSS never goes down.
+
+Usage: python -m benchmarks.excel_read [--rows 200000]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.upload_memory import make_workbook, peak_rss_mb
+
+ENGINES = ("openpyxl", "calamine")
+
+
+def run(engine: str, path: str) -> None:
+    from entities import commission_file
+    from entities.commission_file import CommissionFile
+
+    commission_file.CALAMINE_INSTALLED = engine == "calamine"
+    with open(path, "rb") as handler:
+        file = CommissionFile(file_data=handler.read(), file_mime="", file_name="")
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    rows = len(file.to_df())
+    elapsed = time.perf_counter() - start
+    print(
+        f"{engine:>9}: {rows:,} rows in {elapsed:6.2f} s, "
+        f"baseline {baseline:8.1f} MB, peak {peak_rss_mb():8.1f} MB"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--run", choices=["make", *ENGINES])
+    parser.add_argument("--path")
+    args = parser.parse_args()
+
+    if args.run == "make":
+        return make_workbook(args.path, args.rows)
+    elif args.run:
+        return run(args.run, args.path)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "pos.xlsx")
+        for step in ("make", *ENGINES):
+            subprocess.run(
+                [sys.executable, "-m", "benchmarks.excel_read"]
+                + ["--run", step, "--path", path, "--rows", str(args.rows)],
+                check=True,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Per-request cost of the JSON:API error middleware. It compares the pure ASGI
+JSONAPIErrorMiddleware against the BaseHTTPMiddleware function it replaced,
+which drained and rebuilt every error response and wrapped every other one.
+Both are timed against no middleware at all.
+
+Requests go straight to the app through httpx's ASGI transport, so only the
+app and middleware are timed.
+
+Usage: python -m benchmarks.middleware_cost [--requests 2000]
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import httpx
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
+
+from app import middleware_handlers
+
+ROUTES = ("/ok", "/stream", "/not-found", "/invalid?number=x")
+
+
+def make_app(middleware: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ok")
+    async def ok():
+        return {"data": [{"id": i, "type": "customers"} for i in range(50)]}
+
+    @app.get("/stream")
+    async def stream():
+        return StreamingResponse(iter([b"x" * 1024] * 64))
+
+    @app.get("/not-found")
+    async def not_found():
+        raise HTTPException(404, "file not found")
+
+    @app.get("/invalid")
+    async def invalid(number: int):
+        return {}
+
+    match middleware:
+        case "asgi":
+            app.add_middleware(middleware_handlers.JSONAPIErrorMiddleware)
+        case "http":
+
+            @app.middleware("http")
+            async def format_responses_to_jsonapi_spec(request, call_next):
+                response = await call_next(request)
+                if 400 <= response.status_code < 500:
+                    body = b"".join([data async for data in response.body_iterator])
+                    return await middleware_handlers.handle_400_range(
+                        request, response.status_code, response.headers.raw, body
+                    )
+                return response
+
+    return app
+
+
+async def per_request(app: FastAPI, path: str, requests: int) -> float:
+    """microseconds per request"""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        await client.get(path)
+        start = time.perf_counter()
+        for _ in range(requests):
+            await client.get(path)
+        return (time.perf_counter() - start) / requests * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    apps = {name: make_app(name) for name in ("none", "http", "asgi")}
+    print(f"{'route':>18} {'none':>9} {'http':>9} {'asgi':>9}  (us/request)")
+    for path in ROUTES:
+        times = [
+            asyncio.run(per_request(app, path, args.requests)) for app in apps.values()
+        ]
+        print(f"{path:>18} " + " ".join(f"{t:9.1f}" for t in times))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Wall-clock time of extracting the lines of text from a generated PDF,
+reading pages one after another vs across the worker pool in entities.pdf.
+
+Usage: python -m benchmarks.pdf_text [--pages 300]
+"""
+
+import argparse
+import time
+from io import BytesIO
+
+from PyPDF2 import PageObject, PdfReader, PdfWriter
+from PyPDF2.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+LINES_PER_PAGE = 45
+
+
+def make_pdf(pages: int) -> bytes:
+    """a statement-like PDF with a page of customer lines per page"""
+    writer = PdfWriter()
+    font = DictionaryObject(
+        {
+            NameObject("/Type"): NameObject("/Font"),
+            NameObject("/Subtype"): NameObject("/Type1"),
+            NameObject("/BaseFont"): NameObject("/Helvetica"),
+        }
+    )
+    font_ref = writer._add_object(font)
+    for page_number in range(pages):
+        page = PageObject.create_blank_page(width=612, height=792)
+        page[NameObject("/Resources")] = DictionaryObject(
+            {NameObject("/Font"): DictionaryObject({NameObject("/F1"): font_ref})}
+        )
+        lines = [
+            f"LIN {page_number:04d}{line:03d} ACME SUPPLY TAMPA FL $1,{line:03d}.00"
+            for line in range(LINES_PER_PAGE)
+        ]
+        content = "BT /F1 10 Tf 14 TL 36 756 Td " + " ".join(
+            f"({line}) Tj T*" for line in lines
+        )
+        stream = DecodedStreamObject()
+        stream.set_data((content + " ET").encode())
+        page[NameObject("/Contents")] = writer._add_object(stream)
+        writer.add_page(page)
+    buffer = BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def sequential(file_data: bytes) -> list[str]:
+    all_text = ""
+    for page in PdfReader(BytesIO(file_data)).pages:
+        all_text += page.extract_text()
+    return [line.strip() for line in all_text.splitlines() if line.strip()]
+
+
+def main() -> None:
+    from entities import pdf
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=300)
+    args = parser.parse_args()
+
+    file_data = make_pdf(args.pages)
+    start = time.perf_counter()
+    expected = sequential(file_data)
+    print(f"sequential: {time.perf_counter() - start:6.2f} s")
+
+    # start the workers outside of the timing, as a running server would have
+    pdf.text_lines(BytesIO(file_data), "warm up")
+    start = time.perf_counter()
+    lines = pdf.text_lines(BytesIO(file_data), "benchmark")
+    print(f"    pooled: {time.perf_counter() - start:6.2f} s, {pdf.PDF_WORKERS} workers")
+    start = time.perf_counter()
+    pdf.text_lines(BytesIO(file_data), "benchmark")
+    print(f"    cached: {time.perf_counter() - start:6.2f} s")
+    assert lines.tolist() == expected, "pooled extraction differs"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""
+Wall-clock time and peak memory of every manufacturer's PreProcessor on the
+sample files tests/test_preprocessors.py checks, by manufacturer, report and file.
+
+The cases, and the arguments each manufacturer's preprocessors are called with,
+come from the test functions themselves, so a report added there is benchmarked
+too. Excel files are also run scaled up (by default 10x and 100x) by repeating
+the rows below each sheet's header row. PDFs are only run as they are.
+
+Times are the best of --repeat runs. Peak memory is what tracemalloc traces over
+one more run, so it counts numpy and pandas buffers but not the interpreter.
+
+With --save, the results are written to the baseline file, unless a case
+failed. Otherwise they're compared with it, and any case slower or bigger than
+its baseline by more than --threshold, or in the baseline with no result, is
+reported as a regression. The exit status is 1 if a case failed or regressed.
+Baselines are only comparable on the machine they were saved on.
+
+Usage: python -m benchmarks.preprocessors [--scales 10 100] [--repeat 3]
+    [--threshold 0.25] [--baseline PATH] [--save] [--only ENTITY ...]
+"""
+
+import argparse
+import os
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from io import BytesIO
+from typing import Type
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import pandas as pd
+
+from benchmarks.regressions import save_or_check
+from entities import pdf
+from entities.commission_file import CommissionFile, XLS_MAGIC
+from entities.preprocessor import AbstractPreProcessor
+
+FIXTURES = os.path.join("tests", "manufacturers")
+BASELINE = os.path.join("benchmarks", "baselines", "preprocessors.json")
+# rows searched for a sheet's header row when scaling it up
+HEADER_SEARCH_ROWS = 50
+# times under this are left out of the regression check, they're mostly noise
+MIN_SECONDS = 0.01
+
+
+@dataclass
+class Case:
+    entity: str
+    report: str
+    path: str
+    preprocessor: Type[AbstractPreProcessor]
+    kwargs: dict = field(repr=False)
+    file_password: str | None = None
+    scale: int = 1
+    file_data: bytes = field(default=b"", repr=False)
+
+    @property
+    def name(self) -> str:
+        filename = os.path.basename(self.path)
+        return f"{self.entity}/{self.report}/{filename}@{self.scale}x"
+
+
+def collect_cases(fixtures: str, only: list[str]) -> tuple[list[Case], list[str]]:
+    """
+    Call each test_*_preprocessors function with its assertions swapped for a
+    function that keeps what they were given. Returns the cases, one per file,
+    and the tests that were skipped because their sample files aren't there.
+    """
+    from tests import test_preprocessors as suite
+
+    given = []
+
+    def keep(files_by_report, entity, preprocessor, **kwargs) -> None:
+        given.append((files_by_report, entity, preprocessor, kwargs))
+
+    suite.FILE_DIRECTORY = fixtures
+    suite.assert_tests_for_each_file = keep
+    skipped = []
+    for name, test in vars(suite).items():
+        if not name.startswith("test_") or not callable(test):
+            continue
+        entity = name.removeprefix("test_").removesuffix("_preprocessors")
+        if only and entity not in only:
+            continue
+        try:
+            test()
+        except FileNotFoundError:
+            skipped.append(name)
+
+    cases = []
+    for files_by_report, entity, preprocessor, kwargs in given:
+        additionals = {}
+        for path in files_by_report.pop("additionals", []):
+            with open(path, "rb") as handler:
+                additionals[os.path.basename(path).split(".")[0]] = handler.read()
+        reported = kwargs.get("reported_commission_amounts") or {}
+        for report, paths in files_by_report.items():
+            for path in sorted(paths):
+                filename = os.path.basename(path).split(".")[0]
+                case_kwargs = dict(kwargs, additional_file_1=additionals.get(filename))
+                if filename in reported:
+                    case_kwargs["total_commission_amount"] = reported[filename]
+                with open(path, "rb") as handler:
+                    file_data = handler.read()
+                cases.append(
+                    Case(
+                        entity,
+                        report,
+                        path,
+                        preprocessor,
+                        case_kwargs,
+                        kwargs.get("file_password"),
+                        file_data=file_data,
+                    )
+                )
+    return cases, skipped
+
+
+def is_excel(file_data: bytes) -> bool:
+    return file_data.startswith(b"PK") or file_data.startswith(XLS_MAGIC)
+
+
+def header_row(sheet: pd.DataFrame) -> int:
+    """the first row as full as any near the top. rows above it are left as-is"""
+    filled = sheet.head(HEADER_SEARCH_ROWS).notna().sum(axis=1)
+    return int(filled.idxmax()) if len(filled) else 0
+
+
+def scale_workbook(case: Case, scale: int) -> bytes:
+    """the case's workbook with the rows below each visible sheet's header
+    repeated `scale` times, totals rows included"""
+    file = CommissionFile(
+        file_data=case.file_data,
+        file_password=case.file_password,
+        file_mime="",
+        file_name="",
+    )
+    output = BytesIO()
+    with pd.ExcelWriter(output, engine="openpyxl") as writer:
+        for sheet_name in file.sheet_names():
+            sheet = file.workbook().parse(sheet_name, header=None)
+            top = header_row(sheet) + 1
+            scaled = pd.concat(
+                [sheet.iloc[:top]] + [sheet.iloc[top:]] * scale, ignore_index=True
+            )
+            scaled.to_excel(writer, sheet_name=sheet_name, header=False, index=False)
+    file.clear_cache()
+    return output.getvalue()
+
+
+def scaled_cases(cases: list[Case], scales: list[int]) -> list[Case]:
+    scaled = []
+    for case in cases:
+        if not is_excel(case.file_data):
+            continue
+        for scale in scales:
+            kwargs = dict(case.kwargs)
+            if (total := kwargs.get("total_commission_amount")) is not None:
+                kwargs["total_commission_amount"] = total * scale
+                kwargs["tolerance"] = kwargs.get("tolerance", 0.01) * scale
+            scaled.append(
+                Case(
+                    case.entity,
+                    case.report,
+                    case.path,
+                    case.preprocessor,
+                    kwargs,
+                    scale=scale,
+                    file_data=scale_workbook(case, scale),
+                )
+            )
+    return scaled
+
+
+def run_once(case: Case) -> None:
+    # extracted pdf text and tables are cached by file hash across files
+    pdf.TEXT_CACHE.entries.clear()
+    pdf.TABLE_CACHE.entries.clear()
+    file = CommissionFile(
+        file_data=case.file_data,
+        file_password=case.file_password,
+        file_mime="",
+        file_name="",
+    )
+    case.preprocessor(case.report, 99999, file).preprocess(**case.kwargs)
+
+
+def measure(case: Case, repeat: int) -> dict[str, float]:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run_once(case)
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        run_once(case)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": min(times), "peak_mb": peak / 1024**2}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fixtures", default=FIXTURES)
+    parser.add_argument("--scales", type=int, nargs="*", default=[10, 100])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--threshold", type=float, default=0.25)
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save", action="store_true")
+    parser.add_argument("--only", nargs="*", default=[], metavar="ENTITY")
+    args = parser.parse_args()
+
+    cases, skipped = collect_cases(args.fixtures, args.only)
+    for name in skipped:
+        print(f"skipped {name}, its sample files aren't in {args.fixtures}")
+    cases += scaled_cases(cases, args.scales)
+
+    results, errors = {}, {}
+    print(f"{'case':<72} {'seconds':>9} {'peak MB':>9}")
+    for case in sorted(cases, key=lambda c: (c.entity, c.report, c.path, c.scale)):
+        try:
+            results[case.name] = result = measure(case, args.repeat)
+        except Exception as e:
+            errors[case.name] = f"{type(e).__name__}: {e}"
+            print(f"{case.name:<72} {'error':>9}")
+            continue
+        print(f"{case.name:<72} {result['seconds']:9.3f} {result['peak_mb']:9.1f}")
+
+    scales = {1, *args.scales}
+
+    def in_scope(name: str) -> bool:
+        """whether this run was meant to cover the baseline case"""
+        entity, scale = name.split("/")[0], int(name.rsplit("@", 1)[1][:-1])
+        return (not args.only or entity in args.only) and scale in scales
+
+    save_or_check(
+        results,
+        args.baseline,
+        args.save,
+        args.threshold,
+        floors={"seconds": MIN_SECONDS, "peak_mb": 0.0},
+        errors=errors,
+        in_scope=in_scope,
+    )
+
+
+if __name__ == "__main__":
+    main()
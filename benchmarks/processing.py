@@ -0,0 +1,326 @@
+"""
+Throughput and latency of processing uploaded reports end to end, from
+POST /commission-data to the submission's final status, for sizing dynos.
+
+The app runs against a throwaway schema in the Postgres database at
+--database-url (DATABASE_URL by default), seeded by benchmarks.dataset. The
+prediction service is stood in for by a local HTTP server answering with the
+branch whose alias has the best trigram score, and S3 by a client keeping
+uploads in memory. Each can be given a delay to stand for the real one's latency.
+
+Uploads are generated Atco standard reports, with rows for the user's branches,
+so most match an alias and the rest go to the prediction service, plus a
+--novel fraction of rows naming customers no upload has named before. They're
+sent through httpx's ASGI transport, which only returns once the request's
+background task has, so the time of each POST is its time to a final status.
+DB time is the time of every SQL statement the app's engine ran during the run,
+as InstrumentationMiddleware stops counting once a response is sent.
+
+Usage: python -m benchmarks.processing [--uploads 20] [--concurrency 4]
+    [--rows 500] [--users 5] [--customers 200] [--branches 3] [--aliased 0.8]
+    [--novel 0.05] [--prediction-delay 0.0] [--s3-delay 0.0]
+    [--database-url URL] [--schema processing_benchmark] [--keep]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+
+import httpx
+import pandas as pd
+import sqlalchemy
+
+from benchmarks import dataset
+
+XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+MODEL_FEATURES = [
+    "len_entity",
+    "len_match",
+    "indel_score",
+    "jaro_score",
+    "reverse_jaro_score",
+    "trigram_score",
+    f"manufacturer_{dataset.MANUFACTURER}",
+    f"report_name_{dataset.REPORT}",
+]
+
+
+class PredictionHandler(BaseHTTPRequestHandler):
+    """the prediction service's two endpoints, for PredictionStandIn"""
+
+    def do_GET(self) -> None:
+        self.reply({"data": MODEL_FEATURES})
+
+    def do_POST(self) -> None:
+        entities = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        time.sleep(self.server.delay)
+        columns = entities["columns"]
+        score, branch_id = columns.index("trigram_score"), columns.index("branch_id")
+        best = max(entities["data"], key=lambda row: row[score], default=None)
+        with self.server.lock:
+            self.server.predictions += 1
+        self.reply({"result": best[branch_id] if best else None})
+
+    def reply(self, content: dict) -> None:
+        body = json.dumps(content).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+class PredictionStandIn(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, delay: float) -> None:
+        super().__init__(("127.0.0.1", 0), PredictionHandler)
+        self.delay = delay
+        self.predictions = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}"
+
+
+class SQLTimer:
+    """the number and total time of the SQL statements an engine runs"""
+
+    def __init__(self, engine: sqlalchemy.Engine) -> None:
+        self.statements = 0
+        self.seconds = 0.0
+        self.lock = threading.Lock()
+        sqlalchemy.event.listen(engine, "before_cursor_execute", self.before)
+        sqlalchemy.event.listen(engine, "after_cursor_execute", self.after)
+
+    def before(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info["benchmark_started"] = time.perf_counter()
+
+    def after(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["benchmark_started"]
+        with self.lock:
+            self.statements += 1
+            self.seconds += elapsed
+
+
+class LocalS3:
+    """the parts of the boto3 S3 client the app uses, keeping objects in memory"""
+
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+        self.objects: dict[str, bytes] = {}
+        self.lock = threading.Lock()
+
+    def upload_fileobj(self, fileobj, bucket, key, ExtraArgs=None, Config=None):
+        data = fileobj.read()
+        time.sleep(self.delay)
+        with self.lock:
+            self.objects[key] = data
+
+    def get_object(self, Bucket, Key):
+        with self.lock:
+            data = self.objects[Key]
+        return {
+            "ResponseMetadata": {"HTTPStatusCode": 200},
+            "Body": BytesIO(data),
+            "ContentType": XLSX,
+        }
+
+
+@dataclass
+class Upload:
+    user: dataset.SeededUser
+    token: str
+    reporting_month: int
+    reporting_year: int
+    file_data: bytes
+    total_commission_amount: float
+
+
+def make_report(
+    user: dataset.SeededUser, rows: int, novel: float, number: int, rng: random.Random
+) -> tuple[bytes, float]:
+    """an Atco standard report as an xlsx, and its total commissions"""
+    branches = rng.choices(user.branches, k=rows)
+    customers = [
+        f"{branch.customer} #{number}" if rng.random() < novel else branch.customer
+        for branch in branches
+    ]
+    commissions = [round(rng.uniform(0, 500), 2) for _ in range(rows)]
+    report = pd.DataFrame(
+        {
+            "Sort Name": customers,
+            "ShipTo City": [branch.city for branch in branches],
+            "ShipTo State": [branch.state for branch in branches],
+            "Ttl Sales Less Frt and EPD": [round(c / 0.03, 2) for c in commissions],
+            "Commission Earned": commissions,
+        }
+    )
+    file_data = BytesIO()
+    report.to_excel(file_data, index=False)
+    return file_data.getvalue(), round(sum(commissions), 2)
+
+
+def make_uploads(
+    users: list[dataset.SeededUser], count: int, rows: int, novel: float
+) -> list[Upload]:
+    rng = random.Random(0)
+    tokens = {user.id: dataset.sign_in(user) for user in users}
+    uploads = []
+    for number in range(count):
+        user = users[number % len(users)]
+        # a different reporting period for each of a user's uploads
+        period = number // len(users)
+        file_data, total = make_report(user, rows, novel, number, rng)
+        uploads.append(
+            Upload(
+                user,
+                tokens[user.id],
+                reporting_month=period % 12 + 1,
+                reporting_year=2000 + period // 12,
+                file_data=file_data,
+                total_commission_amount=total,
+            )
+        )
+    return uploads
+
+
+async def send(client: httpx.AsyncClient, upload: Upload) -> tuple[float, int]:
+    """seconds to a final status, and the response's status code"""
+    start = time.perf_counter()
+    response = await client.post(
+        "/commission-data",
+        headers={"Authorization": f"Bearer {upload.token}"},
+        data={
+            "report_id": upload.user.report_id,
+            "reporting_month": upload.reporting_month,
+            "reporting_year": upload.reporting_year,
+            "manufacturer_id": upload.user.manufacturer_id,
+            "total_commission_amount": upload.total_commission_amount,
+        },
+        files={"file": ("report.xlsx", upload.file_data, XLSX)},
+    )
+    return time.perf_counter() - start, response.status_code
+
+
+async def drive(app, uploads: list[Upload], concurrency: int):
+    """(seconds, status code) of each upload, and the seconds taken for all"""
+    limit = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+
+    async def limited(upload: Upload) -> tuple[float, int]:
+        async with limit:
+            return await send(client, upload)
+
+    async with app.router.lifespan_context(app), httpx.AsyncClient(
+        transport=transport, base_url="http://test", timeout=None
+    ) as client:
+        start = time.perf_counter()
+        results = await asyncio.gather(*(limited(upload) for upload in uploads))
+        return results, time.perf_counter() - start
+
+
+def report(
+    engine: sqlalchemy.Engine,
+    results,
+    elapsed: float,
+    predictions: int,
+    sql: SQLTimer,
+):
+    latencies = sorted(seconds for seconds, _ in results)
+    codes = [code for _, code in results]
+    print(f"\n{len(results)} uploads in {elapsed:.1f} s")
+    print(f"  submissions/minute: {len(results) / elapsed * 60:8.1f}")
+    print(f"   latency p50 (s):   {statistics.median(latencies):8.2f}")
+    p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else 0
+    print(f"   latency p95 (s):   {p95:8.2f}")
+    print(f"  DB s/submission:    {sql.seconds / len(results):8.2f}")
+    print(f"  queries/submission: {sql.statements / len(results):8.1f}")
+    print(f"  predictions:        {predictions:8d}")
+    print(f"  response codes:     {dict(Counter(codes))}")
+
+    with engine.connect() as conn:
+        statuses = conn.execute(
+            sqlalchemy.text("SELECT status, count(*) FROM submissions GROUP BY status")
+        ).all()
+        stages = conn.execute(
+            sqlalchemy.text(
+                """
+                SELECT stage, avg(wall_seconds), avg(cpu_seconds)
+                FROM submission_stage_metrics
+                GROUP BY stage
+                ORDER BY min(position)
+                """
+            )
+        ).all()
+    print(f"  submission statuses: {dict(statuses)}")
+    print(f"\n{'stage':>26} {'wall s':>8} {'cpu s':>8}  (mean per submission)")
+    for stage, wall, cpu in stages:
+        print(f"{stage:>26} {wall:8.3f} {cpu:8.3f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--uploads", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--users", type=int, default=5)
+    parser.add_argument("--customers", type=int, default=200)
+    parser.add_argument("--branches", type=int, default=3)
+    parser.add_argument("--aliased", type=float, default=0.8)
+    parser.add_argument("--novel", type=float, default=0.05)
+    parser.add_argument("--prediction-delay", type=float, default=0.0)
+    parser.add_argument("--s3-delay", type=float, default=0.0)
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"))
+    parser.add_argument("--schema", default="processing_benchmark")
+    parser.add_argument("--keep", action="store_true", help="keep the schema")
+    args = parser.parse_args()
+
+    prediction_service = PredictionStandIn(args.prediction_delay)
+    threading.Thread(target=prediction_service.serve_forever, daemon=True).start()
+    engine = dataset.create_schema(args.database_url, args.schema)
+    try:
+        users = dataset.seed(
+            engine, args.users, args.customers, args.branches, args.aliased
+        )
+        # set before the app is imported, as it reads them at import
+        os.environ["DATABASE_URL"] = dataset.schema_url(args.database_url, args.schema)
+        os.environ.pop("TESTING_DATABASE_URL", None)
+        os.environ["MODEL_SERVICE_URL"] = prediction_service.url
+        os.environ["PREPROCESSED_CACHE_STORE"] = "off"
+        os.environ.setdefault("ORIGINS", "*")
+        from app.main import app
+        from services import s3
+        from services.utils import ENGINE
+
+        s3._client = LocalS3(args.s3_delay)
+        uploads = make_uploads(users, args.uploads, args.rows, args.novel)
+        sql = SQLTimer(ENGINE)
+        print(
+            f"{args.uploads} uploads of {args.rows} rows from {args.users} users, "
+            f"{args.concurrency} at a time"
+        )
+        results, elapsed = asyncio.run(drive(app, uploads, args.concurrency))
+        report(engine, results, elapsed, prediction_service.predictions, sql)
+    finally:
+        prediction_service.shutdown()
+        engine.dispose()
+        if not args.keep:
+            dataset.drop_schema(args.database_url, args.schema)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+"""
+Latency of the busiest JSON:API collection endpoints (/branches, /mappings,
+/customers and /commission-data), all served by JSONAPI_.get_collection.
+
+The app runs against a throwaway schema in the Postgres database at
+--database-url (DATABASE_URL by default), seeded by benchmarks.dataset with
+commission data. All requests are made as the first user seeded.
+
+For each endpoint, one thing is varied at a time from a default request of
+a page of 100 with no include or filter: the page size, the relationships
+included (each, then all of them) and, for endpoints with a text column to
+filter on, filters matching from all of the user's rows down to a few.
+
+Requests are sent --concurrency at a time by an httpx client, straight to the
+app through httpx's ASGI transport, or over HTTP to uvicorn running the app
+in this process with --transport uvicorn. Each scenario reports p50, p95 and
+p99 latency and a histogram of them. With --save, they're written to the
+baseline file. Otherwise they're compared with it, as benchmarks.preprocessors
+does, and a p50 or p95 more than --threshold above its baseline is a regression.
+Baselines are only comparable with the same machine, transport and dataset sizes.
+
+Usage: python -m benchmarks.read_endpoints [--requests 100] [--concurrency 8]
+    [--transport asgi|uvicorn] [--only /customers ...] [--users 2]
+    [--customers 1000] [--branches 3] [--submissions 12] [--rows 2000]
+    [--threshold 0.25] [--baseline PATH] [--save]
+    [--database-url URL] [--schema read_benchmark] [--keep]
+"""
+
+import argparse
+import asyncio
+import math
+import os
+import socket
+import statistics
+import threading
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator
+from urllib.parse import urlencode
+
+import httpx
+import sqlalchemy
+
+from benchmarks import dataset
+from benchmarks.regressions import save_or_check
+
+BASELINE = os.path.join("benchmarks", "baselines", "read_endpoints.json")
+PAGE_SIZES = (10, 50, 100, 300)
+DEFAULT_PAGE_SIZE = 100
+# every customer's name starts with "CUSTOMER ", so from all rows down to a few
+FILTERS = ("CUSTOMER", "CUSTOMER 1", "CUSTOMER 12", "CUSTOMER 123")
+# upper bounds in ms, the last bucket is everything slower
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, math.inf)
+
+
+@dataclass(frozen=True)
+class Endpoint:
+    path: str
+    table: str
+    includes: tuple[str, ...]
+    filter_on: str | None = None
+
+
+ENDPOINTS = (
+    Endpoint("/branches", "customer_branches", ("customers", "locations")),
+    Endpoint(
+        "/mappings",
+        "id_string_matches",
+        ("branches", "manufacturers-reports"),
+        filter_on="match_string",
+    ),
+    Endpoint(
+        "/customers",
+        "customers",
+        ("customer-branches", "manufacturers-reports"),
+        filter_on="name",
+    ),
+    Endpoint("/commission-data", "commission_data", ("branch", "submission")),
+)
+
+
+@dataclass(frozen=True)
+class Scenario:
+    endpoint: Endpoint
+    page_size: int = DEFAULT_PAGE_SIZE
+    include: str | None = None
+    filter: str | None = None
+
+    @property
+    def name(self) -> str:
+        name = f"{self.endpoint.path} size={self.page_size}"
+        if self.include:
+            name += f" include={self.include}"
+        if self.filter:
+            name += f" filter={self.filter!r}"
+        return name
+
+    def params(self) -> str:
+        params = {"page[number]": 1, "page[size]": self.page_size}
+        if self.include:
+            params["include"] = self.include
+        if self.filter:
+            params[f"filter[{self.endpoint.filter_on}]"] = self.filter
+        return urlencode(params)
+
+
+def scenarios(endpoints: list[Endpoint]) -> list[Scenario]:
+    found = []
+    for endpoint in endpoints:
+        found += [Scenario(endpoint, page_size=size) for size in PAGE_SIZES]
+        includes = list(endpoint.includes)
+        if len(includes) > 1:
+            includes.append(",".join(endpoint.includes))
+        found += [Scenario(endpoint, include=include) for include in includes]
+        if endpoint.filter_on:
+            found += [Scenario(endpoint, filter=value) for value in FILTERS]
+    return found
+
+
+def selectivity(engine: sqlalchemy.Engine, scenario: Scenario, user_id: int) -> float:
+    """the fraction of the user's rows the scenario's filter matches"""
+    if not scenario.filter:
+        return 1.0
+    column, table = scenario.endpoint.filter_on, scenario.endpoint.table
+    sql = f"""
+        SELECT count(*) FILTER (WHERE upper({column}) LIKE :value), count(*)
+        FROM {table}
+        WHERE user_id = :user_id
+    """
+    params = dict(value=f"%{scenario.filter}%", user_id=user_id)
+    with engine.connect() as conn:
+        matched, total = conn.execute(sqlalchemy.text(sql), params).one()
+    return matched / total if total else 0.0
+
+
+def histogram(latencies_ms: list[float]) -> dict[str, int]:
+    counts = dict.fromkeys((f"le_{bound:g}" for bound in BUCKETS_MS), 0)
+    for latency in latencies_ms:
+        bound = next(bound for bound in BUCKETS_MS if latency <= bound)
+        counts[f"le_{bound:g}"] += 1
+    return counts
+
+
+async def run(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    token: str,
+    requests: int,
+    concurrency: int,
+) -> dict:
+    url = f"{scenario.endpoint.path}?{scenario.params()}"
+    headers = {
+        "Authorization": f"Bearer {token}",
+        # has JSONAPIRequest read page[...] and filter[...] parameters
+        "Content-Type": "application/vnd.api+json",
+    }
+    limit = asyncio.Semaphore(concurrency)
+    latencies_ms = []
+
+    async def request() -> httpx.Response:
+        async with limit:
+            start = time.perf_counter()
+            response = await client.get(url, headers=headers)
+            latencies_ms.append((time.perf_counter() - start) * 1000)
+            response.raise_for_status()
+            return response
+
+    first = await request()
+    latencies_ms.clear()
+    await asyncio.gather(*(request() for _ in range(requests)))
+    content = first.json()
+    percentiles = statistics.quantiles(latencies_ms, n=100)
+    return {
+        "p50_ms": statistics.median(latencies_ms),
+        "p95_ms": percentiles[94],
+        "p99_ms": percentiles[98],
+        "rows": len(content["data"]),
+        "included": len(content.get("included", [])),
+        "response_kb": len(first.content) / 1024,
+        "histogram": histogram(latencies_ms),
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@asynccontextmanager
+async def serving(app, transport: str) -> AsyncIterator[httpx.AsyncClient]:
+    """a client for the app, with the app's lifespan run around it"""
+    if transport == "asgi":
+        async with app.router.lifespan_context(app), httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app),
+            base_url="http://test",
+            timeout=None,
+        ) as client:
+            yield client
+        return
+
+    import uvicorn
+
+    # in a thread with its own event loop, as it would be in its own process
+    port = free_port()
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    )
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    try:
+        while not server.started:
+            await asyncio.sleep(0.05)
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{port}", timeout=None
+        ) as client:
+            yield client
+    finally:
+        server.should_exit = True
+        thread.join()
+
+
+def print_result(name: str, result: dict) -> None:
+    print(
+        f"{name:<68} {result['selectivity']:6.1%} {result['rows']:5d} "
+        f"{result['included']:5d} {result['response_kb']:8.1f} "
+        f"{result['p50_ms']:8.1f} {result['p95_ms']:8.1f} {result['p99_ms']:8.1f}"
+    )
+
+
+def print_histograms(results: dict[str, dict]) -> None:
+    bounds = [f"<={bound:g}" if bound < math.inf else ">" for bound in BUCKETS_MS]
+    print(f"\n{'latency histogram (ms)':<68} " + " ".join(f"{b:>6}" for b in bounds))
+    for name, result in results.items():
+        counts = result["histogram"].values()
+        print(f"{name:<68} " + " ".join(f"{count:6d}" for count in counts))
+
+
+async def measure(
+    app, scenarios_: list[Scenario], selectivities: dict[str, float], token: str, args
+) -> dict[str, dict]:
+    print(
+        f"{'scenario':<68} {'match':>6} {'rows':>5} {'incl':>5} {'KB':>8} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+    )
+    results = {}
+    async with serving(app, args.transport) as client:
+        for scenario in scenarios_:
+            result = await run(
+                client, scenario, token, args.requests, args.concurrency
+            )
+            result["selectivity"] = selectivities[scenario.name]
+            results[scenario.name] = result
+            print_result(scenario.name, result)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--transport", choices=["asgi", "uvicorn"], default="asgi")
+    parser.add_argument("--only", nargs="*", default=[], metavar="ENDPOINT")
+    parser.add_argument("--users", type=int, default=2)
+    parser.add_argument("--customers", type=int, default=1000)
+    parser.add_argument("--branches", type=int, default=3)
+    parser.add_argument("--submissions", type=int, default=12)
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--threshold", type=float, default=0.25)
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save", action="store_true")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"))
+    parser.add_argument("--schema", default="read_benchmark")
+    parser.add_argument("--keep", action="store_true", help="keep the schema")
+    args = parser.parse_args()
+
+    engine = dataset.create_schema(args.database_url, args.schema)
+    try:
+        users = dataset.seed(engine, args.users, args.customers, args.branches)
+        dataset.seed_commission_data(engine, users, args.submissions, args.rows)
+        # set before the app is imported, as it reads them at import
+        os.environ["DATABASE_URL"] = dataset.schema_url(args.database_url, args.schema)
+        os.environ.pop("TESTING_DATABASE_URL", None)
+        os.environ.setdefault("ORIGINS", "*")
+        from app.main import app
+
+        endpoints = [e for e in ENDPOINTS if not args.only or e.path in args.only]
+        scenarios_ = scenarios(endpoints)
+        selectivities = {
+            scenario.name: selectivity(engine, scenario, users[0].id)
+            for scenario in scenarios_
+        }
+        token = dataset.sign_in(users[0])
+        results = asyncio.run(measure(app, scenarios_, selectivities, token, args))
+    finally:
+        engine.dispose()
+        if not args.keep:
+            dataset.drop_schema(args.database_url, args.schema)
+    print_histograms(results)
+    save_or_check(
+        results,
+        args.baseline,
+        args.save,
+        args.threshold,
+        floors={"p50_ms": 1.0, "p95_ms": 1.0},
+        in_scope=lambda name: not args.only or name.split(" ")[0] in args.only,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Baselines of benchmark results, saved as JSON, and the check of later results
+against them. Results are keyed by case, with a number for each metric, where
+higher is worse.
+"""
+
+import json
+import os
+import sys
+from typing import Callable
+
+
+def regressions(
+    results: dict[str, dict],
+    baseline: dict[str, dict],
+    threshold: float,
+    floors: dict[str, float],
+    in_scope: Callable[[str], bool] = lambda name: True,
+) -> list[str]:
+    """
+    The metrics more than threshold (a fraction) above their baseline, for the
+    cases and metrics in floors. Values under a metric's floor are mostly noise,
+    so they're left out. A baseline case the run was meant to cover (in_scope)
+    with no result is a regression too, i.e. one that now fails.
+    """
+    found = [
+        f"{name}: no result"
+        for name in baseline
+        if name not in results and in_scope(name)
+    ]
+    for name, result in results.items():
+        if (before := baseline.get(name)) is None:
+            continue
+        for metric, floor in floors.items():
+            if result[metric] < floor or not before.get(metric):
+                continue
+            if result[metric] > before[metric] * (1 + threshold):
+                change = result[metric] / before[metric] - 1
+                found.append(
+                    f"{name}: {metric} {before[metric]:.3f} -> "
+                    f"{result[metric]:.3f} (+{change:.0%})"
+                )
+    return found
+
+
+def save_or_check(
+    results: dict[str, dict],
+    path: str,
+    save: bool,
+    threshold: float,
+    floors: dict[str, float],
+    errors: dict[str, str] | None = None,
+    in_scope: Callable[[str], bool] = lambda name: True,
+) -> None:
+    """
+    With save, write results to the baseline at path. Otherwise, compare them
+    with it. Exits with status 1 if any case errored, in which case nothing
+    is saved, or if any regressed.
+    """
+    if errors:
+        print(f"\n{len(errors)} case(s) failed:")
+        print("\n".join(f"  {name}: {error}" for name, error in errors.items()))
+    if save:
+        if errors:
+            print(f"not saving a baseline to {path} with failed cases")
+            sys.exit(1)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as handler:
+            json.dump(results, handler, indent=2, sort_keys=True)
+        print(f"\nsaved {len(results)} results to {path}")
+        return
+    if not os.path.exists(path):
+        print(f"\nno baseline at {path}, run with --save to make one")
+        sys.exit(1 if errors else 0)
+    with open(path) as handler:
+        baseline = json.load(handler)
+    if found := regressions(results, baseline, threshold, floors, in_scope):
+        print(f"\n{len(found)} regression(s) beyond {threshold:.0%}:")
+        print("\n".join(f"  {regression}" for regression in found))
+        sys.exit(1)
+    if errors:
+        sys.exit(1)
+    print(f"\nno regressions beyond {threshold:.0%} of {path}")
@@ -0,0 +1,91 @@
+"""
+Peak RSS of reading an uploaded workbook into a DataFrame through CommissionFile,
+comparing an upload held as bytes with one streamed into a SpooledTemporaryFile.
+
+Each step runs in a fresh interpreter, since peak RSS never goes down
+(and on linux is carried over from the parent process).
+
+Usage: python -m benchmarks.upload_memory [--rows 200000]
+"""
+
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+from tempfile import SpooledTemporaryFile
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # linux reports kilobytes, macOS reports bytes
+    return peak / 1024**2 if sys.platform == "darwin" else peak / 1024
+
+
+def make_workbook(path: str, rows: int) -> None:
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(0)
+    pd.DataFrame(
+        {
+            "customer": rng.choice(["ACME SUPPLY", "COOLING CO", "HVAC DEPOT"], rows),
+            "city": rng.choice(["TAMPA", "ATLANTA", "MOBILE", "NASHVILLE"], rows),
+            "state": rng.choice(["FL", "GA", "AL", "TN"], rows),
+            "sales": rng.uniform(0, 10_000, rows).round(2),
+            "commission": rng.uniform(0, 500, rows).round(2),
+        }
+    ).to_excel(path, index=False)
+
+
+def run(strategy: str, path: str) -> None:
+    from entities.commission_file import CommissionFile, SPOOL_MAX_SIZE
+
+    baseline = peak_rss_mb()
+    if strategy == "bytes":
+        with open(path, "rb") as handler:
+            file_data = handler.read()
+    else:
+        file_data = SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+        with open(path, "rb") as handler:
+            while chunk := handler.read(CHUNK_SIZE):
+                file_data.write(chunk)
+    file = CommissionFile(file_data=file_data, file_mime="", file_name="")
+    file.to_df()
+    # what the S3 upload reads
+    stream = file.stream()
+    while stream.read(CHUNK_SIZE):
+        pass
+    print(f"{strategy:>8}: baseline {baseline:8.1f} MB, peak {peak_rss_mb():8.1f} MB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--run", choices=["make", "bytes", "spooled"])
+    parser.add_argument("--path")
+    args = parser.parse_args()
+
+    if args.run == "make":
+        return make_workbook(args.path, args.rows)
+    elif args.run:
+        return run(args.run, args.path)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "upload.xlsx")
+        for step in ("make", "bytes", "spooled"):
+            subprocess.run(
+                [sys.executable, "-m", "benchmarks.upload_memory"]
+                + ["--run", step, "--path", path, "--rows", str(args.rows)],
+                check=True,
+            )
+            if step == "make":
+                size = os.path.getsize(path) / 1024**2
+                print(f"{args.rows:,} rows, {size:.1f} MB file")
+
+
+if __name__ == "__main__":
+    main()
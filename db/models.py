@@ -6,6 +6,7 @@ from sqlalchemy import (
     Column,
     Float,
     Integer,
+    BigInteger,
     String,
     Boolean,
     DateTime,
@@ -14,6 +15,7 @@ from sqlalchemy import (
     Enum,
     Numeric,
     ARRAY,
+    UniqueConstraint,
 )
 from sqlalchemy.orm import declarative_base, relationship
 from sqlalchemy.dialects.postgresql import UUID
@@ -99,6 +101,16 @@ class ManufacturersReport(Base):
 
 class Submission(Base):
     __tablename__ = "submissions"
+    __table_args__ = (
+        # one submission per reporting period of a report
+        UniqueConstraint(
+            "user_id",
+            "report_id",
+            "reporting_year",
+            "reporting_month",
+            name="submissions_user_report_period_key",
+        ),
+    )
     id = Column(Integer, primary_key=True)
     submission_date = Column(DateTime)
     reporting_month = Column(Integer)
@@ -121,6 +133,25 @@ class Submission(Base):
         "ManufacturersReport", back_populates="submissions"
     )
     commission_data = relationship("CommissionData", back_populates="submission")
+    stage_metrics = relationship("SubmissionStageMetric", back_populates="submission")
+
+
+class SubmissionStageMetric(Base):
+    """time, rows and memory for one stage of processing a submission's file"""
+
+    __tablename__ = "submission_stage_metrics"
+    id = Column(Integer, primary_key=True)
+    submission_id = Column(Integer, ForeignKey("submissions.id"))
+    user_id = Column(Integer, ForeignKey("users.id"))
+    stage = Column(String)
+    position = Column(Integer)
+    wall_seconds = Column(Float)
+    cpu_seconds = Column(Float)
+    rows_in = Column(Integer)
+    rows_out = Column(Integer)
+    peak_memory_bytes = Column(BigInteger)
+    recorded_at = Column(DateTime)
+    submission = relationship("Submission", back_populates="stage_metrics")
 
 
 class CommissionData(Base):
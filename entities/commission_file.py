@@ -1,63 +1,85 @@
-from dataclasses import dataclass
-import re
+from dataclasses import dataclass, field
+from hashlib import file_digest
+from importlib.util import find_spec
 import pandas as pd
-import tabula
-from PyPDF2 import PdfReader
 from io import BytesIO
+from typing import IO
 from logging import getLogger
-from datetime import datetime
+from entities import pdf as pdf_extraction
+from entities.headers import MONTHS, clean_header, clean_headers
 
 logger = getLogger("uvicorn.info")
 
-MONTHS = [
-    "january",
-    "jan",
-    "february",
-    "feb",
-    "march",
-    "mar",
-    "april",
-    "apr",
-    "may",
-    "june",
-    "jun",
-    "july",
-    "jul",
-    "jly",
-    "august",
-    "aug",
-    "september",
-    "spt",
-    "sept",
-    "october",
-    "oct",
-    "november",
-    "nov",
-    "december",
-    "dec",
-]
+# uploads are held in memory up to this size before rolling over to a temp file
+SPOOL_MAX_SIZE = 10 * 1024 * 1024
+# legacy xls files are OLE2 compound documents, xlsx files are zip archives
+XLS_MAGIC = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+# native (Rust) reader for both xls and xlsx, several times faster than openpyxl
+CALAMINE_INSTALLED = find_spec("python_calamine") is not None
 
 
 @dataclass
 class CommissionFile:
-    file_data: bytes | BytesIO
+    """
+    The uploaded file and its metadata.
+
+    `file_data` may be raw bytes or any seekable binary file object,
+    such as the SpooledTemporaryFile an upload is streamed into.
+    Readers get the data through `stream`, which never copies it.
+
+    Excel workbooks are opened once and each sheet is parsed on first use
+    and memoized, so repeated reads of the same file don't re-parse it.
+    Text and tables extracted from PDFs are cached by `content_hash`.
+    """
+
+    file_data: bytes | BytesIO | IO[bytes]
     file_mime: str
     file_name: str
     file_password: str = None
+    _workbook: pd.ExcelFile | None = field(default=None, init=False, repr=False)
+    _sheets: dict[tuple[str, int], pd.DataFrame] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    _hash: str | None = field(default=None, init=False, repr=False)
+
+    def stream(self) -> IO[bytes]:
+        """
+        A binary file object positioned at the start of the file data.
+        bytes are wrapped in a BytesIO, which shares the buffer rather than copying.
+        File objects are rewound and returned as-is, so readers must not close them.
+        """
+        match self.file_data:
+            case bytes():
+                return BytesIO(self.file_data)
+            case _ if hasattr(self.file_data, "read"):
+                self.file_data.seek(0)
+                return self.file_data
+            case _:
+                raise Exception(
+                    f"file data is of type {type(self.file_data)},"
+                    " expected bytes or a binary file object"
+                )
+
+    def content_hash(self) -> str:
+        """sha256 hex digest of the file data as uploaded"""
+        if self._hash is None:
+            self._hash = file_digest(self.stream(), "sha256").hexdigest()
+        return self._hash
 
     def decrypt_file(self) -> None:
         if self.file_password:
             import msoffcrypto
-            from io import BytesIO
 
             file_decrypted = BytesIO()
-            decrypter = msoffcrypto.OfficeFile(BytesIO(self.file_data))
+            decrypter = msoffcrypto.OfficeFile(self.stream())
             decrypter.load_key(password=str(self.file_password))
             try:
                 decrypter.decrypt(file_decrypted)
             except msoffcrypto.exceptions.DecryptionError as e:
                 logger.info(e)
             else:
+                # keep identifying the file by what was uploaded
+                self.content_hash()
                 self.file_data = file_decrypted
 
     def to_df(
@@ -83,32 +105,19 @@ class CommissionFile:
         """
         if strategy := pdf:
             if strategy.lower() == "text":
-                all_text = ""
-                for page in PdfReader(BytesIO(self.file_data)).pages:
-                    all_text += page.extract_text()
-                text_list = all_text.splitlines()
-                text_list_compact = [line.strip() for line in text_list if line.strip()]
-                return pd.Series(text_list_compact)
+                return pdf_extraction.text_lines(self.stream(), self.content_hash())
             elif strategy.lower() == "table":
+                all_tables = pdf_extraction.tables(self.stream(), self.content_hash())
                 if combine_sheets:
-                    all_tables = tabula.read_pdf(BytesIO(self.file_data), pages="all")[
-                        skip:
-                    ]
+                    all_tables = all_tables[skip:]
                     all_tables = [table.T.reset_index().T for table in all_tables]
                     combined = pd.concat(all_tables, ignore_index=True)
                     return combined[~combined.loc[:, 0].str.startswith("Unnamed")]
                 else:
-                    return tabula.read_pdf(BytesIO(self.file_data), pages="all")[skip]
-        # only does something if a password was passed into the CommissionFile constructor
-        self.decrypt_file()
-        try:
-            excel_data = self.excel_extract(
-                "openpyxl", combine_sheets, skip, split_sheets, treat_headers
-            )
-        except:
-            excel_data = self.excel_extract(
-                "xlrd", combine_sheets, skip, split_sheets, treat_headers
-            )
+                    return all_tables[skip]
+        excel_data = self.excel_extract(
+            combine_sheets, skip, split_sheets, treat_headers
+        )
 
         if make_header_a_row:
             if isinstance(excel_data, dict):
@@ -126,80 +135,100 @@ class CommissionFile:
 
     @staticmethod
     def clean_header(header: str) -> str:
-        header = str(header).lower()
-        header = re.sub(r"[^a-z0-9.,]", "", header)
-        header = re.sub(rf"({"|".join(MONTHS)})", "", header)
-        # only the current year to avoid a name conflict with another column
-        # that may contain other years (usually prior year)
-        header = re.sub(rf"({datetime.today().today().year})", "", header)
-        if header.isnumeric():
-            header = "replacednumber"
-        else:
-            try:
-                float(header)
-            except:
-                pass
-            else:
-                header = "replacednumber"
-        return header
+        return clean_header(header)
+
+    def excel_engine(self) -> str:
+        """pick the Excel reader, calamine if installed,
+        otherwise by the file's magic bytes"""
+        if CALAMINE_INSTALLED:
+            return "calamine"
+        if self.stream().read(len(XLS_MAGIC)) == XLS_MAGIC:
+            return "xlrd"
+        return "openpyxl"
+
+    def workbook(self) -> pd.ExcelFile:
+        """the opened workbook, shared by every read of this file"""
+        if self._workbook is None:
+            # only does something if a password was passed into the CommissionFile constructor
+            self.decrypt_file()
+            engine = self.excel_engine()
+            self._workbook = pd.ExcelFile(self.stream(), engine=engine)
+        return self._workbook
+
+    def sheet_names(self) -> list[str]:
+        excel_file = self.workbook()
+        if excel_file.engine == "calamine":
+            from python_calamine import SheetTypeEnum, SheetVisibleEnum
+
+            return [
+                sheet.name
+                for sheet in excel_file.book.sheets_metadata
+                if sheet.typ == SheetTypeEnum.WorkSheet
+                and sheet.visible == SheetVisibleEnum.Visible
+            ]
+        elif excel_file.engine == "openpyxl":
+            # use only visible sheets in case some irrelevant ones are hidden, but ahead of line
+            # otherwise a hidden sheet would get pulled in instead of the intended visible one
+            return [
+                sheet.title
+                for sheet in excel_file.book.worksheets
+                if sheet.sheet_state == "visible"
+            ]
+        # NOTE I'm not sure how to grab only visible sheets with xlrd
+        return excel_file.sheet_names
+
+    def sheet(self, sheet_name: str, skip: int = 0) -> pd.DataFrame:
+        """parse a sheet on first access and memoize it.
+        preprocessors modify what they're given, so each call gets its own copy"""
+        key = (sheet_name, skip)
+        if key not in self._sheets:
+            self._sheets[key] = self.workbook().parse(sheet_name, skiprows=skip)
+        return self._sheets[key].copy()
+
+    def clear_cache(self) -> None:
+        """drop the parsed workbook and sheets once the file has been processed"""
+        if self._workbook is not None:
+            self._workbook.close()
+        self._workbook = None
+        self._sheets.clear()
+
+    def close(self) -> None:
+        """drop the caches and close the file data, if it's a file object,
+        so a SpooledTemporaryFile that rolled over to disk is deleted now"""
+        self.clear_cache()
+        if hasattr(self.file_data, "close"):
+            self.file_data.close()
 
     def excel_extract(
         self,
-        engine: str,
         combine_sheets: bool = False,
         skip: int = 0,
         split_sheets: bool = False,
         treat_headers: bool = False,
     ) -> pd.DataFrame | dict[str, pd.DataFrame]:
 
-        match self.file_data:
-            case BytesIO():
-                file_data = self.file_data
-            case bytes():
-                file_data = BytesIO(self.file_data)
-            case _:
-                raise Exception(
-                    f"file data is of type {type(self.file_data)},"
-                    " expected bytes or BytesIO"
-                )
-
-        with pd.ExcelFile(file_data, engine=engine) as excel_file:
-            excel_file: pd.ExcelFile
-            if engine == "openpyxl":
-                # use only visible sheets in case some irrelevant ones are hidden, but ahead of line
-                # otherwise a hidden sheet would get pulled in instead of the intended visible one
-                sheets = [
-                    sheet.title
-                    for sheet in excel_file.book.worksheets
-                    if sheet.sheet_state == "visible"
-                ]
-            elif engine == "xlrd":
-                # NOTE I'm not sure how to grab only visible sheets with xlrd
-                sheets = excel_file.sheet_names
-
-            if combine_sheets:
-                data: list[pd.DataFrame] = [
-                    excel_file.parse(sheet, skiprows=skip) for sheet in sheets
+        sheets = self.sheet_names()
+        if combine_sheets:
+            data: list[pd.DataFrame] = [self.sheet(sheet, skip) for sheet in sheets]
+            if treat_headers:
+                data = [
+                    sheet.set_axis(clean_headers(sheet.columns), axis=1)
+                    for sheet in data
                 ]
-                if treat_headers:
-                    data = [
-                        sheet.rename(columns=lambda col: self.clean_header(col))
-                        for sheet in data
-                    ]
-                result = pd.concat(data, ignore_index=True)
-            elif split_sheets:
-                data_sheets: dict[str, pd.DataFrame] = {
-                    sheet: excel_file.parse(sheet, skiprows=skip) for sheet in sheets
+            result = pd.concat(data, ignore_index=True)
+        elif split_sheets:
+            data_sheets: dict[str, pd.DataFrame] = {
+                sheet: self.sheet(sheet, skip) for sheet in sheets
+            }
+            if treat_headers:
+                result = {
+                    sheet: data.set_axis(clean_headers(data.columns), axis=1)
+                    for sheet, data in data_sheets.items()
                 }
-                if treat_headers:
-                    result = {
-                        sheet: data.rename(columns=lambda col: self.clean_header(col))
-                        for sheet, data in data_sheets.items()
-                    }
-                else:
-                    result = data_sheets
             else:
-                result = pd.read_excel(file_data, sheet_name=sheets[0], skiprows=skip)
-                if treat_headers:
-                    result = result.rename(columns=lambda col: self.clean_header(col))
+                result = data_sheets
+        else:
+            result = self.sheet(sheets[0], skip)
+            if treat_headers:
+                result = result.set_axis(clean_headers(result.columns), axis=1)
         return result
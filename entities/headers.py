@@ -0,0 +1,141 @@
+"""
+Normalization of column headers found in manufacturer reports,
+so that headers can be compared regardless of case, spacing, punctuation,
+and the month or year a report was run for.
+"""
+
+import re
+from dataclasses import dataclass
+from datetime import date
+from functools import lru_cache
+from typing import Iterable
+import numpy as np
+import pandas as pd
+
+MONTHS = [
+    "january",
+    "jan",
+    "february",
+    "feb",
+    "march",
+    "mar",
+    "april",
+    "apr",
+    "may",
+    "june",
+    "jun",
+    "july",
+    "jul",
+    "jly",
+    "august",
+    "aug",
+    "september",
+    "spt",
+    "sept",
+    "october",
+    "oct",
+    "november",
+    "nov",
+    "december",
+    "dec",
+]
+
+NON_HEADER_CHARS = re.compile(r"[^a-z0-9.,]")
+MONTH_NAMES = re.compile(f"({'|'.join(MONTHS)})")
+# everything float() accepts once the header is down to [a-z0-9.,]
+NUMBER = re.compile(r"(?:\d+\.?\d*|\.\d+)(?:e\d+)?|nan|inf|infinity")
+NUMBER_PLACEHOLDER = "replacednumber"
+# rows normalized at a time while looking for a header row
+HEADER_SCAN_ROWS = 50
+
+
+@lru_cache(maxsize=4)
+def year_pattern(year: int) -> re.Pattern:
+    return re.compile(f"({year})")
+
+
+@lru_cache(maxsize=8192)
+def _clean_header(header: str, year: int) -> str:
+    header = header.lower()
+    header = NON_HEADER_CHARS.sub("", header)
+    header = MONTH_NAMES.sub("", header)
+    # only the current year to avoid a name conflict with another column
+    # that may contain other years (usually prior year)
+    header = year_pattern(year).sub("", header)
+    if NUMBER.fullmatch(header):
+        header = NUMBER_PLACEHOLDER
+    return header
+
+
+def clean_header(header) -> str:
+    """normalize a single header value"""
+    return _clean_header(str(header), date.today().year)
+
+
+def clean_headers(headers: Iterable | pd.Index | pd.Series) -> list[str]:
+    """normalize a whole row or Index of header values at once,
+    with the same result as calling clean_header on each"""
+    values = pd.Series(list(headers), dtype=object).astype(str).str.lower()
+    values = (
+        values.str.replace(NON_HEADER_CHARS, "", regex=True)
+        .str.replace(MONTH_NAMES, "", regex=True)
+        .str.replace(year_pattern(date.today().year), "", regex=True)
+    )
+    values = values.mask(values.str.fullmatch(NUMBER), NUMBER_PLACEHOLDER)
+    return values.tolist()
+
+
+@dataclass
+class HeaderLocation:
+    """
+    Where the first matching set of column names was found.
+
+    `option` is the position of the matching option in the options searched.
+    `row` is the position of the header row in the frame, or None if the
+    frame's columns already contain the names. `header` is that row normalized.
+    """
+
+    option: int
+    row: int | None = None
+    header: list[str] | None = None
+
+
+def locate_header(
+    df: pd.DataFrame, options: list[list[str]], block_size: int = HEADER_SCAN_ROWS
+) -> HeaderLocation | None:
+    """
+    Find the first option whose names are all in the frame's columns
+    or, failing that, all in one of its rows.
+
+    Options take priority in the order given, as if each were searched for
+    on its own. Rows are normalized with clean_headers a block at a time, each
+    block once, and every option is tested against it with vectorized compares.
+    Scanning stops as soon as the first option is found.
+    """
+    columns = set(df.columns)
+    found: list[HeaderLocation | None] = [
+        HeaderLocation(i) if set(names) <= columns else None
+        for i, names in enumerate(options)
+    ]
+    if not found or found[0]:
+        # rows are only read if the columns don't already settle it
+        return found[0] if found else None
+    for start in range(0, len(df), block_size):
+        if found[0]:
+            break
+        # a block at a time, so a header near the top never copies the rest
+        # of the frame. interleaved the same way iterrows would see each row
+        block = df.iloc[start : start + block_size].to_numpy()
+        cleaned = np.array(clean_headers(block.ravel()), dtype=object).reshape(
+            block.shape
+        )
+        for i, names in enumerate(options):
+            if found[i] or not names:
+                continue
+            in_row = np.logical_and.reduce(
+                [(cleaned == name).any(axis=1) for name in names]
+            )
+            if in_row.any():
+                row = int(in_row.argmax())
+                found[i] = HeaderLocation(i, start + row, cleaned[row].tolist())
+    return next((location for location in found if location), None)
@@ -1,40 +1,110 @@
+"""
+Preprocessors for manufacturer reports, one module per manufacturer, named for
+the manufacturer as it's stored in the database (lower case, with spaces and
+hyphens as underscores).
+
+Modules are imported the first time a submission needs one, not at startup.
+"""
+
 import os
+import threading
+import time
 from importlib import import_module
-from services.utils import get_db, SESSIONLOCAL
-from services import get, post, patch, delete
-from entities.manufacturers import *
-
-db = SESSIONLOCAL()
-
-all_manufacturers_in_db = get.all_manufacturers(db)
-all_manufacturers_in_dir = [
-    manuf.split(".")[0]
-    for manuf in os.listdir("./entities/manufacturers")
-    if not manuf.startswith("__")
-]
-
-MFG_PREPROCESSORS = {}
-if not all_manufacturers_in_db:
-    pass  # don't do anything else if the db manufacturers table is empty
-else:
-
-    import_prefix = "entities.manufacturers."
-    for id_num, manufacturer_in_db in all_manufacturers_in_db.items():
+from typing import Type
+from entities.preprocessor import AbstractPreProcessor
+
+# least seconds between reads of the manufacturers table for ids that aren't in it
+MISSING_ID_RELOAD_INTERVAL = float(os.getenv("MISSING_ID_RELOAD_INTERVAL", 60))
+
+
+class PreProcessorRegistry:
+    """
+    Thread-safe lookup of the PreProcessor class for a manufacturer id.
+
+    The manufacturers table is read on first use and read again when an id
+    isn't in it, so a manufacturer added outside the app since is found, but
+    no more than once every `reload_interval` seconds, since ids come from
+    clients. A manufacturer's module is imported the first time its id is
+    looked up and the class is kept. Call `refresh` after manufacturers are
+    added, changed or removed. The table is read outside the lock.
+    """
+
+    def __init__(self, reload_interval: float = MISSING_ID_RELOAD_INTERVAL) -> None:
+        self.reload_interval = reload_interval
+        self.names: dict[int, str] | None = None
+        self.loaded_at: float = 0.0
+        self.preprocessors: dict[int, Type[AbstractPreProcessor]] = {}
+        self.lock = threading.Lock()
+
+    def _load_names(self) -> dict[int, str]:
+        from services import get
+        from services.utils import SESSIONLOCAL
+
+        with SESSIONLOCAL() as db:
+            return get.all_manufacturers(db)
+
+    def _reload_names(self) -> dict[int, str]:
+        loaded_at = time.monotonic()
+        names = self._load_names()
+        with self.lock:
+            self.names, self.loaded_at = names, loaded_at
+        return names
+
+    def _names_for(self, manufacturer_id: int) -> dict[int, str]:
+        """the names as last read, or read again if the id may have been added"""
+        with self.lock:
+            names, loaded_at = self.names, self.loaded_at
+        if names is None or (
+            manufacturer_id not in names
+            and time.monotonic() - loaded_at >= self.reload_interval
+        ):
+            names = self._reload_names()
+        return names
+
+    @staticmethod
+    def _import(name: str) -> Type[AbstractPreProcessor] | None:
+        module_name = f"{__name__}.{name}"
         try:
-            imported_obj = import_module(import_prefix + manufacturer_in_db)
-        except ModuleNotFoundError:
-            pass
-        else:
-            MFG_PREPROCESSORS[id_num] = imported_obj.PreProcessor
-            del imported_obj
-
-    del import_prefix
-    del id_num
-    del manufacturer_in_db
-
-db.close()
-del os
-del import_module
-del db
-del all_manufacturers_in_db
-del all_manufacturers_in_dir
+            module = import_module(module_name)
+        except ModuleNotFoundError as e:
+            # only a manufacturer without a module, not an import inside one
+            if e.name != module_name:
+                raise
+            return
+        return module.PreProcessor
+
+    def get(
+        self, manufacturer_id: int, default: Type[AbstractPreProcessor] | None = None
+    ) -> Type[AbstractPreProcessor] | None:
+        with self.lock:
+            if preprocessor := self.preprocessors.get(manufacturer_id):
+                return preprocessor
+        if (name := self._names_for(manufacturer_id).get(manufacturer_id)) is None:
+            return default
+        if (preprocessor := self._import(name)) is None:
+            return default
+        with self.lock:
+            self.preprocessors[manufacturer_id] = preprocessor
+        return preprocessor
+
+    def __getitem__(self, manufacturer_id: int) -> Type[AbstractPreProcessor]:
+        if (preprocessor := self.get(manufacturer_id)) is None:
+            raise KeyError(manufacturer_id)
+        return preprocessor
+
+    def __contains__(self, manufacturer_id: int) -> bool:
+        return self.get(manufacturer_id) is not None
+
+    def preload(self) -> None:
+        """look up every manufacturer in the table, importing their modules"""
+        for manufacturer_id in self._reload_names():
+            self.get(manufacturer_id)
+
+    def refresh(self) -> None:
+        """forget the manufacturer names and classes, to be looked up again"""
+        with self.lock:
+            self.names = None
+            self.preprocessors.clear()
+
+
+MFG_PREPROCESSORS = PreProcessorRegistry()
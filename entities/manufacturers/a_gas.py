@@ -68,8 +68,8 @@ class PreProcessor(AbstractPreProcessor):
         data = data.apply(self.upper_all_str)
 
         data = data.dropna(axis=1, how="all")
-        data["id_string"] = data[[customer_name_col, city_name_col]].apply(
-            "_".join, axis=1
+        data["id_string"] = self.build_id_string(
+            data[[customer_name_col, city_name_col]]
         )
 
         result = data.loc[:, ["id_string", inv_col, comm_col]]
@@ -91,7 +91,7 @@ class PreProcessor(AbstractPreProcessor):
         data = data.dropna(subset=data.columns[1])
         data[sales] *= 100
         data[commissions] *= 100
-        data["id_string"] = data[[customer, city]].apply("_".join, axis=1)
+        data["id_string"] = self.build_id_string(data[[customer, city]])
         result = data[["id_string", sales, commissions]]
         result = result.rename(columns={sales: "inv_amt", commissions: "comm_amt"})
         result = result.apply(self.upper_all_str)
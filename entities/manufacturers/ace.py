@@ -5,7 +5,15 @@ for Atlantic Chemical & Equipment (ACE)
 
 import pandas as pd
 from entities.commission_data import PreProcessedData
-from entities.preprocessor import AbstractPreProcessor
+from entities.preprocessor import AbstractPreProcessor, ReportSpec
+
+POS_REPORT = ReportSpec(
+    report_customer=True,
+    dropna_on="city",
+    upper="id_string",
+    commission_from_rate=True,
+    check_total=True,
+)
 
 
 class PreProcessor(AbstractPreProcessor):
@@ -35,55 +43,13 @@ class PreProcessor(AbstractPreProcessor):
         self, data: pd.DataFrame, **kwargs
     ) -> PreProcessedData:
 
-        data, cols = self.use_column_options(data, **kwargs)
-        customer: str = self.get_customer(**kwargs)
-        city: str = cols.city
-        state: str = cols.state
-        sales: str = cols.sales
-        commissions = "comm_amt"
-        comm_rate: float = kwargs.get("standard_commission_rate")
-
-        data.dropna(subset=city, inplace=True)
-        data.loc[:, sales] *= 100
-        data.loc[:, commissions] = data[sales] * comm_rate
-        data.loc[:, "customer"] = customer
-        data.loc[:, "id_string"] = data[["customer", city, state]].apply(
-            "_".join, axis=1
-        )
-        result = data[["id_string", sales, commissions]].rename(
-            columns={sales: "inv_amt", commissions: "comm_amt"}
-        )
-        result = result.apply(self.upper_all_str)
-        result = result.astype(self.EXPECTED_TYPES)
-        self.assert_commission_amounts_match(result, **kwargs)
-        return PreProcessedData(result)
+        return self.preprocess_with_spec(data, POS_REPORT, **kwargs)
 
     def _baker_report_preprocessing(
         self, data: pd.DataFrame, **kwargs
     ) -> PreProcessedData:
 
-        data, cols = self.use_column_options(data, **kwargs)
-        customer: str = self.get_customer(**kwargs)
-        city: str = cols.city
-        state: str = cols.state
-        sales: str = cols.sales
-        commissions = "comm_amt"
-        comm_rate: float = kwargs.get("standard_commission_rate")
-
-        data.dropna(subset=city, inplace=True)
-        data.loc[:, sales] *= 100
-        data.loc[:, commissions] = data[sales] * comm_rate
-        data.loc[:, "customer"] = customer
-        data.loc[:, "id_string"] = data[["customer", city, state]].apply(
-            "_".join, axis=1
-        )
-        result = data[["id_string", sales, commissions]].rename(
-            columns={sales: "inv_amt", commissions: "comm_amt"}
-        )
-        result = result.apply(self.upper_all_str)
-        result = result.astype(self.EXPECTED_TYPES)
-        self.assert_commission_amounts_match(result, **kwargs)
-        return PreProcessedData(result)
+        return self.preprocess_with_spec(data, POS_REPORT, **kwargs)
 
     def preprocess(self, **kwargs) -> PreProcessedData:
         method_by_name = {
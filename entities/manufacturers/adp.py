@@ -45,9 +45,10 @@ class PreProcessor(AbstractPreProcessor):
         ).reset_index()
 
         result = result.drop(columns=["customer", "shipto"])
-        result = result.apply(self.upper_all_str)
 
-        result["id_string"] = result[[customer, city, state]].apply("_".join, axis=1)
+        result["id_string"] = self.build_id_string(
+            result[[customer, city, state]], normalize=True
+        )
         result = result[["id_string", sales, commission]].rename(
             columns={sales: "inv_amt", commission: "comm_amt"}
         )
@@ -118,8 +119,8 @@ class PreProcessor(AbstractPreProcessor):
             data.loc[:, sales] = data[sales_alt] * 100
             data.loc[:, commission] = data.iloc[:, commission_alt] * 100
             data.loc[:, "customer"] = customer
-            data.loc[:, "id_string"] = data[["customer", city, state]].apply(
-                "_".join, axis=1
+            data.loc[:, "id_string"] = self.build_id_string(
+                data[["customer", city, state]]
             )
         else:
             data = data.dropna(subset=data.columns[1])
@@ -127,8 +128,8 @@ class PreProcessor(AbstractPreProcessor):
             data.loc[:, sales] = data.pop("cost") * split * 100
             data.loc[:, commission] = data[sales] * comm_rate
             data.loc[:, "id_string"] = customer
-            data.loc[:, "id_string"] = data[["id_string", location]].apply(
-                "_".join, axis=1
+            data.loc[:, "id_string"] = self.build_id_string(
+                data[["id_string", location]]
             )
         result = data.loc[:, ["id_string", sales, commission]]
         result = result.apply(self.upper_all_str)
@@ -233,9 +234,8 @@ class PreProcessor(AbstractPreProcessor):
         assert result[sales].sum() == 0, "sales values do not add up to zero"
         assert result[commission].sum() == 0, "commission values do not add up to zero"
         result = result[result["state"].isin(territory)]
-        result = result.apply(self.upper_all_str)
-        result["id_string"] = result[["customer", "city", "state"]].apply(
-            "_".join, axis=1
+        result["id_string"] = self.build_id_string(
+            result[["customer", "city", "state"]], normalize=True
         )
         result = result[["id_string", sales, commission]]
         result = result.astype(self.EXPECTED_TYPES)
@@ -278,7 +278,7 @@ class PreProcessor(AbstractPreProcessor):
         data["customer"] = customer
         data.loc[:, sales] *= 100
         data.loc[:, commission] *= 100
-        data["id_string"] = data[["customer", city, state]].apply("_".join, axis=1)
+        data["id_string"] = self.build_id_string(data[["customer", city, state]])
         result = (
             data[["id_string", sales, commission]]
             .rename(columns={sales: "inv_amt", commission: "comm_amt"})
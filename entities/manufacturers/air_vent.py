@@ -49,7 +49,9 @@ class PreProcessor(AbstractPreProcessor):
         result[comm_col_name] *= 100
         result = result.apply(self.upper_all_str)
         result.columns = [customer_col_name, city_col_name, state_col_name, inv_col_name, comm_col_name]
-        result["id_string"] = result[[customer_col_name, city_col_name, state_col_name]].apply("_".join, axis=1)
+        result["id_string"] = self.build_id_string(
+            result[[customer_col_name, city_col_name, state_col_name]]
+        )
         result = result.iloc[:,-3:]
         return PreProcessedData(result)
 
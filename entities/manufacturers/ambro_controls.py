@@ -41,9 +41,9 @@ class PreProcessor(AbstractPreProcessor):
         result.loc[:, inv_col] *= 100
         result.loc[:, comm_col] *= 100
         result = result.apply(self.upper_all_str)
-        result["id_string"] = result[
-            [customer_name_col, city_name_col, active_state_col]
-        ].apply("_".join, axis=1)
+        result["id_string"] = self.build_id_string(
+            result[[customer_name_col, city_name_col, active_state_col]]
+        )
         result.columns = [
             "customer",
             "city",
@@ -80,8 +80,8 @@ class PreProcessor(AbstractPreProcessor):
             data["comm_amt"] = data[comm_col] * 100
         else:
             data["comm_amt"] = data[sales_amt_col] * comm_rate
-        data["id_string"] = data[["customer", city_name_col, state_name_col]].apply(
-            "_".join, axis=1
+        data["id_string"] = self.build_id_string(
+            data[["customer", city_name_col, state_name_col]]
         )
         result = data[["id_string", sales_amt_col, "comm_amt"]]
         result.columns = ["id_string", "inv_amt", "comm_amt"]
@@ -102,7 +102,7 @@ class PreProcessor(AbstractPreProcessor):
         data["customer"] = customer
         data[inv_amt] *= 100
         data[comm_amt] *= 100
-        data["id_string"] = data[["customer", city, state]].apply("_".join, axis=1)
+        data["id_string"] = self.build_id_string(data[["customer", city, state]])
         result = data[["id_string", inv_amt, comm_amt]]
         result = result.rename(columns={inv_amt: "inv_amt", comm_amt: "comm_amt"})
         result = result.astype(self.EXPECTED_TYPES)
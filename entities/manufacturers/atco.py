@@ -6,7 +6,9 @@ for Atco Flex
 import re
 import pandas as pd
 from entities.commission_data import PreProcessedData
-from entities.preprocessor import AbstractPreProcessor
+from entities.preprocessor import AbstractPreProcessor, ReportSpec
+
+STANDARD_REPORT = ReportSpec(upper="id_string", check_total=True)
 
 
 class PreProcessor(AbstractPreProcessor):
@@ -14,26 +16,7 @@ class PreProcessor(AbstractPreProcessor):
     def _standard_report_preprocessing(
         self, data: pd.DataFrame, **kwargs
     ) -> PreProcessedData:
-
-        data, cols = self.use_column_options(data, **kwargs)
-        customer: str = cols.customer
-        city: str = cols.city
-        state: str = cols.state
-        sales: str = cols.sales
-        commissions: str = cols.commissions
-
-        data = data.dropna(subset=data.columns[0])
-        data[sales] *= 100
-        data[commissions] *= 100
-        data["id_string"] = data[[customer, city, state]].apply("_".join, axis=1)
-        result = (
-            data[["id_string", sales, commissions]]
-            .rename(columns={sales: "inv_amt", commissions: "comm_amt"})
-            .apply(self.upper_all_str)
-        )
-        result = result.astype(self.EXPECTED_TYPES)
-        self.assert_commission_amounts_match(result, **kwargs)
-        return PreProcessedData(result)
+        return self.preprocess_with_spec(data, STANDARD_REPORT, **kwargs)
 
     def _re_michel_report_preprocessing(
         self, data: pd.DataFrame, **kwargs
@@ -110,9 +93,7 @@ class PreProcessor(AbstractPreProcessor):
         result = result.apply(self.upper_all_str)
         result.columns = result_columns
         result["store_number"] = result["store_number"].astype(str)
-        result["id_string"] = result[result.columns.tolist()[:4]].apply(
-            "_".join, axis=1
-        )
+        result["id_string"] = self.build_id_string(result[result.columns.tolist()[:4]])
         result = result.loc[:, ["id_string", "inv_amt", "comm_amt"]]
         result = result.astype(self.EXPECTED_TYPES)
         return PreProcessedData(result)
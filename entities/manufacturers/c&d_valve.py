@@ -117,7 +117,7 @@ class PreProcessor(AbstractPreProcessor):
             suffixes=(None, "_1"),
         )
         id_cols = ["customer", "city", "state"]
-        merged["id_string"] = merged[id_cols].fillna("").apply("_".join, axis=1)
+        merged["id_string"] = self.build_id_string(merged[id_cols].fillna(""))
         # drop invoice number column
         result_cols = ["id_string", "inv_amt", "comm_amt"]
         result = merged.loc[:, result_cols]
@@ -168,7 +168,7 @@ class PreProcessor(AbstractPreProcessor):
 
         merged = data.merge(sales_report, how="left", on="invoicenumber")
         id_cols = [customer, city, state]
-        merged["id_string"] = merged[id_cols].fillna("").apply("_".join, axis=1)
+        merged["id_string"] = self.build_id_string(merged[id_cols].fillna(""))
 
         result = merged[["id_string", sales, commission]]
         result[sales] *= 100
@@ -217,15 +217,15 @@ class PreProcessor(AbstractPreProcessor):
                 * 100
             )
             data["customer"] = customer
-            data["id_string"] = (
-                data[["customer", city, state]].astype(str).apply("_".join, axis=1)
+            data["id_string"] = self.build_id_string(
+                data[["customer", city, state]].astype(str)
             )
         else:
             data["inv_amt"] = data.iloc[:, monthly_sales].fillna(0).sum(axis=1) * 100
             data["comm_amt"] = data.iloc[:, commissions].fillna(0).sum(axis=1) * 100
             data["customer"] = customer
-            data["id_string"] = (
-                data.iloc[:, [-1, city, state]].astype(str).apply("_".join, axis=1)
+            data["id_string"] = self.build_id_string(
+                data.iloc[:, [-1, city, state]].astype(str)
             )
         result = data.loc[:, ["id_string", "inv_amt", "comm_amt"]].apply(
             self.upper_all_str
@@ -271,15 +271,15 @@ class PreProcessor(AbstractPreProcessor):
                 * 100
             )
             data["customer"] = customer
-            data["id_string"] = (
-                data[["customer", city, state]].astype(str).apply("_".join, axis=1)
+            data["id_string"] = self.build_id_string(
+                data[["customer", city, state]].astype(str)
             )
         else:
             data["inv_amt"] = data.iloc[:, monthly_sales].fillna(0).sum(axis=1) * 100
             data["comm_amt"] = data.iloc[:, commissions].fillna(0).sum(axis=1) * 100
             data["customer"] = customer
-            data["id_string"] = (
-                data.iloc[:, [-1, city, state]].astype(str).apply("_".join, axis=1)
+            data["id_string"] = self.build_id_string(
+                data.iloc[:, [-1, city, state]].astype(str)
             )
         result = data.loc[:, ["id_string", "inv_amt", "comm_amt"]].apply(
             self.upper_all_str
@@ -24,7 +24,7 @@ class PreProcessor(AbstractPreProcessor):
         data[inv_amt] *= 100
         data["comm_amt"] = data[inv_amt]*comm_rate
         data = data.groupby(id_cols).sum(numeric_only=True).reset_index()
-        data["id_string"] = data[id_cols].apply("_".join, axis=1)
+        data["id_string"] = self.build_id_string(data[id_cols])
         result = data.loc[:,["id_string",inv_amt,"comm_amt"]]
         result = result.rename(columns={inv_amt: "inv_amt"})
 
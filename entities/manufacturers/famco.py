@@ -38,7 +38,7 @@ class PreProcessor(AbstractPreProcessor):
         result.loc[:, inv_amt] *= 100.0
         result.loc[:, comm_amt] *= 100.0
         result = result.apply(self.upper_all_str)
-        result["id_string"] = result[id_cols].apply("_".join, axis=1)
+        result["id_string"] = self.build_id_string(result[id_cols])
         result = result[["id_string", inv_amt, comm_amt]]
         result.columns = ["id_string", "inv_amt", "comm_amt"]
         result = result.astype(self.EXPECTED_TYPES)
@@ -66,7 +66,7 @@ class PreProcessor(AbstractPreProcessor):
         data.loc[:, "comm_amt"] = data[inv_amt] * comm_rate
         data["customer"] = customer
         data = data.apply(self.upper_all_str)
-        data["id_string"] = data[["customer", city, state]].apply("_".join, axis=1)
+        data["id_string"] = self.build_id_string(data[["customer", city, state]])
         result_cols = ["id_string", "inv_amt", "comm_amt"]
         result = data[["id_string", inv_amt, "comm_amt"]]
         result.columns = result_cols
@@ -37,7 +37,7 @@ class PreProcessor(AbstractPreProcessor):
         result = result.apply(self.upper_all_str)
         col_names = ["customer", "city", "state", "inv_amt", "comm_amt"]
         result.columns = col_names
-        result["id_string"] = result[col_names[:3]].apply("_".join, axis=1)
+        result["id_string"] = self.build_id_string(result[col_names[:3]])
         result = result[["id_string", "inv_amt", "comm_amt"]].astype(
             self.EXPECTED_TYPES
         )
@@ -76,10 +76,10 @@ class PreProcessor(AbstractPreProcessor):
         ]
         result.loc[:, inv_col] *= 100
         result.loc[:, comm_col] *= 100
-        result["id_string"] = (
-            result[[store_number_col, "customer", city_name_col, state_name_col]]
-            .fillna("")
-            .apply("_".join, axis=1)
+        result["id_string"] = self.build_id_string(
+            result[
+                [store_number_col, "customer", city_name_col, state_name_col]
+            ].fillna("")
         )
         result = result.loc[:, ["id_string", inv_col, comm_col]]
         result = result.rename(columns={inv_col: "inv_amt", comm_col: "comm_amt"})
@@ -109,8 +109,8 @@ class PreProcessor(AbstractPreProcessor):
         result = data[["customer", ship_to, state, sales, comm]]
         result.loc[:, sales] *= 100
         result.loc[:, comm] *= 100
-        result["id_string"] = (
-            result[["customer", ship_to, state]].fillna("").apply("_".join, axis=1)
+        result["id_string"] = self.build_id_string(
+            result[["customer", ship_to, state]].fillna("")
         )
         result = result[["id_string", sales, comm]]
         result = result.rename(columns={sales: "inv_amt", comm: "comm_amt"})
@@ -138,8 +138,8 @@ class PreProcessor(AbstractPreProcessor):
         result = data[["customer", ship_to, state, sales, comm]]
         result.loc[:, sales] *= 100
         result.loc[:, comm] *= 100
-        result["id_string"] = (
-            result[["customer", ship_to, state]].fillna("").apply("_".join, axis=1)
+        result["id_string"] = self.build_id_string(
+            result[["customer", ship_to, state]].fillna("")
         )
         result = result[["id_string", sales, comm]]
         result = result.rename(columns={sales: "inv_amt", comm: "comm_amt"})
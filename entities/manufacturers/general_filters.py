@@ -79,7 +79,7 @@ class PreProcessor(AbstractPreProcessor):
         result["comm_amt"] *= 100
         result = result.apply(self.upper_all_str)
         col_names = ["customer", "location", "inv_amt", "comm_amt"]
-        result["id_string"] = result[col_names[:2]].apply("_".join, axis=1)
+        result["id_string"] = self.build_id_string(result[col_names[:2]])
         result = result[["id_string", "inv_amt", "comm_amt"]]
         result = result.astype(self.EXPECTED_TYPES)
         return PreProcessedData(result)
@@ -106,7 +106,7 @@ class PreProcessor(AbstractPreProcessor):
         data[inv_amt] *= 100
         data[comm_amt] *= 100
         data = data.apply(self.upper_all_str)
-        data["id_string"] = data[[customer, city, state]].apply("_".join, axis=1)
+        data["id_string"] = self.build_id_string(data[[customer, city, state]])
         result = data[["id_string", inv_amt, comm_amt]]
         result = result.astype(self.EXPECTED_TYPES)
         return PreProcessedData(result)
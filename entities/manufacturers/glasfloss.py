@@ -47,7 +47,7 @@ class PreProcessor(AbstractPreProcessor):
         col_names = ["customer", "city", "state", "inv_amt", commission]
         result.columns = col_names
         result = result.apply(self.upper_all_str)
-        result["id_string"] = result[col_names[:3]].apply("_".join, axis=1)
+        result["id_string"] = self.build_id_string(result[col_names[:3]])
         result = result[["id_string", "inv_amt", commission]]
         result = result.astype(self.EXPECTED_TYPES)
         return PreProcessedData(result)
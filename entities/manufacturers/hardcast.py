@@ -39,7 +39,7 @@ class PreProcessor(AbstractPreProcessor):
 
         col_names = ["customer", "city", "state", "inv_amt", "comm_amt"]
         result.columns = col_names
-        result["id_string"] = result[col_names[:3]].apply("_".join, axis=1)
+        result["id_string"] = self.build_id_string(result[col_names[:3]])
         result = result.loc[:, ["id_string"]+col_names[-2:]] # only return id string and dollar amounts
         return PreProcessedData(result)
 
@@ -32,7 +32,7 @@ class PreProcessor(AbstractPreProcessor):
         result = result.groupby(result.columns[:3].to_list()).sum().reset_index()
         result.loc[:, sales] *= 100
         result.loc[:, commissions] *= 100
-        result["id_string"] = result[result.columns[:3]].apply("_".join, axis=1)
+        result["id_string"] = self.build_id_string(result[result.columns[:3]])
         result = (
             result[["id_string", sales, commissions]]
             .apply(self.upper_all_str)
@@ -78,8 +78,8 @@ class PreProcessor(AbstractPreProcessor):
         result.loc[:, "inv_amt"] *= 100
         result.loc[:, "comm_amt"] = result.loc[:, "inv_amt"] * comm_rate
         result = result.apply(self.upper_all_str)
-        result["id_string"] = result[["customer", "city", "state"]].apply(
-            "_".join, axis=1
+        result["id_string"] = self.build_id_string(
+            result[["customer", "city", "state"]]
         )
         result = result[["id_string", "inv_amt", "comm_amt"]]
         result = result.astype(self.EXPECTED_TYPES)
@@ -151,9 +151,8 @@ class PreProcessor(AbstractPreProcessor):
 
         col_names = ["customer", "city", "state", "inv_amt", "comm_amt"]
         result.columns = col_names
-        result["id_string"] = result[col_names[:3]].apply(
-            "_".join, axis=1
-        )  # empty city col makes this 'customer__state'
+        # empty city col makes this 'customer__state'
+        result["id_string"] = self.build_id_string(result[col_names[:3]])
         result = result[result.columns[-3:]].astype(self.EXPECTED_TYPES)
         return PreProcessedData(result)
 
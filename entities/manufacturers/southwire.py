@@ -5,7 +5,9 @@ for Genesis Cable / Resideo
 
 import pandas as pd
 from entities.commission_data import PreProcessedData
-from entities.preprocessor import AbstractPreProcessor
+from entities.preprocessor import AbstractPreProcessor, ReportSpec
+
+POS_REPORT = ReportSpec(report_customer=True, dropna_on="city")
 
 
 class PreProcessor(AbstractPreProcessor):
@@ -32,7 +34,7 @@ class PreProcessor(AbstractPreProcessor):
         col_names = ["customer", "city", "state", "inv_amt", "comm_amt"]
         result.columns = col_names
         result = result.apply(self.upper_all_str)
-        result["id_string"] = result[col_names[:3]].apply("_".join, axis=1)
+        result["id_string"] = self.build_id_string(result[col_names[:3]])
         result = result[["id_string", "inv_amt", "comm_amt"]]
         return PreProcessedData(result)
 
@@ -84,9 +86,9 @@ class PreProcessor(AbstractPreProcessor):
             branch_proportions["comm_amt"] = (
                 branch_proportions["total_share"] * total_comm
             )
-            branch_proportions["id_string"] = branch_proportions[
-                ["customer", "state"]
-            ].apply("_".join, axis=1)
+            branch_proportions["id_string"] = self.build_id_string(
+                branch_proportions[["customer", "state"]]
+            )
             result = branch_proportions[["id_string", "inv_amt", "comm_amt"]]
         else:
             specified_customer = self.get_customer(**kwargs)
@@ -146,7 +148,7 @@ class PreProcessor(AbstractPreProcessor):
         col_names = ["customer", "city", "state", "inv_amt", "comm_amt"]
         result.columns = col_names
         result = result.apply(self.upper_all_str)
-        result["id_string"] = result[col_names[:3]].apply("_".join, axis=1)
+        result["id_string"] = self.build_id_string(result[col_names[:3]])
         return PreProcessedData(result)
 
     def _rebate_detail_report_preprocessing(
@@ -193,7 +195,7 @@ class PreProcessor(AbstractPreProcessor):
         data[sales] *= 100
         data[commission] = data[sales] * comm_rate
         data[commission] = data[commission].astype(float)
-        data["id_string"] = data[["customer", city, state]].apply("_".join, axis=1)
+        data["id_string"] = self.build_id_string(data[["customer", city, state]])
         result = data[["id_string", sales, commission]].rename(
             columns={sales: "inv_amt"}
         )
@@ -203,47 +205,13 @@ class PreProcessor(AbstractPreProcessor):
         self, data: pd.DataFrame, **kwargs
     ) -> PreProcessedData:
 
-        data, cols_used = self.use_column_options(data, **kwargs)
-        customer: str = self.get_customer(**kwargs)
-        city: str = cols_used.city
-        state: str = cols_used.state
-        sales: str = cols_used.sales
-        commission: str = cols_used.commissions
-
-        data = data.dropna(subset=city)
-        data.loc[:, "customer"] = customer
-        data[sales] = data[sales].astype(float)
-        data[commission] = data[commission].astype(float)
-        data[sales] *= 100
-        data[commission] *= 100
-        data["id_string"] = data[["customer", city, state]].apply("_".join, axis=1)
-        result = data[["id_string", sales, commission]].rename(
-            columns={sales: "inv_amt", commission: "comm_amt"}
-        )
-        return PreProcessedData(result)
+        return self.preprocess_with_spec(data, POS_REPORT, **kwargs)
 
     def _uri_report_preprocessing(
         self, data: pd.DataFrame, **kwargs
     ) -> PreProcessedData:
 
-        data, cols_used = self.use_column_options(data, **kwargs)
-        customer: str = self.get_customer(**kwargs)
-        city: str = cols_used.city
-        state: str = cols_used.state
-        sales: str = cols_used.sales
-        commission: str = cols_used.commissions
-
-        data = data.dropna(subset=city)
-        data.loc[:, "customer"] = customer
-        data[sales] = data[sales].astype(float)
-        data[commission] = data[commission].astype(float)
-        data[sales] *= 100
-        data[commission] *= 100
-        data["id_string"] = data[["customer", city, state]].apply("_".join, axis=1)
-        result = data[["id_string", sales, commission]].rename(
-            columns={sales: "inv_amt", commission: "comm_amt"}
-        )
-        return PreProcessedData(result)
+        return self.preprocess_with_spec(data, POS_REPORT, **kwargs)
 
     def preprocess(self, **kwargs) -> PreProcessedData:
         method_by_name = {
@@ -78,7 +78,7 @@ class PreProcessor(AbstractPreProcessor):
 
         col_names = ["customer", "city", "inv_amt", "comm_amt"]
         result.columns = col_names
-        result["id_string"] = result[col_names[:2]].apply("_".join, axis=1)
+        result["id_string"] = self.build_id_string(result[col_names[:2]])
         result = result[["id_string", "inv_amt", "comm_amt"]]
         result = result.astype(self.EXPECTED_TYPES)
         return PreProcessedData(result)
@@ -106,7 +106,7 @@ class PreProcessor(AbstractPreProcessor):
         data = data.groupby(id_cols).sum(numeric_only=True).reset_index()
         data.insert(0, "customer", DEFAULT_NAME)
         id_cols = [store_number, "customer", city, state]
-        data["id_string"] = data[id_cols].apply("_".join, axis=1)
+        data["id_string"] = self.build_id_string(data[id_cols])
         result = data.iloc[:, -3:]
         result.columns = ["inv_amt", "comm_amt", "id_string"]
         new_col_order = result.columns.to_list()
@@ -141,7 +141,7 @@ class PreProcessor(AbstractPreProcessor):
         data.insert(0, "customer", DEFAULT_NAME)
         id_cols = [store_number, "customer", city, state]
         data[store_number] = data[store_number].astype(str)
-        data["id_string"] = data[id_cols].apply("_".join, axis=1)
+        data["id_string"] = self.build_id_string(data[id_cols])
         result = data.iloc[:, -3:]
         result.columns = ["inv_amt", "comm_amt", "id_string"]
         new_col_order = result.columns.to_list()
@@ -5,7 +5,14 @@ for Tjernlund
 
 import pandas as pd
 from entities.commission_data import PreProcessedData
-from entities.preprocessor import AbstractPreProcessor
+from entities.preprocessor import AbstractPreProcessor, ReportColumns, ReportSpec
+
+TEMPLATE_REPORT = ReportSpec(
+    columns=ReportColumns(
+        customer="customer", city="city", sales="sales", commissions="commission"
+    ),
+    upper="columns",
+)
 
 
 class PreProcessor(AbstractPreProcessor):
@@ -42,24 +49,7 @@ class PreProcessor(AbstractPreProcessor):
         self, data: pd.DataFrame, **kwargs
     ) -> PreProcessedData:
         """process a manually-filled template"""
-        customer = "customer"
-        city = "city"
-        sales = "sales"
-        commission = "commission"
-
-        data = self.check_headers_and_fix(
-            cols=[customer, city, sales, commission], df=data
-        )
-        data = data.dropna(subset=data.columns[0])
-        data = data.dropna(axis=1, how="all")
-        data = data.apply(self.upper_all_str)
-        data.loc[:, sales] *= 100
-        data.loc[:, commission] *= 100
-        data["id_string"] = data[[customer, city]].apply("_".join, axis=1)
-        result = data[["id_string", sales, commission]]
-        result = result.rename(columns={sales: "inv_amt", commission: "comm_amt"})
-        result = result.astype(self.EXPECTED_TYPES)
-        return PreProcessedData(result)
+        return self.preprocess_with_spec(data, TEMPLATE_REPORT, **kwargs)
 
     def _re_michel_report_preprocessing(
         self, data: pd.DataFrame, **kwargs
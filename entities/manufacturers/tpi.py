@@ -25,7 +25,7 @@ class PreProcessor(AbstractPreProcessor):
         data.loc[:, commissions] = data[commissions].str.replace(r'[^0-9.]','',regex=True).astype(float)
         data.loc[:, commissions] *= 100
         data.loc[:, commissions] *= data['sales_sign']
-        data['id_string'] = data[[customer,city,state]].apply("_".join, axis=1)
+        data['id_string'] = self.build_id_string(data[[customer,city,state]])
         result = data[['id_string', sales, commissions]]
         result = result.rename(columns={sales: 'inv_amt', commissions: 'comm_amt'})
         result = result.astype(self.EXPECTED_TYPES)
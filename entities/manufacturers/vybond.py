@@ -56,7 +56,7 @@ class PreProcessor(AbstractPreProcessor):
         data.loc[:, "customer"] = customer
         result = data.loc[:, ["customer", city, state, sales, commission]]
         result = result.apply(self.upper_all_str)
-        result["id_string"] = result[["customer", city, state]].apply("_".join, axis=1)
+        result["id_string"] = self.build_id_string(result[["customer", city, state]])
         if sales != "inv_amt":
             result.rename(columns={sales: "inv_amt"}, inplace=True)
             sales = "inv_amt"
@@ -78,8 +78,9 @@ class PreProcessor(AbstractPreProcessor):
         result = data.loc[:, [customer, city, state, sales, commission]]
         result.loc[:, sales] *= 100
         result.loc[:, commission] *= 100
-        result = result.apply(self.upper_all_str)
-        result["id_string"] = result[result.columns[:3]].apply("_".join, axis=1)
+        result["id_string"] = self.build_id_string(
+            result[result.columns[:3]], normalize=True
+        )
         result = result[["id_string", sales, commission]].rename(
             columns={sales: "inv_amt", commission: "comm_amt"}
         )
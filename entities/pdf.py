@@ -0,0 +1,135 @@
+"""
+Text and table extraction from PDF commission reports.
+
+Text is extracted from pages concurrently in a pool of worker processes, since
+PyPDF2's text extraction is pure Python and holds the GIL. Each worker imports
+this module, and pandas with it, so the pool is small by default (PDF_WORKERS,
+capped at the CPUs this process may run on) and shut down with the app.
+
+Tables are read by tabula, which with JPype1 installed runs in a JVM started
+once in this process instead of a new java subprocess on every read. What a file extracts to is
+cached by the file's hash, so a retried or resubmitted file isn't extracted again.
+
+PyPDF2 and tabula are imported on first use, to keep them out of app startup.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from multiprocessing import get_context
+from typing import IO, Any, Hashable
+import pandas as pd
+
+# files with fewer pages than this are read in-process, the pool isn't worth it
+PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", 16))
+# 0 or 1 reads every file in-process. os.cpu_count() is the host's in a
+# container, sched_getaffinity is what this process may actually run on
+PDF_WORKERS = min(
+    int(os.getenv("PDF_WORKERS", 2)),
+    len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else 1,
+)
+
+
+class ExtractionCache:
+    """
+    Thread-safe in-memory storage of extracted file contents by file hash.
+
+    Only the most recently used `max_entries` files are kept.
+    """
+
+    def __init__(self, max_entries: int = 32) -> None:
+        self.max_entries = max_entries
+        self.entries: OrderedDict[Hashable, Any] = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any | None:
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                return self.entries[key]
+            return
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+
+TEXT_CACHE = ExtractionCache()
+TABLE_CACHE = ExtractionCache()
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def pool() -> ProcessPoolExecutor:
+    """the worker pool, started on first use and kept for the life of the process"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn rather than fork the server process and its threads
+            _pool = ProcessPoolExecutor(PDF_WORKERS, mp_context=get_context("spawn"))
+        return _pool
+
+
+def shutdown_pool() -> None:
+    """stop the worker pool, if it was started. called at app shutdown"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+        _pool = None
+
+
+def _extract_pages(file_data: bytes, start: int, stop: int) -> list[str]:
+    """the text of pages [start, stop) of the file, one string per page"""
+    from PyPDF2 import PdfReader
+
+    pages = PdfReader(BytesIO(file_data)).pages
+    return [pages[i].extract_text() for i in range(start, stop)]
+
+
+def extract_page_text(file_data: bytes) -> list[str]:
+    """the text of every page in the file, in page order"""
+    from PyPDF2 import PdfReader
+
+    num_pages = len(PdfReader(BytesIO(file_data)).pages)
+    if num_pages < PARALLEL_MIN_PAGES or PDF_WORKERS < 2:
+        return _extract_pages(file_data, 0, num_pages)
+    # one contiguous range of pages per worker, so each parses the file once
+    step = -(-num_pages // PDF_WORKERS)
+    starts = range(0, num_pages, step)
+    stops = [min(start + step, num_pages) for start in starts]
+    chunks = pool().map(_extract_pages, [file_data] * len(starts), starts, stops)
+    return [text for chunk in chunks for text in chunk]
+
+
+def text_lines(file: IO[bytes], file_hash: str) -> pd.Series:
+    """
+    The non-blank lines of text in the file, stripped.
+
+    Pages are joined end to end before splitting into lines, as they
+    always have been, so a page that doesn't end in a line break runs
+    into the first line of the next.
+    """
+    if (lines := TEXT_CACHE.get(file_hash)) is None:
+        all_text = "".join(extract_page_text(file.read()))
+        lines = pd.Series(
+            [line.strip() for line in all_text.splitlines() if line.strip()]
+        )
+        TEXT_CACHE.set(file_hash, lines)
+    # preprocessors modify what they're given
+    return lines.copy()
+
+
+def tables(file: IO[bytes], file_hash: str) -> list[pd.DataFrame]:
+    """every table tabula finds in the file, from all pages"""
+    if (found := TABLE_CACHE.get(file_hash)) is None:
+        import tabula
+
+        found = tabula.read_pdf(file, pages="all")
+        TABLE_CACHE.set(file_hash, found)
+    return [table.copy() for table in found]
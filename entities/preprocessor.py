@@ -1,9 +1,11 @@
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from dataclasses import dataclass, astuple
 from math import isclose
+from typing import Literal
 from pandas import Series, DataFrame
 from entities.commission_data import PreProcessedData
 from entities.commission_file import CommissionFile
+from entities.headers import HeaderLocation, locate_header
 
 
 @dataclass
@@ -15,6 +17,32 @@ class ReportColumns:
     commissions: str = None
 
 
+@dataclass(frozen=True)
+class ReportSpec:
+    """
+    A report that only needs the common preprocessing steps, described
+    instead of coded, for AbstractPreProcessor.preprocess_with_spec.
+
+    columns: the report's (normalized) column names. If not given, they're
+        picked from the column name options for the report in the database
+    report_customer: start id strings with the customer the report is for,
+        instead of a customer column
+    dropna_on: rows missing a value in this column ("first", or one of the
+        ReportColumns fields) are dropped
+    upper: upper case and strip the id string's "columns" before joining them,
+        or the joined "id_string"
+    commission_from_rate: commissions are sales times the standard commission rate
+    check_total: assert commissions add up to the total commission amount reported
+    """
+
+    columns: ReportColumns | None = None
+    report_customer: bool = False
+    dropna_on: str = "first"
+    upper: Literal["columns", "id_string"] | None = None
+    commission_from_rate: bool = False
+    check_total: bool = False
+
+
 class AbstractPreProcessor(ABC):
 
     EXPECTED_TYPES = {"id_string": object, "inv_amt": float, "comm_amt": float}
@@ -34,6 +62,23 @@ class AbstractPreProcessor(ABC):
                 pass
         return col_cp
 
+    @staticmethod
+    def build_id_string(id_data: DataFrame, normalize: bool = False) -> Series:
+        """join the id columns (i.e. customer, city, state) of each row with "_"
+
+        Gives the same result as `id_data.apply("_".join, axis=1)`, but
+        concatenates a column at a time instead of calling join on every row.
+        With `normalize`, each column is passed through upper_all_str first.
+
+        Returns: Series"""
+        parts = [id_data.iloc[:, i].astype(object) for i in range(id_data.shape[1])]
+        if normalize:
+            parts = [AbstractPreProcessor.upper_all_str(part) for part in parts]
+        if any(part.isna().any() for part in parts):
+            # a missing value could never be joined into an id string row-wise
+            raise TypeError("id string columns contain missing values")
+        return parts[0].str.cat(parts[1:], sep="_")
+
     @staticmethod
     def get_customer(**kwargs) -> str:
         """Get the specified customer sent as specified_customer
@@ -50,41 +95,42 @@ class AbstractPreProcessor(ABC):
         else:
             return "customer"
 
+    @staticmethod
+    def normalize_column_names(df: DataFrame) -> DataFrame:
+        return df.rename(columns=lambda col: str(col).lower().replace(" ", "")).replace(
+            "\n", ""
+        )
+
+    @staticmethod
+    def set_header_row(df: DataFrame, location: HeaderLocation) -> DataFrame:
+        """set the df to use the located row as header
+        and next row is the first row"""
+        if location.row is None:
+            return df
+        index = df.index[location.row]
+        df.columns = location.header
+        return df.iloc[index + 1 :]
+
     @staticmethod
     def check_headers_and_fix(
         cols: str | list[str], df: DataFrame, indicate: bool = False
     ) -> DataFrame | tuple[DataFrame, bool]:
         """check that a dataframe's headers contain the column name(s)
         supplied in cols. If the dataframe columns do not match,
-        iterate through the rows to find the first row with column headers
+        search the rows to find the first row with column headers
         and set the dataframe as if all prior rows had been skipped upon loading
 
         if the rows never reveal column headers, the original dataframe is returned
 
         Returns: DataFrame"""
 
-        indicator = False
         if isinstance(cols, str):
             cols = [cols]
-        # check that my columns contain the headers I expect
-        df = df.rename(columns=lambda col: str(col).lower().replace(" ", "")).replace(
-            "\n", ""
-        )
-        if not set(cols) <= set(df.columns):
-            # iterate through the rows until we find the column header
-            for index, row in df.iterrows():
-                row_vals = [
-                    CommissionFile.clean_header(value) for value in row.values.tolist()
-                ]
-                if set(cols) <= set(row_vals):
-                    # set the df to use the column row as header
-                    # and next row is the first row
-                    df.columns = row_vals
-                    df = df.iloc[index + 1 :]
-                    indicator = True
-                    break
-        else:
-            indicator = True
+        df = AbstractPreProcessor.normalize_column_names(df)
+        location = locate_header(df, [cols])
+        if location:
+            df = AbstractPreProcessor.set_header_row(df, location)
+        indicator = location is not None
         return (df, indicator) if indicate else df
 
     def use_column_options(
@@ -92,23 +138,63 @@ class AbstractPreProcessor(ABC):
     ) -> tuple[DataFrame, ReportColumns]:
         """Just pass kwargs from the Preprocessor"""
         column_name_options: list[dict] = kwargs.get("column_names")
-        cols_used = {}
-        for names_option in column_name_options:
-            names_option_stripped = [
-                name for name in list(names_option.values()) if name
-            ]
-            data, cols_were_used = self.check_headers_and_fix(
-                names_option_stripped, data, indicate=True
-            )
-            if cols_were_used:
-                cols_used = names_option
-                break
-        if not cols_used:
+        names_options = [
+            [name for name in list(names_option.values()) if name]
+            for names_option in column_name_options
+        ]
+        data = self.normalize_column_names(data)
+        location = locate_header(data, names_options)
+        if not location:
             raise Exception(
                 "column names discoverable in the data do not match"
                 " any of the options given"
             )
-        return data, ReportColumns(**cols_used)
+        data = self.set_header_row(data, location)
+        return data, ReportColumns(**column_name_options[location.option])
+
+    def preprocess_with_spec(
+        self, data: DataFrame, spec: ReportSpec, **kwargs
+    ) -> PreProcessedData:
+        """
+        Run the common preprocessing steps described by spec.
+
+        Only the columns used are copied out of data, once, and
+        the result is built from them directly.
+        """
+        if spec.columns:
+            cols = spec.columns
+            data = self.check_headers_and_fix(
+                [name for name in astuple(cols) if name], data
+            )
+        else:
+            data, cols = self.use_column_options(data, **kwargs)
+        if spec.dropna_on == "first":
+            rows = data.iloc[:, 0].notna()
+        else:
+            rows = data[getattr(cols, spec.dropna_on)].notna()
+
+        id_cols = [cols.city, cols.state]
+        if not spec.report_customer:
+            id_cols.insert(0, cols.customer)
+        id_data = data.loc[rows, [col for col in id_cols if col]]
+        if spec.report_customer:
+            customer = self.get_customer(**kwargs)
+            id_data.insert(0, "customer", customer, allow_duplicates=True)
+        id_string = self.build_id_string(id_data, normalize=spec.upper == "columns")
+        if spec.upper == "id_string":
+            id_string = self.upper_all_str(id_string)
+
+        sales = data.loc[rows, cols.sales].astype(float) * 100
+        if spec.commission_from_rate:
+            commissions = sales * kwargs.get("standard_commission_rate")
+        else:
+            commissions = data.loc[rows, cols.commissions].astype(float) * 100
+        result = DataFrame(
+            {"id_string": id_string, "inv_amt": sales, "comm_amt": commissions}
+        ).astype(self.EXPECTED_TYPES)
+        if spec.check_total:
+            self.assert_commission_amounts_match(result, **kwargs)
+        return PreProcessedData(result)
 
     @staticmethod
     def assert_commission_amounts_match(data: DataFrame, **kwargs) -> None:
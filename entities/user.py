@@ -23,5 +23,20 @@ class User:
     def id(self, db: Session) -> int:
         if self.user_id:
             return self.user_id
+        if user_id := USER_IDS.get(self.domain()):
+            return user_id
         sql = text("""SELECT id FROM users WHERE company_domain = :domain""")
-        return db.execute(sql, {"domain": self.domain()}).scalar_one_or_none()
+        user_id = db.execute(sql, {"domain": self.domain()}).scalar_one_or_none()
+        if user_id:
+            USER_IDS[self.domain()] = user_id
+        return user_id
+
+
+# user ids by company domain, for every User in the process. a domain
+# isn't stored until it's found, so a user added later is still looked up
+USER_IDS: dict[str, int] = {}
+
+
+def load_user_ids(db: Session) -> None:
+    sql = text("""SELECT company_domain, id FROM users""")
+    USER_IDS.update(db.execute(sql).tuples().all())
@@ -4,6 +4,7 @@ remove or soft-delete data (actually an UPDATE) from a database"""
 from services.utils import *
 from jsonapi.jsonapi import jsonapi_error_handling
 from datetime import datetime
+from entities.manufacturers import MFG_PREPROCESSORS
 import sqlalchemy
 
 
@@ -14,12 +15,17 @@ def submission(submission_id: int, session: Session, user: User) -> None:
     sql_commission = sqlalchemy.delete(COMMISSION_DATA_TABLE).where(
         COMMISSION_DATA_TABLE.submission_id == submission_id
     )
+    sql_stage_metrics = sqlalchemy.delete(STAGE_METRICS).where(
+        STAGE_METRICS.submission_id == submission_id
+    )
     sql_submission = sqlalchemy.delete(SUBMISSIONS_TABLE).where(
         SUBMISSIONS_TABLE.id == submission_id
     )
     session.execute(sql_commission)
+    session.execute(sql_stage_metrics)
     session.execute(sql_submission)
     session.commit()
+    REPORT_CALENDAR_CACHE.invalidate(user.id(session))
     return
 
 
@@ -58,7 +64,9 @@ def customer(db: Session, customer_id: int) -> None:
 
 @jsonapi_error_handling
 def manufacturer(db: Session, manuf_id: int, user: User) -> None:
-    return __soft_delete(db=db, table=MANUFACTURERS, _id=manuf_id, user=user)
+    __soft_delete(db=db, table=MANUFACTURERS, _id=manuf_id, user=user)
+    REPORT_CALENDAR_CACHE.invalidate(user.id(db))
+    MFG_PREPROCESSORS.refresh()
 
 
 @jsonapi_error_handling
@@ -2,15 +2,15 @@
 pull data from a database"""
 
 import calendar
-import json
-from typing import Optional
-from datetime import datetime
+from typing import Any, Optional
+from datetime import datetime, date
 
 import sqlalchemy
 import pandas as pd
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, Field, ConfigDict
 from jsonapi.jsonapi import jsonapi_error_handling, JSONAPIResponse
+from entities.preprocessor import AbstractPreProcessor
 
 from services.utils import *
 
@@ -88,28 +88,38 @@ def location(
     return __get_X(db, query, user, LOCATIONS, location_id)
 
 
-def all_submissions(db: Session, user: User) -> pd.DataFrame:
-    subs = SUBMISSIONS_TABLE
-    reports = REPORTS
-    manufs = MANUFACTURERS
+def existing_submission(
+    db: Session,
+    user_id: int,
+    report_id: int,
+    reporting_year: int,
+    reporting_month: int,
+) -> sqlalchemy.RowMapping | None:
+    """look up a submission for a single reporting period of a report.
+    served by the unique index on (user_id, report_id, reporting_year, reporting_month)
+    """
     sql = (
         sqlalchemy.select(
-            subs.id,
-            subs.submission_date,
-            subs.reporting_month,
-            subs.reporting_year,
-            reports.id.label("report_id"),
-            reports.report_name,
-            reports.yearly_frequency,
-            reports.pos_report,
-            manufs.name,
+            SUBMISSIONS_TABLE.id,
+            SUBMISSIONS_TABLE.submission_date,
+            SUBMISSIONS_TABLE.reporting_month,
+            SUBMISSIONS_TABLE.reporting_year,
+            REPORTS.report_name,
+            MANUFACTURERS.name,
+        )
+        .select_from(SUBMISSIONS_TABLE)
+        .join(REPORTS)
+        .join(MANUFACTURERS)
+        .where(
+            sqlalchemy.and_(
+                SUBMISSIONS_TABLE.user_id == user_id,
+                SUBMISSIONS_TABLE.report_id == report_id,
+                SUBMISSIONS_TABLE.reporting_year == reporting_year,
+                SUBMISSIONS_TABLE.reporting_month == reporting_month,
+            )
         )
-        .select_from(subs)
-        .join(reports)
-        .join(manufs)
-        .where(subs.user_id == user.id(db=db))
     )
-    return pd.read_sql(sql, con=db.get_bind())
+    return db.execute(sql).mappings().first()
 
 
 def commission_rate(db: Session, manufacturer_id: int, user_id: int) -> float | None:
@@ -119,8 +129,9 @@ def commission_rate(db: Session, manufacturer_id: int, user_id: int) -> float |
             USER_COMMISSIONS.user_id == user_id,
         )
     )
-    result = db.execute(sql).scalar()
-    return result
+    return REFERENCE_CACHE.lookup(
+        ("commission_rate", user_id, manufacturer_id), lambda: db.execute(sql).scalar()
+    )
 
 
 def split(db: Session, report_id: int, user_id: int) -> float:
@@ -172,12 +183,12 @@ def report_column_names(db: Session, report_id: int) -> list[dict]:
         FROM report_column_names
         WHERE report_id = :report_id;
     """
-    result = (
-        db.execute(sqlalchemy.text(sql), params=dict(report_id=report_id))
-        .mappings()
-        .all()
-    )
-    return result
+
+    def query() -> list[dict]:
+        result = db.execute(sqlalchemy.text(sql), params=dict(report_id=report_id))
+        return [dict(row) for row in result.mappings()]
+
+    return REFERENCE_CACHE.lookup(("report_column_names", report_id), query)
 
 
 def all_manufacturers(db: Session) -> dict:
@@ -233,7 +244,36 @@ def territory(db: Session, user_id: int, manf_id: int) -> list | None:
             TERRITORIES.manufacturer_id == manf_id, TERRITORIES.user_id == user_id
         )
     )
-    return db.execute(sql).scalar_one_or_none()
+    return REFERENCE_CACHE.lookup(
+        ("territory", user_id, manf_id), lambda: db.execute(sql).scalar_one_or_none()
+    )
+
+
+def reference_data(db: Session) -> dict[tuple, Any]:
+    """every commission rate, territory and set of report column names,
+    keyed as the lookups above store them in REFERENCE_CACHE"""
+    entries = {}
+    rates = sqlalchemy.select(
+        USER_COMMISSIONS.user_id,
+        USER_COMMISSIONS.manufacturer_id,
+        USER_COMMISSIONS.commission_rate,
+    )
+    for user_id, manufacturer_id, rate in db.execute(rates):
+        entries[("commission_rate", user_id, manufacturer_id)] = rate
+    territories = sqlalchemy.select(
+        TERRITORIES.user_id, TERRITORIES.manufacturer_id, TERRITORIES.territory
+    )
+    for user_id, manufacturer_id, territory_ in db.execute(territories):
+        entries[("territory", user_id, manufacturer_id)] = territory_
+    column_names = """
+        SELECT report_id, customer, city, state, sales, commissions
+        FROM report_column_names;
+    """
+    for row in db.execute(sqlalchemy.text(column_names)).mappings():
+        names = dict(row)
+        report_id = names.pop("report_id")
+        entries.setdefault(("report_column_names", report_id), []).append(names)
+    return entries
 
 
 def manuf_name_by_id(db: Session, user_id: int, manf_id: int) -> str:
@@ -283,8 +323,8 @@ def string_match_supplement(db: Session, user_id: int) -> pd.DataFrame:
     )
     result = pd.read_sql(branches_expanded_sql, con=db.get_bind())
     # create the match_string from customer name, city, and state
-    result.loc[:, "match_string"] = result[["name", "city", "state"]].apply(
-        lambda row: "_".join(row.values.astype(str)), axis=1
+    result.loc[:, "match_string"] = AbstractPreProcessor.build_id_string(
+        result[["name", "city", "state"]].astype(str)
     )
     result = result.rename(columns={"id": "customer_branch_id"})
     return result.loc[:, ["match_string", "customer_branch_id"]]
@@ -311,30 +351,19 @@ def convert_month_from_number_to_name(month_num: int) -> str:
     return calendar.month_name[month_num]
 
 
-def commission_data_with_all_names(db: Session, submission_id: int = 0, **kwargs):
-    """runs sql query to produce the commission table format used by SCA
-    and converts month number to name and cents to dollars before return
+def __parse_iso_date(date_str: str) -> datetime | None:
+    try:
+        return datetime.fromisoformat(date_str)
+    except ValueError:
+        return datetime.fromisoformat(date_str.replace("Z", ""))
+    except Exception as e:
+        print(e)
 
-    Returns: pd.DataFrame"""
 
-    sql = (
-        sqlalchemy.select(
-            COMMISSION_DATA_TABLE.id,
-            COMMISSION_DATA_TABLE.submission_id,
-            REPORTS.report_label,
-            SUBMISSIONS_TABLE.reporting_year,
-            SUBMISSIONS_TABLE.reporting_month,
-            MANUFACTURERS.name,
-            REPS.initials,
-            CUSTOMERS.name,
-            LOCATIONS.city,
-            LOCATIONS.state,
-            COMMISSION_DATA_TABLE.inv_amt,
-            COMMISSION_DATA_TABLE.comm_amt,
-            ID_STRINGS.verified,
-            ID_STRINGS.match_string,
-        )
-        .select_from(COMMISSION_DATA_TABLE)
+def __commission_data_joins(sql: sqlalchemy.Select) -> sqlalchemy.Select:
+    """joins commission_data to every table needed to name or filter a row"""
+    return (
+        sql.select_from(COMMISSION_DATA_TABLE)
         .join(
             SUBMISSIONS_TABLE,
             COMMISSION_DATA_TABLE.submission_id == SUBMISSIONS_TABLE.id,
@@ -345,31 +374,21 @@ def commission_data_with_all_names(db: Session, submission_id: int = 0, **kwargs
         .join(REPS)
         .join(CUSTOMERS, CUSTOMERS.id == BRANCHES.customer_id)
         .join(LOCATIONS)
-        .join(
-            ID_STRINGS,
-            ID_STRINGS.id == COMMISSION_DATA_TABLE.report_branch_ref,
-            isouter=True,
-        )
-        .where(COMMISSION_DATA_TABLE.user_id == kwargs.get("user_id"))
-        .order_by(
-            SUBMISSIONS_TABLE.reporting_year.desc(),
-            SUBMISSIONS_TABLE.reporting_month.desc(),
-            CUSTOMERS.name.asc(),
-            LOCATIONS.city.asc(),
-            LOCATIONS.state.asc(),
-        )
     )
 
+
+def __commission_data_filters(
+    sql: sqlalchemy.Select, submission_id: int = 0, **kwargs
+) -> sqlalchemy.Select:
+    """applies the user scope and the optional filters accepted by
+    CommissionDataDownloadParameters to a query built on __commission_data_joins"""
+    sql = sql.where(COMMISSION_DATA_TABLE.user_id == kwargs.get("user_id"))
+
     if submission_id:
         sql = sql.where(COMMISSION_DATA_TABLE.submission_id == submission_id)
 
     if start_date := kwargs.get("startDate"):
-        try:
-            start_date = datetime.fromisoformat(start_date)
-        except ValueError:
-            start_date = datetime.fromisoformat(start_date.replace("Z", ""))
-        except Exception as e:
-            print(e)
+        start_date = __parse_iso_date(start_date)
         if isinstance(start_date, datetime):
             sql = sql.where(
                 sqlalchemy.or_(
@@ -381,12 +400,7 @@ def commission_data_with_all_names(db: Session, submission_id: int = 0, **kwargs
                 )
             )
     if end_date := kwargs.get("endDate"):
-        try:
-            end_date = datetime.fromisoformat(end_date)
-        except ValueError:
-            end_date = datetime.fromisoformat(end_date.replace("Z", ""))
-        except Exception as e:
-            print(e)
+        end_date = __parse_iso_date(end_date)
         if isinstance(end_date, datetime):
             sql = sql.where(
                 sqlalchemy.or_(
@@ -407,6 +421,44 @@ def commission_data_with_all_names(db: Session, submission_id: int = 0, **kwargs
         sql = sql.where(LOCATIONS.state == state)
     if representative := kwargs.get("representative_id"):
         sql = sql.where(REPS.id == representative)
+    return sql
+
+
+def commission_data_with_all_names(db: Session, submission_id: int = 0, **kwargs):
+    """runs sql query to produce the commission table format used by SCA
+    and converts month number to name and cents to dollars before return
+
+    Returns: pd.DataFrame"""
+
+    sql = __commission_data_joins(
+        sqlalchemy.select(
+            COMMISSION_DATA_TABLE.id,
+            COMMISSION_DATA_TABLE.submission_id,
+            REPORTS.report_label,
+            SUBMISSIONS_TABLE.reporting_year,
+            SUBMISSIONS_TABLE.reporting_month,
+            MANUFACTURERS.name,
+            REPS.initials,
+            CUSTOMERS.name,
+            LOCATIONS.city,
+            LOCATIONS.state,
+            COMMISSION_DATA_TABLE.inv_amt,
+            COMMISSION_DATA_TABLE.comm_amt,
+            ID_STRINGS.verified,
+            ID_STRINGS.match_string,
+        )
+    ).join(
+        ID_STRINGS,
+        ID_STRINGS.id == COMMISSION_DATA_TABLE.report_branch_ref,
+        isouter=True,
+    )
+    sql = __commission_data_filters(sql, submission_id, **kwargs).order_by(
+        SUBMISSIONS_TABLE.reporting_year.desc(),
+        SUBMISSIONS_TABLE.reporting_month.desc(),
+        CUSTOMERS.name.asc(),
+        LOCATIONS.city.asc(),
+        LOCATIONS.state.asc(),
+    )
 
     for chunk in pd.read_sql(
         sql,
@@ -447,6 +499,47 @@ def commission_data_with_all_names(db: Session, submission_id: int = 0, **kwargs
         yield chunk
 
 
+AGGREGATE_DIMENSIONS = {
+    "manufacturer": MANUFACTURERS.name,
+    "customer": CUSTOMERS.name,
+    "rep": REPS.initials,
+    "state": LOCATIONS.state,
+    "year": SUBMISSIONS_TABLE.reporting_year,
+    "month": SUBMISSIONS_TABLE.reporting_month,
+}
+AGGREGATE_MEASURES = {
+    # amounts are stored in cents
+    "inv_amt": sqlalchemy.func.sum(COMMISSION_DATA_TABLE.inv_amt) / 100,
+    "comm_amt": sqlalchemy.func.sum(COMMISSION_DATA_TABLE.comm_amt) / 100,
+    "row_count": sqlalchemy.func.count(COMMISSION_DATA_TABLE.id),
+}
+
+
+def commission_data_aggregate(
+    db: Session, group_by: list[str], measures: list[str], **kwargs
+) -> list[dict]:
+    """sums commission data by the requested dimensions in the database,
+    using the same filters as commission_data_with_all_names
+
+    Returns: list of rows, one per group, keyed by dimension and measure names"""
+    dimensions = [AGGREGATE_DIMENSIONS[dim].label(dim) for dim in group_by]
+    sql = __commission_data_joins(
+        sqlalchemy.select(
+            *dimensions,
+            *[AGGREGATE_MEASURES[measure].label(measure) for measure in measures],
+        )
+    )
+    sql = (
+        __commission_data_filters(sql, **kwargs)
+        .group_by(*dimensions)
+        .order_by(*dimensions)
+    )
+    return [
+        {hyphenate_name(k): v for k, v in row.items()}
+        for row in db.execute(sql).mappings()
+    ]
+
+
 def submission_exists(db: Session, submission_id: int) -> bool:
     sql = sqlalchemy.select(SUBMISSIONS_TABLE).where(
         SUBMISSIONS_TABLE.id == submission_id
@@ -471,85 +564,59 @@ class ReportCalendar(BaseModel):
     data: list[ReportRecord]
 
 
+REPORT_CALENDAR_SQL = """
+    WITH months AS (
+        SELECT CAST(month_start AS date) AS month_start
+        FROM generate_series(
+            CAST(:first_month AS date), CAST(:last_month AS date), interval '1 month'
+        ) AS month_start
+    ),
+    reports AS (
+        SELECT DISTINCT m.name, mr.report_label
+        FROM manufacturers AS m
+        JOIN manufacturers_reports AS mr
+        ON m.id = mr.manufacturer_id
+        WHERE m.deleted IS NULL
+        AND mr.user_id = :user_id
+    )
+    SELECT reports.name AS manufacturer,
+        reports.report_label,
+        CAST(EXTRACT(MONTH FROM months.month_start) AS int) AS reporting_month,
+        CAST(EXTRACT(YEAR FROM months.month_start) AS int) AS reporting_year,
+        sr.total_commission_amount,
+        to_char(months.month_start, 'YYYY-MM-DD') AS date
+    FROM months
+    CROSS JOIN reports
+    LEFT JOIN submitted_reports AS sr
+    ON sr.user_id = :user_id
+        AND sr.name = reports.name
+        AND sr.report_label = reports.report_label
+        AND sr.reporting_year = EXTRACT(YEAR FROM months.month_start)
+        AND sr.reporting_month = EXTRACT(MONTH FROM months.month_start)
+    ORDER BY months.month_start, reports.name, reports.report_label;
+"""
+
+
 def report_calendar(db: Session, user: User) -> ReportCalendar:
     """Return an object containing every month of the current year and
     showing the total_commission_value (user input upon report submission)
-    for each manufacturer's report"""
+    for each manufacturer's report
+
+    Results are cached per user for the day, for at most REPORT_CALENDAR_CACHE_TTL
+    seconds, and dropped when a submission changes"""
     today = datetime.today().date()
     user_id: int = user.id(db)
+    if cached := REPORT_CALENDAR_CACHE.get(user_id, version=today):
+        return cached
     # at the rollover of the new-year, we want to keep seeing December until February
     if today.month == 1:
-        include_dec_py = True
+        first_month = date(today.year - 1, 12, 1)
     else:
-        include_dec_py = False
-    submitted_list_q = """
-        SELECT name, report_label, reporting_year, reporting_month, total_commission_amount
-        FROM submitted_reports
-        WHERE user_id = %s
-        AND
-    """
-    if include_dec_py:
-        submitted_list_q += """ (reporting_year = %s OR (reporting_year = %s AND reporting_month = %s));"""
-        params = (user_id, today.year, today.year - 1, 12)
-    else:
-        submitted_list_q += """ reporting_year = %s;"""
-        params = (user_id, today.year)
-    # the list of submitted reports, which may have a lot of entities missing at first
-    submitted_list = pd.read_sql(submitted_list_q, con=db.get_bind(), params=params)
-    submitted_list = submitted_list[
-        [
-            "name",
-            "report_label",
-            "reporting_month",
-            "reporting_year",
-            "total_commission_amount",
-        ]
-    ]
-    # all unique reports ported right into a dataframe (alt to read_sql)
-    all_manfs_reports = pd.DataFrame(
-        db.execute(
-            sqlalchemy.text(
-                """SELECT DISTINCT m.name, mr.report_label 
-                FROM manufacturers AS m
-                JOIN manufacturers_reports AS mr
-                ON m.id = mr.manufacturer_id
-                WHERE m.deleted IS NULL
-                AND mr.user_id = :user_id;"""
-            ),
-            {"user_id": user_id},
-        ).fetchall(),
-        columns=["name", "report_label"],
+        first_month = date(today.year, 1, 1)
+    params = dict(
+        user_id=user_id, first_month=first_month, last_month=date(today.year, 12, 1)
     )
-    # expand with all months-years, no other data
-    report_full_list = list()
-    for month in range(1, 13):
-        temp = all_manfs_reports.copy()
-        temp["reporting_month"] = month
-        temp["reporting_year"] = today.year
-        report_full_list.append(temp)
-    if include_dec_py:
-        temp = all_manfs_reports.copy()
-        temp["reporting_month"] = 12
-        temp["reporting_year"] = today.year - 1
-        report_full_list.append(temp)
-
-    report_full_list = pd.concat(report_full_list)
-    # add total_commission_amount column with amounts where received (including 0) and no amounts where not received
-    filled_list = report_full_list.merge(
-        submitted_list,
-        how="left",
-        on=["name", "report_label", "reporting_month", "reporting_year"],
-    )
-    # make a date column
-    filled_list["date"] = pd.to_datetime(
-        filled_list["reporting_year"].astype(str)
-        + "-"
-        + filled_list["reporting_month"].astype(str)
-        + "-01"
-    ).dt.date.astype(str)
-    filled_list = filled_list.rename(columns={"name": "manufacturer"})
-    response = [
-        ReportRecord(**record)
-        for record in json.loads(filled_list.to_json(orient="records"))
-    ]
-    return ReportCalendar(data=response)
+    result = db.execute(sqlalchemy.text(REPORT_CALENDAR_SQL), params).mappings()
+    calendar_ = ReportCalendar(data=[ReportRecord(**record) for record in result])
+    REPORT_CALENDAR_CACHE.set(user_id, calendar_, version=today)
+    return calendar_
@@ -12,7 +12,9 @@ def submission(session: Session, submission_id: int, submission_obj: dict, user:
         raise UserMisMatch()
     model_name = hyphenated_name(SUBMISSIONS_TABLE)
     hyphenate_json_obj_keys(submission_obj)
-    return models.serializer.patch_resource(session, submission_obj, model_name, submission_id).data
+    result = models.serializer.patch_resource(session, submission_obj, model_name, submission_id).data
+    REPORT_CALENDAR_CACHE.invalidate(user.id(session))
+    return result
 
 def file_downloads(db: Session, hash: str):
     sql = sqlalchemy.update(DOWNLOADS).values(downloaded = True).where(DOWNLOADS.hash == hash)
@@ -46,13 +48,16 @@ def representative(db: Session, rep_id: int, json_data: dict, user: User) -> JSO
     return models.serializer.patch_resource(db, json_data, model_name, rep_id).data
 
 def sub_status(db: Session, submission_id: int, status: str) -> bool:
-    sql = sqlalchemy.update(SUBMISSIONS_TABLE).values(status=status).where(SUBMISSIONS_TABLE.id==submission_id)
+    sql = sqlalchemy.update(SUBMISSIONS_TABLE).values(status=status).where(SUBMISSIONS_TABLE.id==submission_id)\
+        .returning(SUBMISSIONS_TABLE.user_id)
     try:
-        db.execute(sql)
+        user_id = db.execute(sql).scalar_one_or_none()
         db.commit()
     except:
         return False
     else:
+        if user_id is not None:
+            REPORT_CALENDAR_CACHE.invalidate(user_id)
         return True
 
 @jsonapi_error_handling
@@ -7,8 +7,11 @@ from sqlalchemy.orm import Session
 import sqlalchemy
 import pandas as pd
 from datetime import datetime
+from entities.manufacturers import MFG_PREPROCESSORS
 from entities.submission import NewSubmission
 
+UNIQUE_VIOLATION = "23505"  # postgres error code
+
 
 @jsonapi_error_handling
 def __create_X(
@@ -41,7 +44,10 @@ def mapping(db: Session, json_data: dict, user: User) -> JSONAPIResponse:
 
 @jsonapi_error_handling
 def manufacturer(db: Session, json_data: dict, user: User) -> JSONAPIResponse:
-    return __create_X(db, json_data, user, MANUFACTURERS)
+    result = __create_X(db, json_data, user, MANUFACTURERS)
+    REPORT_CALENDAR_CACHE.invalidate(user.id(db=db))
+    MFG_PREPROCESSORS.refresh()
+    return result
 
 
 @jsonapi_error_handling
@@ -94,14 +100,29 @@ def final_data(db: Session, data: pd.DataFrame) -> None:
     return
 
 
+def stage_metrics(db: Session, records: list[dict]) -> None:
+    sql = sqlalchemy.insert(STAGE_METRICS)
+    db.execute(sql, records)
+    db.commit()
+    return
+
+
 def submission(db: Session, submission: NewSubmission) -> int:
     sql = (
         sqlalchemy.insert(SUBMISSIONS_TABLE)
         .returning(SUBMISSIONS_TABLE.id)
         .values(**submission)
     )
-    result = db.execute(sql).fetchone()[0]
+    try:
+        result = db.execute(sql).fetchone()[0]
+    except sqlalchemy.exc.IntegrityError as err:
+        db.rollback()
+        if getattr(err.orig, "pgcode", None) == UNIQUE_VIOLATION:
+            # a concurrent request won the race for this reporting period
+            raise DuplicateSubmission()
+        raise
     db.commit()
+    REPORT_CALENDAR_CACHE.invalidate(submission.user_id)
     return result
 
 
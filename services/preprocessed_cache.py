@@ -0,0 +1,155 @@
+"""
+Storage of preprocessed report data, so that uploading the same file for the
+same report again (i.e. after a failed or deleted submission) skips parsing
+and preprocessing and goes straight to entity matching.
+
+Entries are keyed by the file's hash, the user and report, a hash of the
+preprocessing code and the parameters the preprocessor was given, and are
+stored as Parquet. PREPROCESSED_CACHE_STORE selects where: "local" (default)
+for files under PREPROCESSED_CACHE_DIR, "s3" for objects in the submissions
+bucket under PREPROCESSED_CACHE_PREFIX, or "off".
+
+Local files are kept to PREPROCESSED_CACHE_MAX_MB in total, by removing the
+least recently used past it after each store. Objects in S3 are left to the
+bucket's lifecycle rules.
+"""
+
+import os
+import sys
+import tempfile
+from functools import lru_cache
+from hashlib import sha256
+from io import BytesIO
+from logging import getLogger
+from typing import Any, Type
+import pandas as pd
+from entities import commission_data, commission_file, headers, pdf, preprocessor
+from entities.commission_file import CommissionFile
+from entities.preprocessor import AbstractPreProcessor
+from services import s3
+
+logger = getLogger("uvicorn.info")
+
+STORE = os.getenv("PREPROCESSED_CACHE_STORE", "local").lower()
+CACHE_DIR = os.getenv(
+    "PREPROCESSED_CACHE_DIR", os.path.join(tempfile.gettempdir(), "preprocessed")
+)
+S3_PREFIX = os.getenv("PREPROCESSED_CACHE_PREFIX", "preprocessed-cache")
+MAX_BYTES = float(os.getenv("PREPROCESSED_CACHE_MAX_MB", 256)) * 1024**2
+# shared by every preprocessor, so a change to any of them is a new code version
+PREPROCESSING_MODULES = (commission_data, commission_file, headers, pdf, preprocessor)
+
+
+@lru_cache
+def code_version(preprocessor_cls: Type[AbstractPreProcessor]) -> str:
+    """hash of the source of the preprocessor's module and the modules it builds on"""
+    modules = (*PREPROCESSING_MODULES, sys.modules[preprocessor_cls.__module__])
+    code_hash = sha256()
+    for module in modules:
+        with open(module.__file__, "rb") as source:
+            code_hash.update(source.read())
+    return code_hash.hexdigest()
+
+
+def _param_bytes(value: Any) -> bytes:
+    match value:
+        case bytes():
+            return value
+        case pd.DataFrame():
+            hashed = pd.util.hash_pandas_object(value, index=True)
+            return repr(value.columns.tolist()).encode() + hashed.values.tobytes()
+        case _:
+            return repr(value).encode()
+
+
+def cache_key(
+    file: CommissionFile,
+    user_id: int,
+    report_id: int,
+    preprocessor_cls: Type[AbstractPreProcessor],
+    params: dict[str, Any],
+) -> str:
+    key = sha256()
+    for part in (file.content_hash(), user_id, report_id):
+        key.update(f"{part}\0".encode())
+    key.update(code_version(preprocessor_cls).encode())
+    for name, value in sorted(params.items()):
+        key.update(name.encode() + b"\0" + _param_bytes(value) + b"\0")
+    return key.hexdigest()
+
+
+def _path(key: str) -> str:
+    return os.path.join(CACHE_DIR, f"{key}.parquet")
+
+
+def _s3_key(key: str) -> str:
+    return f"{S3_PREFIX}/{key}.parquet"
+
+
+def evict(max_bytes: float | None = None) -> None:
+    """remove the least recently used local files until the rest fit in max_bytes"""
+    max_bytes = MAX_BYTES if max_bytes is None else max_bytes
+    files = []
+    with os.scandir(CACHE_DIR) as entries:
+        for entry in entries:
+            if entry.name.endswith(".parquet") and entry.is_file():
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+    total = sum(size for _, size, _ in files)
+    for _, size, path in sorted(files):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            # another worker got to it first
+            pass
+        total -= size
+
+
+def load(key: str) -> pd.DataFrame | None:
+    """the cached preprocessed data, or None if there isn't any.
+    the cache is never a reason for processing to fail, so errors are only logged"""
+    try:
+        match STORE:
+            case "local":
+                if not os.path.exists(_path(key)):
+                    return
+                data = pd.read_parquet(_path(key))
+                # modified time is last use, for evict
+                os.utime(_path(key))
+                return data
+            case "s3":
+                try:
+                    response = s3.client().get_object(
+                        Bucket=s3.BUCKET_NAME, Key=_s3_key(key)
+                    )
+                except s3.client().exceptions.NoSuchKey:
+                    return
+                return pd.read_parquet(BytesIO(response["Body"].read()))
+    except Exception as e:
+        logger.warning(f"could not read preprocessed data from the cache: {e}")
+
+
+def store(key: str, data: pd.DataFrame) -> None:
+    try:
+        match STORE:
+            case "local":
+                os.makedirs(CACHE_DIR, exist_ok=True)
+                # write then rename, so a partial file is never read
+                with tempfile.NamedTemporaryFile(dir=CACHE_DIR, delete=False) as file:
+                    try:
+                        data.to_parquet(file)
+                    except Exception:
+                        os.remove(file.name)
+                        raise
+                os.replace(file.name, _path(key))
+                evict()
+            case "s3":
+                buffer = BytesIO()
+                data.to_parquet(buffer)
+                s3.client().put_object(
+                    Bucket=s3.BUCKET_NAME, Key=_s3_key(key), Body=buffer.getvalue()
+                )
+    except Exception as e:
+        logger.warning(f"could not write preprocessed data to the cache: {e}")
@@ -1,25 +1,49 @@
 from dotenv import load_dotenv
 
 load_dotenv()
+import asyncio
+import threading
 from os import getenv
-import boto3
 from entities.commission_file import CommissionFile
 
 AWS_ACCESS_ID = getenv("AWS_ACCESS_KEY_ID")
 AWS_SECRET_KEY = getenv("AWS_SECRET_ACCESS_KEY")
 BUCKET_NAME = getenv("S3_BUCKET_NAME")
 TESTING_ENDPOINT = getenv("ENDPOINT")
+MB = 1024**2
 
-s3_client = boto3.client(
-    "s3",
-    aws_access_key_id=AWS_ACCESS_ID,
-    aws_secret_access_key=AWS_SECRET_KEY,
-    endpoint_url=TESTING_ENDPOINT,
-)
+_client = None
+_transfer_config = None
+_client_lock = threading.Lock()
+
+
+def client():
+    """the S3 client, created on first use and shared by every thread.
+    boto3 is imported here too, to keep it out of app startup"""
+    global _client, _transfer_config
+    with _client_lock:
+        if _client is None:
+            import boto3
+            from boto3.s3.transfer import TransferConfig
+
+            # files above the threshold are sent as a multipart upload,
+            # parts sent concurrently
+            _transfer_config = TransferConfig(
+                multipart_threshold=int(getenv("S3_MULTIPART_THRESHOLD_MB", 8)) * MB,
+                multipart_chunksize=int(getenv("S3_MULTIPART_CHUNKSIZE_MB", 8)) * MB,
+                max_concurrency=int(getenv("S3_MAX_CONCURRENCY", 4)),
+            )
+            _client = boto3.client(
+                "s3",
+                aws_access_key_id=AWS_ACCESS_ID,
+                aws_secret_access_key=AWS_SECRET_KEY,
+                endpoint_url=TESTING_ENDPOINT,
+            )
+        return _client
 
 
 def get_file(obj_path: str) -> bytes:
-    response: dict = s3_client.get_object(Bucket=BUCKET_NAME, Key=obj_path)
+    response: dict = client().get_object(Bucket=BUCKET_NAME, Key=obj_path)
     if response.get("ResponseMetadata").get("HTTPStatusCode") == 200:
         file_data = response.get("Body").read()
         file_content_type: str = response.get("ContentType")
@@ -29,6 +53,17 @@ def get_file(obj_path: str) -> bytes:
 
 
 def upload_file(file: CommissionFile, dest: str) -> None:
-    s3_client.put_object(
-        Body=file.file_data, Bucket=BUCKET_NAME, Key=dest, ContentType=file.file_mime
+    s3_client = client()  # also sets up _transfer_config
+    s3_client.upload_fileobj(
+        file.stream(),
+        BUCKET_NAME,
+        dest,
+        ExtraArgs={"ContentType": file.file_mime},
+        Config=_transfer_config,
     )
+
+
+def start_upload(file: CommissionFile, dest: str) -> asyncio.Future:
+    """submits the blocking boto3 upload to a worker thread right away.
+    await the returned future to wait for it without blocking the event loop"""
+    return asyncio.get_running_loop().run_in_executor(None, upload_file, file, dest)
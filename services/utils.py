@@ -1,8 +1,14 @@
 import os
+import threading
+import time
+from typing import Any, Callable, Hashable
 from dotenv import load_dotenv
 
 import sqlalchemy
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
 from fastapi import Request, HTTPException
 
 from app.auth import LocalTokenStore
@@ -18,6 +24,7 @@ MANUFACTURERS = models.Manufacturer
 REPORTS = models.ManufacturersReport
 COMMISSION_DATA_TABLE = models.CommissionData
 SUBMISSIONS_TABLE = models.Submission
+STAGE_METRICS = models.SubmissionStageMetric
 DOWNLOADS = models.FileDownloads
 FORM_FIELDS = models.ReportFormFields
 USERS = models.User
@@ -32,14 +39,89 @@ PROD_DB = os.getenv("DATABASE_URL").replace("postgres://", "postgresql://")
 TESTING_DB = os.getenv("TESTING_DATABASE_URL", "").replace(
     "postgres://", "postgresql://"
 )
-if TESTING_DB:
-    ENGINE = sqlalchemy.create_engine(TESTING_DB)
-else:
-    ENGINE = sqlalchemy.create_engine(PROD_DB)
+DB_URL = TESTING_DB or PROD_DB
+# the async engine is opt-in, and needs asyncpg installed
+ASYNC_DB_URL = os.getenv(
+    "ASYNC_DATABASE_URL", DB_URL.replace("postgresql://", "postgresql+asyncpg://")
+)
+ASYNC_DB_ENABLED = os.getenv("DB_ASYNC_ENGINE", "false").lower() == "true"
+
+
+def engine_options(url: str) -> dict[str, Any]:
+    """connection pool settings from the environment, for an engine on url"""
+    options = dict(
+        pool_pre_ping=os.getenv("DB_POOL_PRE_PING", "true").lower() == "true",
+        # seconds, recycled before the server or a proxy closes them as idle
+        pool_recycle=int(os.getenv("DB_POOL_RECYCLE", 1800)),
+    )
+    if make_url(url).get_backend_name() != "sqlite":
+        options.update(
+            pool_size=int(os.getenv("DB_POOL_SIZE", 5)),
+            max_overflow=int(os.getenv("DB_MAX_OVERFLOW", 10)),
+            pool_timeout=int(os.getenv("DB_POOL_TIMEOUT", 30)),
+        )
+    return options
+
 
+ENGINE = sqlalchemy.create_engine(DB_URL, **engine_options(DB_URL))
 SESSIONLOCAL = sessionmaker(autocommit=False, autoflush=False, bind=ENGINE)
 
 
+class PoolStats:
+    """
+    Thread-safe counts of connection pool events for an engine,
+    alongside the pool's own current state.
+    """
+
+    EVENTS = ("connect", "checkout", "checkin", "invalidate")
+
+    def __init__(self, engine: sqlalchemy.Engine) -> None:
+        self.engine = engine
+        self.counts = dict.fromkeys(self.EVENTS, 0)
+        self.lock = threading.Lock()
+        for event_name in self.EVENTS:
+            sqlalchemy.event.listen(engine, event_name, self._counter(event_name))
+
+    def _counter(self, event_name: str):
+        def count(*args) -> None:
+            with self.lock:
+                self.counts[event_name] += 1
+
+        return count
+
+    def status(self) -> dict[str, Any]:
+        pool = self.engine.pool
+        with self.lock:
+            status = dict(self.counts)
+        if isinstance(pool, QueuePool):
+            status.update(
+                size=pool.size(),
+                checked_in=pool.checkedin(),
+                checked_out=pool.checkedout(),
+                overflow=pool.overflow(),
+            )
+        return status
+
+
+POOL_STATS = PoolStats(ENGINE)
+ASYNC_POOL_STATS: PoolStats | None = None
+_async_sessions: async_sessionmaker[AsyncSession] | None = None
+_async_lock = threading.Lock()
+
+
+def async_sessions() -> async_sessionmaker[AsyncSession]:
+    """the async session factory, with its engine created on first use"""
+    global _async_sessions, ASYNC_POOL_STATS
+    if not ASYNC_DB_ENABLED:
+        raise RuntimeError("the async database engine is off, see DB_ASYNC_ENGINE")
+    with _async_lock:
+        if _async_sessions is None:
+            engine = create_async_engine(ASYNC_DB_URL, **engine_options(ASYNC_DB_URL))
+            ASYNC_POOL_STATS = PoolStats(engine.sync_engine)
+            _async_sessions = async_sessionmaker(engine, expire_on_commit=False)
+        return _async_sessions
+
+
 def hyphenate_name(table_name: str) -> str:
     return table_name.replace("_", "-")
 
@@ -56,6 +138,7 @@ all_models = [
     REPORTS,
     COMMISSION_DATA_TABLE,
     SUBMISSIONS_TABLE,
+    STAGE_METRICS,
     DOWNLOADS,
     FORM_FIELDS,
     USERS,
@@ -73,6 +156,87 @@ models_dict = {hyphenated_name(model): model for model in all_models}
 class UserMisMatch(Exception): ...
 
 
+class DuplicateSubmission(Exception): ...
+
+
+class UserScopedCache:
+    """
+    Thread-safe in-memory storage of query results by user id.
+
+    An entry is only returned if it was stored with the same version
+    (i.e. the date it was computed for) and is younger than `ttl` seconds,
+    as ReferenceCache does, since some of the underlying data is maintained
+    outside of the app. Writers of the underlying data in the app are
+    expected to call invalidate for the affected user.
+    """
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self.entries: dict[int, tuple[Hashable, float, Any]] = dict()
+        self.lock = threading.Lock()
+
+    def get(self, user_id: int, version: Hashable = None) -> Any | None:
+        with self.lock:
+            if entry := self.entries.get(user_id):
+                entry_version, stored_at, value = entry
+                fresh = time.monotonic() - stored_at < self.ttl
+                if entry_version == version and fresh:
+                    return value
+            return
+
+    def set(self, user_id: int, value: Any, version: Hashable = None) -> None:
+        with self.lock:
+            self.entries[user_id] = (version, time.monotonic(), value)
+
+    def invalidate(self, user_id: int) -> None:
+        with self.lock:
+            self.entries.pop(user_id, None)
+
+
+REPORT_CALENDAR_CACHE = UserScopedCache(
+    ttl=float(os.getenv("REPORT_CALENDAR_CACHE_TTL", 60))
+)
+
+
+class ReferenceCache:
+    """
+    Thread-safe in-memory storage of small reference lookups
+    (i.e. commission rates, territories, report column names) by key.
+
+    These tables are maintained outside of the app, so nothing invalidates
+    them here. Instead, each entry is looked up again once it's older than
+    `ttl` seconds.
+    """
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self.entries: dict[Hashable, tuple[float, Any]] = dict()
+        self.lock = threading.Lock()
+
+    def lookup(self, key: Hashable, load: Callable[[], Any]) -> Any:
+        """the stored value for key if it's fresh, otherwise what load returns"""
+        with self.lock:
+            if entry := self.entries.get(key):
+                stored_at, value = entry
+                if time.monotonic() - stored_at < self.ttl:
+                    return value
+        value = load()
+        self.set_many({key: value})
+        return value
+
+    def set_many(self, values: dict[Hashable, Any]) -> None:
+        now = time.monotonic()
+        with self.lock:
+            self.entries.update((key, (now, value)) for key, value in values.items())
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+
+
+REFERENCE_CACHE = ReferenceCache(ttl=float(os.getenv("REFERENCE_CACHE_TTL", 600)))
+
+
 async def get_user(request: Request) -> User:
     access_token: str = request.headers.get("Authorization").replace("Bearer ", "")
     if token := LocalTokenStore.get(access_token):
@@ -101,6 +265,13 @@ async def get_db():
         db.close()
 
 
+async def get_async_db():
+    """like get_db, but an AsyncSession, for routes that await their queries
+    instead of blocking the event loop"""
+    async with async_sessions()() as db:
+        yield db
+
+
 def matched_user(user: User, model, reference_id: int, db: Session) -> bool:
     try:
         return (
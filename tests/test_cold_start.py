@@ -0,0 +1,37 @@
+import os
+import subprocess
+import sys
+
+# seconds to import app.main in a fresh interpreter
+COLD_START_BUDGET = float(os.getenv("COLD_START_BUDGET", 5.0))
+# only imported once they're needed, not at app startup
+DEFERRED_MODULES = ["boto3", "tabula", "PyPDF2", "Levenshtein"]
+COLD_START = f"""
+import sys, time
+start = time.perf_counter()
+import app.main
+print(time.perf_counter() - start)
+print(*[module for module in {DEFERRED_MODULES!r} if module in sys.modules])
+"""
+
+
+def cold_start(tmp_path) -> tuple[float, list[str]]:
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{tmp_path / 'cold_start.db'}"}
+    env.pop("TESTING_DATABASE_URL", None)
+    output = subprocess.run(
+        [sys.executable, "-c", COLD_START],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.splitlines()
+    return float(output[0]), output[1].split()
+
+
+def test_cold_start(tmp_path):
+    seconds, imported = cold_start(tmp_path)
+    assert not imported, f"imported at startup: {imported}"
+    assert seconds < COLD_START_BUDGET, (
+        f"app.main took {seconds:.2f} s to import, "
+        f"over the {COLD_START_BUDGET:.2f} s budget"
+    )
@@ -0,0 +1,101 @@
+import re
+from datetime import datetime
+import pandas as pd
+from entities.headers import MONTHS, clean_header, clean_headers, locate_header
+
+CURRENT_YEAR = datetime.today().year
+HEADERS = [
+    "Customer Name",
+    "Ship-To City",
+    "SHIP TO\nSTATE",
+    "Net Sales $",
+    "Commission$",
+    f"Jan {CURRENT_YEAR} Sales",
+    f"Sales {CURRENT_YEAR - 1}",
+    "Ext. Cost",
+    "Split 75%",
+    "Customer.1",
+    "shptostate",
+    "Unnamed: 3",
+    "2023",
+    "1,000",
+    "12.5",
+    ".5",
+    "1e5",
+    "",
+    None,
+    float("nan"),
+    7,
+    3.25,
+    "NaN",
+    "Infinity",
+    "Store #",
+]
+
+
+def reference_clean_header(header: str) -> str:
+    """the original per-call implementation"""
+    header = str(header).lower()
+    header = re.sub(r"[^a-z0-9.,]", "", header)
+    header = re.sub(f"({'|'.join(MONTHS)})", "", header)
+    header = re.sub(rf"({datetime.today().year})", "", header)
+    if header.isnumeric():
+        header = "replacednumber"
+    else:
+        try:
+            float(header)
+        except:
+            pass
+        else:
+            header = "replacednumber"
+    return header
+
+
+def test_clean_header_matches_reference():
+    for header in HEADERS:
+        assert clean_header(header) == reference_clean_header(header), header
+
+
+def test_clean_headers_matches_clean_header():
+    assert clean_headers(HEADERS) == [clean_header(header) for header in HEADERS]
+
+
+def test_locate_header_finds_header_row():
+    df = pd.DataFrame(
+        [
+            ["Commission Report", None, None],
+            [None, None, None],
+            ["Customer", "Ship To City", "Net Sales"],
+            ["ACME", "TAMPA", 100.0],
+        ]
+    )
+    location = locate_header(df, [["customer", "shiptocity"]], block_size=2)
+    assert (location.option, location.row) == (0, 2)
+    assert location.header == ["customer", "shiptocity", "netsales"]
+
+
+def test_locate_header_prefers_earlier_options():
+    df = pd.DataFrame([["city", "state"]] * 3 + [["customer", "sales"]])
+    location = locate_header(df, [["customer"], ["city"]], block_size=2)
+    assert (location.option, location.row) == (0, 3)
+
+
+def test_locate_header_columns_already_match():
+    df = pd.DataFrame({"customer": ["acme"], "sales": [1.0]})
+    location = locate_header(df, [["city"], ["customer", "sales"]])
+    assert (location.option, location.row) == (1, None)
+
+
+def test_locate_header_not_found():
+    df = pd.DataFrame([["a", "b"]])
+    assert locate_header(df, [["customer"]]) is None
+
+
+def test_locate_header_columns_match_first_option_without_reading_rows(monkeypatch):
+    def to_numpy(*args, **kwargs):
+        raise AssertionError("rows were read")
+
+    df = pd.DataFrame({"customer": ["city"] * 3, "sales": [1.0] * 3})
+    monkeypatch.setattr(pd.DataFrame, "to_numpy", to_numpy)
+    location = locate_header(df, [["customer", "sales"], ["city"]])
+    assert (location.option, location.row) == (0, None)
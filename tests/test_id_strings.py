@@ -0,0 +1,84 @@
+import random
+import numpy as np
+import pandas as pd
+import pytest
+from entities.preprocessor import AbstractPreProcessor
+
+build_id_string = AbstractPreProcessor.build_id_string
+upper_all_str = AbstractPreProcessor.upper_all_str
+CHARACTERS = "abcXYZ 019_-#&.,'é\t"
+
+
+def reference_id_string(id_data: pd.DataFrame) -> pd.Series:
+    """the row-wise join every preprocessor used before build_id_string"""
+    return id_data.apply("_".join, axis=1)
+
+
+def random_id_data(rng: random.Random) -> pd.DataFrame:
+    rows, columns = rng.randint(1, 40), rng.randint(1, 4)
+    values = {
+        f"column {c}": [
+            "".join(rng.choices(CHARACTERS, k=rng.randint(0, 12))) for _ in range(rows)
+        ]
+        for c in range(columns)
+    }
+    # preprocessors pass slices of a report, so the index is rarely 0..n
+    index = rng.sample(range(rows * 3), rows)
+    return pd.DataFrame(values, index=index)
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_build_id_string_matches_row_wise_join(seed: int):
+    id_data = random_id_data(random.Random(seed))
+    pd.testing.assert_series_equal(
+        build_id_string(id_data), reference_id_string(id_data), check_names=False
+    )
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_build_id_string_normalize_matches_upper_all_str(seed: int):
+    id_data = random_id_data(random.Random(seed))
+    expected = reference_id_string(id_data.apply(upper_all_str))
+    pd.testing.assert_series_equal(
+        build_id_string(id_data, normalize=True), expected, check_names=False
+    )
+
+
+def test_build_id_string_inserted_constant_column():
+    id_data = pd.DataFrame({"city": ["Tampa ", "mobile"], "state": ["FL", "al"]})
+    id_data.insert(0, "customer", "ACME SUPPLY", allow_duplicates=True)
+    pd.testing.assert_series_equal(
+        build_id_string(id_data, normalize=True),
+        pd.Series(["ACME SUPPLY_TAMPA_FL", "ACME SUPPLY_MOBILE_AL"]),
+        check_names=False,
+    )
+
+
+@pytest.mark.parametrize(
+    "column",
+    [
+        ["Tampa", None],
+        ["Tampa", np.nan],
+        [1.0, np.nan],
+        ["Tampa", 33601],
+        [33601, 33602],
+    ],
+)
+def test_build_id_string_raises_type_error_as_join_does(column: list):
+    id_data = pd.DataFrame({"customer": ["ACME", "ACME"], "city": column})
+    with pytest.raises(TypeError):
+        reference_id_string(id_data)
+    with pytest.raises(TypeError):
+        build_id_string(id_data)
+    with pytest.raises(TypeError):
+        build_id_string(id_data, normalize=True)
+
+
+def test_build_id_string_empty_frame():
+    id_data = pd.DataFrame(
+        {"customer": pd.Series(dtype=object), "state": pd.Series(dtype=object)}
+    )
+    result = build_id_string(id_data)
+    assert isinstance(result, pd.Series)
+    assert result.empty
+    assert result.dtype == object
@@ -0,0 +1,135 @@
+import os
+import sys
+import time
+import types
+import pandas as pd
+import pytest
+from entities.commission_file import CommissionFile
+from entities.manufacturers import ace, atco
+from entities.preprocessor import AbstractPreProcessor
+from services import preprocessed_cache
+
+PARAMS = {
+    "total_commission_amount": 1234.56,
+    "standard_commission_rate": 0.03,
+    "specified_customer": (1, "ACME SUPPLY"),
+    "column_names": [{"customer": "name", "city": "city", "state": "state"}],
+    "customer_proportions_by_state": pd.DataFrame(
+        {"state": ["FL", "GA"], "proportion": [0.25, 0.75]}
+    ),
+    "additional_file_1": b"extra",
+}
+DATA = pd.DataFrame(
+    {
+        "id_string": ["ACME_TAMPA_FL", "ACME_MOBILE_AL"],
+        "inv_amt": [123400.0, 5600.0],
+        "comm_amt": [3702.0, 168.0],
+    }
+)
+
+
+def key(file_data: bytes = b"report", preprocessor=atco.PreProcessor, **params):
+    file = CommissionFile(file_data=file_data, file_mime="", file_name="")
+    return preprocessed_cache.cache_key(file, 1, 2, preprocessor, {**PARAMS, **params})
+
+
+@pytest.fixture
+def local_store(tmp_path, monkeypatch):
+    monkeypatch.setattr(preprocessed_cache, "STORE", "local")
+    monkeypatch.setattr(preprocessed_cache, "CACHE_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_cache_key_is_stable():
+    assert key() == key()
+    # the order parameters are given in doesn't matter
+    reordered = dict(reversed(PARAMS.items()))
+    file = CommissionFile(file_data=b"report", file_mime="", file_name="")
+    assert key() == preprocessed_cache.cache_key(
+        file, 1, 2, atco.PreProcessor, reordered
+    )
+
+
+@pytest.mark.parametrize(
+    "changed",
+    [
+        {"file_data": b"another report"},
+        {"total_commission_amount": 1234.57},
+        {"standard_commission_rate": 0.04},
+        {"specified_customer": (2, "ACME SUPPLY")},
+        {"column_names": [{"customer": "name", "city": "city", "state": "st"}]},
+        {
+            "customer_proportions_by_state": pd.DataFrame(
+                {"state": ["FL", "GA"], "proportion": [0.5, 0.5]}
+            )
+        },
+        {"additional_file_1": b"other extra"},
+        {"additional_file_1": None},
+        {"split": 0.5},
+    ],
+)
+def test_cache_key_changes_with_each_input(changed: dict):
+    assert key(**changed) != key()
+
+
+def test_cache_key_changes_with_user_and_report():
+    file = CommissionFile(file_data=b"report", file_mime="", file_name="")
+    keys = {
+        preprocessed_cache.cache_key(file, user_id, report_id, atco.PreProcessor, {})
+        for user_id, report_id in [(1, 2), (2, 1), (1, 3)]
+    }
+    assert len(keys) == 3
+
+
+def test_cache_key_changes_with_code_version(tmp_path, monkeypatch):
+    source = tmp_path / "fake_preprocessor.py"
+    source.write_text("# version 1\n")
+    module = types.ModuleType("fake_preprocessor")
+    module.__file__ = str(source)
+    monkeypatch.setitem(sys.modules, module.__name__, module)
+    preprocessor = type("PreProcessor", (AbstractPreProcessor,), {})
+    preprocessor.__module__ = module.__name__
+
+    before = key(preprocessor=preprocessor)
+    assert before != key(preprocessor=ace.PreProcessor)
+    source.write_text("# version 2\n")
+    # code versions are only hashed once per process
+    assert key(preprocessor=preprocessor) == before
+    preprocessed_cache.code_version.cache_clear()
+    assert key(preprocessor=preprocessor) != before
+
+
+def test_round_trip(local_store):
+    assert preprocessed_cache.load(key()) is None
+    preprocessed_cache.store(key(), DATA)
+    pd.testing.assert_frame_equal(preprocessed_cache.load(key()), DATA)
+    assert preprocessed_cache.load(key(file_data=b"another report")) is None
+
+
+def test_off_stores_nothing(local_store, monkeypatch):
+    monkeypatch.setattr(preprocessed_cache, "STORE", "off")
+    preprocessed_cache.store(key(), DATA)
+    assert not os.listdir(local_store)
+    assert preprocessed_cache.load(key()) is None
+
+
+def test_unreadable_entry_is_a_miss(local_store):
+    (local_store / f"{key()}.parquet").write_bytes(b"not parquet")
+    assert preprocessed_cache.load(key()) is None
+
+
+def test_store_evicts_least_recently_used(local_store, monkeypatch):
+    keys = [key(file_data=f"report {n}".encode()) for n in range(3)]
+    for n, key_ in enumerate(keys):
+        preprocessed_cache.store(key_, DATA)
+        # mtimes a second apart, as filesystems may not be any finer
+        past = time.time() - 10 + n
+        os.utime(local_store / f"{key_}.parquet", (past, past))
+    size = os.path.getsize(local_store / f"{keys[0]}.parquet")
+    # the oldest file was used last
+    assert preprocessed_cache.load(keys[0]) is not None
+
+    monkeypatch.setattr(preprocessed_cache, "MAX_BYTES", size * 3.5)
+    preprocessed_cache.store(key(file_data=b"report 3"), DATA)
+    remaining = {name.removesuffix(".parquet") for name in os.listdir(local_store)}
+    assert remaining == {keys[0], keys[2], key(file_data=b"report 3")}
@@ -0,0 +1,66 @@
+import sys
+import pytest
+from entities.manufacturers import PreProcessorRegistry, atco
+
+
+class CountingRegistry(PreProcessorRegistry):
+    """reads its manufacturer names from a dict instead of the database"""
+
+    def __init__(self, names: dict[int, str], reload_interval: float = 60) -> None:
+        super().__init__(reload_interval)
+        self.table = names
+        self.loads = 0
+
+    def _load_names(self) -> dict[int, str]:
+        self.loads += 1
+        return dict(self.table)
+
+
+def test_get_imports_and_keeps_the_class():
+    registry = CountingRegistry({1: "atco"})
+    assert registry.get(1) is atco.PreProcessor
+    assert registry[1] is atco.PreProcessor
+    assert 1 in registry
+    assert registry.loads == 1
+
+
+def test_unknown_ids_reload_names_at_most_once_per_interval(monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr("entities.manufacturers.time.monotonic", lambda: now)
+    registry = CountingRegistry({1: "atco"})
+    for _ in range(5):
+        assert registry.get(99) is None
+    assert registry.loads == 1
+
+    registry.table[99] = "atco"
+    now += 60
+    assert registry.get(99) is atco.PreProcessor
+    assert registry.loads == 2
+
+
+def test_refresh_reads_names_again():
+    registry = CountingRegistry({1: "atco"})
+    assert registry.get(2) is None
+    registry.table[2] = "atco"
+    registry.refresh()
+    assert registry.get(2) is atco.PreProcessor
+    assert registry.loads == 2
+
+
+def test_manufacturer_without_a_module_has_no_preprocessor():
+    registry = CountingRegistry({1: "no_such_manufacturer"})
+    assert registry.get(1) is None
+    with pytest.raises(KeyError):
+        registry[1]
+
+
+def test_missing_import_inside_a_module_is_raised(tmp_path, monkeypatch):
+    package = sys.modules["entities.manufacturers"]
+    (tmp_path / "broken_manufacturer.py").write_text("import no_such_package\n")
+    monkeypatch.setattr(package, "__path__", [*package.__path__, str(tmp_path)])
+    monkeypatch.delitem(
+        sys.modules, "entities.manufacturers.broken_manufacturer", raising=False
+    )
+    registry = CountingRegistry({1: "broken_manufacturer"})
+    with pytest.raises(ModuleNotFoundError, match="no_such_package"):
+        registry.get(1)
@@ -0,0 +1,301 @@
+import numpy as np
+import pandas as pd
+import pytest
+from entities.commission_data import PreProcessedData
+from entities.manufacturers import ace, atco, southwire, tjernlund
+from entities.preprocessor import AbstractPreProcessor
+
+EXPECTED_TYPES = AbstractPreProcessor.EXPECTED_TYPES
+COLUMN_NAMES = [
+    # an option that isn't in the reports, to check the right one is picked
+    {
+        "customer": "customername",
+        "city": "city",
+        "state": "st",
+        "sales": "netsales",
+        "commissions": "commission",
+    },
+    {
+        "customer": "sortname",
+        "city": "shiptocity",
+        "state": "shiptostate",
+        "sales": "ttlsaleslessfrtandepd",
+        "commissions": "commissionearned",
+    },
+]
+REPORT_HEADER = [
+    "Sort Name",
+    "ShipTo City",
+    "ShipTo State",
+    "Ttl Sales Less Frt and EPD",
+    "Commission Earned",
+]
+ROWS = [
+    ["acme supply ", "tampa", "FL", 1000.0, 30.0],
+    ["Acme Supply", " Mobile", "al", 250.5, 7.52],
+    [None, "ORLANDO", "FL", 10.0, 0.3],
+    ["BETA HVAC", None, "GA", 99.99, 3.0],
+    ["beta hvac", "Savannah ", "GA", 0.0, 0.0],
+]
+# every row with a customer has a city, as atco's standard report only drops
+# rows missing the first column
+ATCO_ROWS = [row for row in ROWS if row[0] is None or row[1] is not None]
+CUSTOMER = (1, "acme supply")
+RATE = 0.03
+
+
+def report_with_header_in_row(rows: list[list] = ROWS) -> pd.DataFrame:
+    """as a report with a title above its header comes out of to_df"""
+    title = ["ATCO COMMISSIONS", None, None, None, None]
+    blank = [None] * 5
+    totals = [None, None, "TOTAL", 1360.49, 40.82]
+    rows = [title, blank, REPORT_HEADER, *rows, totals]
+    return pd.DataFrame(rows, columns=[f"Unnamed: {i}" for i in range(5)])
+
+
+def report_with_header(rows: list[list] = ROWS) -> pd.DataFrame:
+    return pd.DataFrame(rows, columns=REPORT_HEADER).rename(
+        columns=lambda col: col.lower().replace(" ", "")
+    )
+
+
+REPORTS = {"header in row": report_with_header_in_row, "header": report_with_header}
+
+
+def total(rows: list[list], commission_from_rate: bool = False, column: int = 0):
+    kept = [row for row in rows if row[column] is not None]
+    if commission_from_rate:
+        return sum(row[3] for row in kept) * RATE
+    return sum(row[4] for row in kept)
+
+
+def row_wise_id_string(id_data: pd.DataFrame) -> pd.Series:
+    return id_data.apply("_".join, axis=1)
+
+
+# the hand-written preprocessing each spec replaced
+
+
+def reference_atco_standard(
+    self: AbstractPreProcessor, data: pd.DataFrame, **kwargs
+) -> PreProcessedData:
+    data, cols = self.use_column_options(data, **kwargs)
+    customer: str = cols.customer
+    city: str = cols.city
+    state: str = cols.state
+    sales: str = cols.sales
+    commissions: str = cols.commissions
+
+    data = data.dropna(subset=data.columns[0])
+    data[sales] *= 100
+    data[commissions] *= 100
+    data["id_string"] = row_wise_id_string(data[[customer, city, state]])
+    result = (
+        data[["id_string", sales, commissions]]
+        .rename(columns={sales: "inv_amt", commissions: "comm_amt"})
+        .apply(self.upper_all_str)
+    )
+    result = result.astype(self.EXPECTED_TYPES)
+    self.assert_commission_amounts_match(result, **kwargs)
+    return PreProcessedData(result)
+
+
+def reference_ace_pos(
+    self: AbstractPreProcessor, data: pd.DataFrame, **kwargs
+) -> PreProcessedData:
+    data, cols = self.use_column_options(data, **kwargs)
+    customer: str = self.get_customer(**kwargs)
+    city: str = cols.city
+    state: str = cols.state
+    sales: str = cols.sales
+    commissions = "comm_amt"
+    comm_rate: float = kwargs.get("standard_commission_rate")
+
+    data = data.dropna(subset=city)
+    data.loc[:, sales] *= 100
+    data.loc[:, commissions] = data[sales] * comm_rate
+    data.loc[:, "customer"] = customer
+    data.loc[:, "id_string"] = row_wise_id_string(data[["customer", city, state]])
+    result = data[["id_string", sales, commissions]].rename(
+        columns={sales: "inv_amt", commissions: "comm_amt"}
+    )
+    result = result.apply(self.upper_all_str)
+    result = result.astype(self.EXPECTED_TYPES)
+    self.assert_commission_amounts_match(result, **kwargs)
+    return PreProcessedData(result)
+
+
+def reference_southwire_pos(
+    self: AbstractPreProcessor, data: pd.DataFrame, **kwargs
+) -> PreProcessedData:
+    data, cols_used = self.use_column_options(data, **kwargs)
+    customer: str = self.get_customer(**kwargs)
+    city: str = cols_used.city
+    state: str = cols_used.state
+    sales: str = cols_used.sales
+    commission: str = cols_used.commissions
+
+    data = data.dropna(subset=city)
+    data.loc[:, "customer"] = customer
+    data[sales] = data[sales].astype(float)
+    data[commission] = data[commission].astype(float)
+    data[sales] *= 100
+    data[commission] *= 100
+    data["id_string"] = row_wise_id_string(data[["customer", city, state]])
+    result = data[["id_string", sales, commission]].rename(
+        columns={sales: "inv_amt", commission: "comm_amt"}
+    )
+    return PreProcessedData(result)
+
+
+def reference_tjernlund_template(
+    self: AbstractPreProcessor, data: pd.DataFrame, **kwargs
+) -> PreProcessedData:
+    customer = "customer"
+    city = "city"
+    sales = "sales"
+    commission = "commission"
+
+    data = self.check_headers_and_fix(
+        cols=[customer, city, sales, commission], df=data
+    )
+    data = data.dropna(subset=data.columns[0])
+    data = data.dropna(axis=1, how="all")
+    data = data.apply(self.upper_all_str)
+    data.loc[:, sales] *= 100
+    data.loc[:, commission] *= 100
+    data["id_string"] = row_wise_id_string(data[[customer, city]])
+    result = data[["id_string", sales, commission]]
+    result = result.rename(columns={sales: "inv_amt", commission: "comm_amt"})
+    result = result.astype(self.EXPECTED_TYPES)
+    return PreProcessedData(result)
+
+
+def assert_same_result(spec_method, reference, data: pd.DataFrame, **kwargs):
+    expected = reference(spec_method.__self__, data.copy(), **kwargs).data
+    result = spec_method(data.copy(), **kwargs).data
+    pd.testing.assert_frame_equal(result, expected)
+    assert result.dtypes.to_dict() == {
+        column: np.dtype(type_) for column, type_ in EXPECTED_TYPES.items()
+    }
+    return result
+
+
+@pytest.mark.parametrize("report", REPORTS)
+def test_atco_standard(report: str):
+    preprocessor = atco.PreProcessor("standard", 1, None)
+    result = assert_same_result(
+        preprocessor._standard_report_preprocessing,
+        reference_atco_standard,
+        REPORTS[report](ATCO_ROWS),
+        column_names=COLUMN_NAMES,
+        total_commission_amount=total(ATCO_ROWS),
+    )
+    # rows without a customer (the first column) are dropped
+    assert len(result) == 3
+    # the joined id string is normalized, so inner whitespace is kept
+    assert result["id_string"].iloc[0] == "ACME SUPPLY _TAMPA_FL"
+
+
+@pytest.mark.parametrize(
+    "preprocessor, method",
+    [
+        (ace.PreProcessor("johnstone", 1, None), "_johnstone_report_preprocessing"),
+        (ace.PreProcessor("baker", 1, None), "_baker_report_preprocessing"),
+    ],
+)
+@pytest.mark.parametrize("report", REPORTS)
+def test_ace_pos(preprocessor: AbstractPreProcessor, method: str, report: str):
+    result = assert_same_result(
+        getattr(preprocessor, method),
+        reference_ace_pos,
+        REPORTS[report](),
+        column_names=COLUMN_NAMES,
+        specified_customer=CUSTOMER,
+        standard_commission_rate=RATE,
+        total_commission_amount=total(ROWS, commission_from_rate=True, column=1),
+    )
+    # rows without a city are dropped, the customer column isn't used
+    assert len(result) == 4
+    assert result["id_string"].str.startswith("ACME SUPPLY_").all()
+    assert result["comm_amt"].tolist() == pytest.approx(
+        (result["inv_amt"] * RATE).tolist()
+    )
+
+
+@pytest.mark.parametrize(
+    "method", ["_re_michel_report_preprocessing", "_uri_report_preprocessing"]
+)
+@pytest.mark.parametrize("report", REPORTS)
+def test_southwire_pos(method: str, report: str):
+    preprocessor = southwire.PreProcessor("re_michel_pos", 1, None)
+    result = assert_same_result(
+        getattr(preprocessor, method),
+        reference_southwire_pos,
+        REPORTS[report](),
+        column_names=COLUMN_NAMES,
+        specified_customer=CUSTOMER,
+    )
+    assert len(result) == 4
+    # not normalized at all
+    assert result["id_string"].iloc[1] == "acme supply_ Mobile_al"
+
+
+@pytest.mark.parametrize(
+    "method", ["_johnstone_report_preprocessing", "_re_michel_report_preprocessing"]
+)
+@pytest.mark.parametrize("header_in_row", [True, False])
+def test_tjernlund_template(method: str, header_in_row: bool):
+    header = ["Customer", "City", "Sales", "Commission", "Notes"]
+    rows = [
+        ["acme supply ", " tampa", 1000.0, 30.0, None],
+        [None, "ORLANDO", 10.0, 0.3, None],
+        ["Beta HVAC", "savannah", 99.99, 3.0, None],
+    ]
+    if header_in_row:
+        data = pd.DataFrame(
+            [["Tjernlund Template", None, None, None, None], header, *rows],
+            columns=[f"Unnamed: {i}" for i in range(5)],
+        )
+    else:
+        data = pd.DataFrame(rows, columns=header)
+    preprocessor = tjernlund.PreProcessor("johnstone_pos", 1, None)
+    result = assert_same_result(
+        getattr(preprocessor, method), reference_tjernlund_template, data
+    )
+    # each column is normalized before they're joined
+    assert result["id_string"].tolist() == ["ACME SUPPLY_TAMPA", "BETA HVAC_SAVANNAH"]
+
+
+@pytest.mark.parametrize(
+    "preprocessor, method, reference, kwargs",
+    [
+        (
+            atco.PreProcessor("standard", 1, None),
+            "_standard_report_preprocessing",
+            reference_atco_standard,
+            {},
+        ),
+        (
+            ace.PreProcessor("johnstone", 1, None),
+            "_johnstone_report_preprocessing",
+            reference_ace_pos,
+            {"specified_customer": CUSTOMER, "standard_commission_rate": RATE},
+        ),
+    ],
+)
+def test_check_total_mismatch(preprocessor, method, reference, kwargs):
+    kwargs = dict(kwargs, column_names=COLUMN_NAMES, total_commission_amount=1.0)
+    with pytest.raises(AssertionError, match="does not match"):
+        reference(preprocessor, report_with_header(ATCO_ROWS), **kwargs)
+    with pytest.raises(AssertionError, match="does not match"):
+        getattr(preprocessor, method)(report_with_header(ATCO_ROWS), **kwargs)
+
+
+def test_no_column_option_matches():
+    preprocessor = atco.PreProcessor("standard", 1, None)
+    data = report_with_header().rename(columns={"shiptostate": "region"})
+    with pytest.raises(Exception, match="do not match any of the options"):
+        preprocessor._standard_report_preprocessing(
+            data, column_names=COLUMN_NAMES, total_commission_amount=0
+        )